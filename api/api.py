@@ -1,9 +1,68 @@
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Header, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from datetime import date, datetime, timedelta
 from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+from starlette.routing import Match
+import asyncio
+import logging
+import os
+import time
 import uvicorn
-from data_generator_api import gerar_dados_periodo, salvar_dados_csv
+from data_generator_api import (
+    gerar_dados_periodo, gerar_dados_particionados, iterar_dados_periodo, salvar_dados_csv,
+    ler_high_water_mark, PERFIL_CARGA, PARTICOES_PATH
+)
+from streaming import stream_ndjson, stream_arrow
+from executor import executor, ExecutorIndisponivel, ExecutorSaturado
+from cache import cache_respostas
+from carga_postgres import carregador_postgres
+from sink_postgres import sink_postgres, API_SINK
+from metricas import registro_metricas, requisicoes, latencia_endpoint, duracao_etapa, registrar_linhas
+from serializacao import COMPRESSAO_THREAD_MIN_BYTES, serializar_json, orientar_colunas, negociar_codificacao, comprimir
+from jobs import EspecificacaoJob, gerenciador_jobs
+from paginacao import Cursor, CursorInvalido, cursor_inicial, gerar_pagina, fatiar_periodo
+from eventos import TAXA_MAX, emitir, formatar_sse
+from ciclo_pedidos import DIAS_CICLO_MAX
+from mudancas import cursor_mudancas, pagina_mudancas
+
+# Nível do log da API e do gerador (DEBUG liga os detalhes de cada escrita de CSV)
+logging.basicConfig(
+    level=os.getenv("API_LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+# Medidores lidos a cada coleta de /metrics
+registro_metricas.medidor(
+    "dw_api_executor_em_andamento", "Tarefas em execução ou na fila do executor", lambda: executor.em_andamento
+)
+registro_metricas.medidor(
+    "dw_api_executor_na_fila", "Tarefas aguardando um worker livre", lambda: executor.na_fila
+)
+registro_metricas.medidor(
+    "dw_api_executor_capacidade", "Máximo de tarefas em andamento (workers + fila)", lambda: executor.capacidade
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Cria os pools de geração, dos jobs (e o do sink Postgres) na subida da API e os encerra na parada."""
+    executor.iniciar()
+    gerenciador_jobs.iniciar()
+    if API_SINK == "postgres":
+        await sink_postgres.iniciar()
+    yield
+    await sink_postgres.encerrar()
+    gerenciador_jobs.encerrar()
+    executor.encerrar()
+    carregador_postgres.encerrar()
+
+# Watermark gravado pelo consolidador incremental no diretório de seeds
+WATERMARK_PATH = os.getenv("API_WATERMARK_PATH", "/app/seeds/watermark.json")
+
+# Máximo de registros por página em /dados/paginas
+PAGINA_MAX = int(os.getenv("API_PAGINA_MAX", 10_000))
 
 # Criar aplicação FastAPI
 app = FastAPI(
@@ -11,9 +70,34 @@ app = FastAPI(
     description="API para geração de dados incrementais para o Data Warehouse",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+def _rota(request: Request) -> str:
+    """Caminho declarado da rota (ex.: /dados/periodo), para não criar uma série por URL."""
+    rota = request.scope.get("route")
+    if rota is None:
+        for candidata in request.app.router.routes:
+            if candidata.matches(request.scope)[0] == Match.FULL:
+                rota = candidata
+                break
+    return getattr(rota, "path", "desconhecida")
+
+@app.middleware("http")
+async def medir_requisicoes(request: Request, call_next):
+    """Latência e status por endpoint (em respostas em streaming, até o início do corpo)."""
+    inicio = time.perf_counter()
+    status = 500
+    try:
+        resposta = await call_next(request)
+        status = resposta.status_code
+        return resposta
+    finally:
+        endpoint = _rota(request)
+        latencia_endpoint.observar(time.perf_counter() - inicio, endpoint=endpoint)
+        requisicoes.inc(endpoint=endpoint, status=str(status))
+
 # Configurar CORS para permitir acesso do Power BI e outras ferramentas
 app.add_middleware(
     CORSMiddleware,
@@ -32,7 +116,13 @@ async def root():
         "endpoints": {
             "dados_periodo": "/dados/periodo",
             "dados_recentes": "/dados/recentes",
-            "documentacao": "/docs"
+            "dados_paginas": "/dados/paginas",
+            "dados_mudancas": "/dados/mudancas",
+            "jobs": "/jobs",
+            "eventos_stream": "/eventos/stream",
+            "eventos_ws": "/eventos/ws",
+            "documentacao": "/docs",
+            "metricas": "/metrics"
         },
         "exemplo_uso": "/dados/periodo?data_inicio=2025-06-10&data_fim=2025-06-24"
     }
@@ -51,12 +141,37 @@ async def get_dados_periodo(
     ),
     salvar_csv: bool = Query(
         default=False,
-        description="Se True, salva os dados em arquivos CSV para integração com dbt"
+        description="Se True, salva os dados para integração com dbt (CSV ou Postgres, conforme API_SINK)"
+    ),
+    carregar_postgres: bool = Query(
+        default=False,
+        description="Se True, carrega os dados nas tabelas raw do Postgres com COPY"
     ),
     seed: Optional[int] = Query(
         default=None,
         description="Seed para reprodutibilidade dos dados (útil para testes)"
-    )
+    ),
+    formato: str = Query(
+        default="json",
+        pattern="^(json|ndjson|arrow)$",
+        description="json: documento único; ndjson: uma linha por registro em streaming; arrow: stream Arrow IPC"
+    ),
+    tabela: str = Query(
+        default="pedidos",
+        pattern="^(cadastros|pedidos)$",
+        description="Tabela enviada no formato arrow (um stream Arrow tem um único schema)"
+    ),
+    particionado: bool = Query(
+        default=False,
+        description="Se True, gera dia a dia a partir de (seed, data); com salvar_csv, grava só os dias ainda sem partição"
+    ),
+    orientacao: str = Query(
+        default="linhas",
+        pattern="^(linhas|colunas)$",
+        description="linhas: lista de objetos por tabela; colunas: {coluna: [valores]} por tabela (formato json)"
+    ),
+    if_none_match: Optional[str] = Header(default=None, include_in_schema=False),
+    accept_encoding: Optional[str] = Header(default=None, include_in_schema=False)
 ) -> Dict[str, Any]:
     """
     Gera dados de cadastros e pedidos para um período específico.
@@ -64,11 +179,37 @@ async def get_dados_periodo(
     **Volumes gerados automaticamente:**
     - Cadastros: entre 2 e 20 (randomizado)
     - Pedidos: entre 40 e 90 (randomizado)
+    - Com `API_PERFIL_CARGA`, os volumes seguem o perfil (por dia do período, com
+      sazonalidade), e os pedidos concentram-se em poucos clientes
     
     **Retorna:**
     - Dados em formato JSON
     - Estatísticas do período
-    - Opcionalmente salva em CSV para integração com dbt
+    - Opcionalmente salva em CSV para integração com dbt (com `API_SINK=postgres`,
+      `salvar_csv` grava direto nas tabelas raw do Postgres, sem arquivos)
+    - Opcionalmente carrega no Postgres (`raw.cadastros` e `raw.pedidos`) via
+      `COPY FROM STDIN`, sem passar pelos CSVs e pelo `dbt seed`
+    
+    **Streaming:**
+    - `formato=ndjson`: registros `{"tipo": ..., "dados": ...}` enviados à medida
+      que são gerados; a última linha (`"tipo": "estatisticas"`) traz os totais
+    - `formato=arrow`: stream Arrow IPC da `tabela` escolhida; as estatísticas
+      vão no metadado do último record batch
+    
+    **Particionado** (`particionado=true`, apenas JSON):
+    - Cada dia é gerado a partir de (seed, data), com volumes por dia; sem `seed`,
+      usa `API_SEED_PARTICOES`
+    - Com `salvar_csv`, cada dia vira uma partição `data=YYYY-MM-DD/` em
+      `API_PARTICOES_PATH` (sempre em arquivos, independente de `API_SINK`); os
+      dias que já têm partição são pulados, e a resposta traz só os dias gerados
+    
+    **Cache:** com `seed` (e sem `salvar_csv`/`carregar_postgres`), a resposta JSON depende apenas de
+    (data_inicio, data_fim, seed, particionado, orientacao) e é servida de um cache em memória,
+    com `ETag` e suporte a `If-None-Match` (304). Essas respostas não trazem `api_info.gerado_em`,
+    para que o corpo e o ETag sejam os mesmos em qualquer processo e depois de descartes do cache.
+    
+    **Compressão:** respostas JSON a partir de `API_COMPRESSAO_MIN_BYTES` são
+    comprimidas com zstd, br ou gzip, conforme o `Accept-Encoding` do cliente.
     """
     
     try:
@@ -88,39 +229,181 @@ async def get_dados_periodo(
                 detail="Data de início não pode ser futura"
             )
         
-        # Gerar dados
-        dados = gerar_dados_periodo(
-            data_inicio=data_inicio.isoformat(),
-            data_fim=data_fim.isoformat(),
-            seed=seed
-        )
+        if formato != "json":
+            if salvar_csv or carregar_postgres or particionado or orientacao != "linhas":
+                raise HTTPException(
+                    status_code=400,
+                    detail="salvar_csv, carregar_postgres, particionado e orientacao=colunas só são suportados no formato json"
+                )
+            
+            api_info = {
+                "gerado_em": datetime.now().isoformat(),
+                "endpoint": "/dados/periodo",
+                "parametros": {
+                    "data_inicio": data_inicio.isoformat(),
+                    "data_fim": data_fim.isoformat(),
+                    "seed": seed,
+                    "formato": formato
+                }
+            }
+            eventos = _contar_linhas(iterar_dados_periodo(
+                data_inicio=data_inicio.isoformat(),
+                data_fim=data_fim.isoformat(),
+                seed=seed
+            ))
+            
+            # O stream ocupa uma vaga do executor até terminar (429 com a fila cheia).
+            # A vaga é liberada no fim da iteração e, se o cliente desconectar antes
+            # de o stream começar, pela tarefa de fundo da resposta
+            vaga = executor.reservar()
+            if formato == "ndjson":
+                return StreamingResponse(
+                    vaga.envolver(stream_ndjson(eventos, api_info)),
+                    media_type="application/x-ndjson",
+                    background=BackgroundTask(vaga.liberar)
+                )
+            return StreamingResponse(
+                vaga.envolver(stream_arrow(eventos, tabela, api_info)),
+                media_type="application/vnd.apache.arrow.stream",
+                background=BackgroundTask(vaga.liberar)
+            )
+        
+        # Respostas com seed são determinísticas e podem vir do cache
+        chave_cache = None
+        if seed is not None and not salvar_csv and not carregar_postgres:
+            chave_cache = (data_inicio.isoformat(), data_fim.isoformat(), seed, particionado, orientacao)
+            em_cache = cache_respostas.obter(chave_cache)
+            if em_cache is not None:
+                return await _responder_json(*em_cache, accept_encoding, if_none_match, cache="HIT")
+        
+        # Gerar dados (fora do event loop, no pool de geração; o tempo inclui a espera na fila)
+        with duracao_etapa.cronometrar(etapa="geracao"):
+            if particionado:
+                # As partições são gravadas junto com a geração de cada dia
+                dados = await executor.executar(
+                    gerar_dados_particionados,
+                    data_inicio=data_inicio.isoformat(),
+                    data_fim=data_fim.isoformat(),
+                    seed=seed,
+                    pasta_destino=PARTICOES_PATH if salvar_csv else None
+                )
+            else:
+                dados = await executor.executar(
+                    gerar_dados_periodo,
+                    data_inicio=data_inicio.isoformat(),
+                    data_fim=data_fim.isoformat(),
+                    seed=seed
+                )
+        registrar_linhas(dados["estatisticas"])
         
-        # Salvar CSV se solicitado
+        # Salvar CSV se solicitado (com API_SINK=postgres, a gravação vai para o Postgres)
         arquivos_csv = None
-        if salvar_csv:
-            arquivos_csv = salvar_dados_csv(dados)
+        if salvar_csv and API_SINK != "postgres" and not particionado:
+            with duracao_etapa.cronometrar(etapa="escrita_csv"):
+                arquivos_csv = await executor.executar(salvar_dados_csv, dados)
             dados["arquivos_csv"] = arquivos_csv
         
-        # Adicionar metadados da API
+        # Carregar no Postgres se solicitado: pelo pool assíncrono do sink, se ativo,
+        # ou pelo carregador síncrono numa thread (o pool psycopg2 dele vive neste
+        # processo e não pode ir para um worker do executor em modo process)
+        if carregar_postgres or (salvar_csv and API_SINK == "postgres" and not particionado):
+            with duracao_etapa.cronometrar(etapa="carga_postgres"):
+                if sink_postgres.ativo:
+                    dados["carga_postgres"] = await sink_postgres.gravar(dados)
+                else:
+                    dados["carga_postgres"] = await asyncio.to_thread(carregador_postgres.copiar_dados, dados)
+        
+        # Adicionar metadados da API. Respostas cacheáveis não levam gerado_em:
+        # o corpo (e o ETag calculado sobre ele) depende só dos parâmetros, então
+        # é o mesmo depois de um descarte do cache ou de um reinício do processo
         dados["api_info"] = {
-            "gerado_em": datetime.now().isoformat(),
             "endpoint": "/dados/periodo",
             "parametros": {
                 "data_inicio": data_inicio.isoformat(),
                 "data_fim": data_fim.isoformat(),
                 "salvar_csv": salvar_csv,
-                "seed": seed
-            }
+                "carregar_postgres": carregar_postgres,
+                "seed": seed,
+                "particionado": particionado,
+                "orientacao": orientacao
+            },
+            "sink": API_SINK,
+            "perfil_carga": PERFIL_CARGA.nome if PERFIL_CARGA is not None else None
         }
+        if chave_cache is None:
+            dados["api_info"]["gerado_em"] = datetime.now().isoformat()
         
-        return dados
+        # Serializado aqui (e não pelo FastAPI) para medir a etapa e reaproveitar no cache
+        with duracao_etapa.cronometrar(etapa="serializacao"):
+            if orientacao == "colunas":
+                dados = orientar_colunas(dados)
+            corpo = serializar_json(dados)
         
+        if chave_cache is not None:
+            etag = cache_respostas.guardar(chave_cache, corpo)
+            return await _responder_json(corpo, etag, accept_encoding, if_none_match, cache="MISS")
+        
+        return await _responder_json(corpo, None, accept_encoding)
+        
+    except HTTPException:
+        raise
+    except ExecutorSaturado as e:
+        # Fila cheia: o cliente deve reduzir o ritmo e tentar de novo
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except ExecutorIndisponivel as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Erro interno do servidor: {str(e)}"
         )
 
+def _contar_linhas(eventos):
+    """Repassa os eventos do streaming, somando os totais do trailer às métricas."""
+    for tabela, registro in eventos:
+        if tabela == "estatisticas":
+            registrar_linhas(registro)
+        yield tabela, registro
+
+async def _responder_json(
+    corpo: bytes,
+    etag: Optional[str],
+    accept_encoding: Optional[str],
+    if_none_match: Optional[str] = None,
+    cache: Optional[str] = None
+) -> Response:
+    """
+    Resposta JSON comprimida conforme o Accept-Encoding. Com ETag (respostas
+    do cache), 304 se o cliente já tem a mesma versão; o ETag de uma resposta
+    comprimida leva a codificação, pois os bytes enviados são outros.
+    """
+    codificacao = negociar_codificacao(accept_encoding, len(corpo))
+    headers = {"Vary": "Accept-Encoding"}
+    if etag is not None:
+        if codificacao is not None:
+            etag = f'{etag[:-1]}-{codificacao}"'
+        headers.update({"ETag": etag, "X-Cache": cache})
+        if if_none_match is not None and etag in [valor.strip() for valor in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+    
+    if codificacao is not None:
+        with duracao_etapa.cronometrar(etapa="compressao"):
+            # Corpos grandes são comprimidos numa thread para não travar o event loop
+            if len(corpo) >= COMPRESSAO_THREAD_MIN_BYTES:
+                corpo = await asyncio.to_thread(comprimir, corpo, codificacao)
+            else:
+                corpo = comprimir(corpo, codificacao)
+        headers["Content-Encoding"] = codificacao
+    return Response(content=corpo, media_type="application/json", headers=headers)
+
 @app.get("/dados/recentes", summary="Gerar dados dos últimos dias")
 async def get_dados_recentes(
     dias: int = Query(
@@ -131,8 +414,18 @@ async def get_dados_recentes(
     ),
     salvar_csv: bool = Query(
         default=False,
-        description="Se True, salva os dados em arquivos CSV"
-    )
+        description="Se True, salva os dados (CSV ou Postgres, conforme API_SINK)"
+    ),
+    desde_watermark: bool = Query(
+        default=False,
+        description="Se True, gera apenas a janela após a última data já consolidada (ignora dias)"
+    ),
+    orientacao: str = Query(
+        default="linhas",
+        pattern="^(linhas|colunas)$",
+        description="linhas: lista de objetos por tabela; colunas: {coluna: [valores]} por tabela"
+    ),
+    accept_encoding: Optional[str] = Header(default=None, include_in_schema=False)
 ) -> Dict[str, Any]:
     """
     Gera dados dos últimos N dias (útil para atualizações incrementais).
@@ -140,19 +433,49 @@ async def get_dados_recentes(
     **Exemplo de uso:**
     - `/dados/recentes?dias=7` - dados dos últimos 7 dias
     - `/dados/recentes?dias=14&salvar_csv=true` - últimos 14 dias + salvar CSV
+    - `/dados/recentes?desde_watermark=true&salvar_csv=true` - só os dias ainda não
+      consolidados (lidos do watermark.json do consolidador)
     """
     
     try:
         data_fim = date.today()
         data_inicio = data_fim - timedelta(days=dias)
         
+        if desde_watermark:
+            marca = ler_high_water_mark(WATERMARK_PATH)
+            if marca is not None:
+                data_inicio = marca + timedelta(days=1)
+            
+            # Nada a gerar: tudo até hoje já foi consolidado
+            if data_inicio > data_fim:
+                return {
+                    "periodo": {"data_inicio": data_inicio.isoformat(), "data_fim": data_fim.isoformat()},
+                    "estatisticas": {"total_cadastros": 0, "total_pedidos": 0, "cpfs_disponiveis": 0},
+                    "dados": {"cadastros": [], "pedidos": []},
+                    "api_info": {
+                        "gerado_em": datetime.now().isoformat(),
+                        "endpoint": "/dados/recentes",
+                        "high_water_mark": marca.isoformat()
+                    }
+                }
+        
         # Reutilizar a função principal
         return await get_dados_periodo(
             data_inicio=data_inicio,
             data_fim=data_fim,
-            salvar_csv=salvar_csv
+            salvar_csv=salvar_csv,
+            carregar_postgres=False,
+            seed=None,
+            formato="json",
+            tabela="pedidos",
+            particionado=False,
+            orientacao=orientacao,
+            if_none_match=None,
+            accept_encoding=accept_encoding
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -164,20 +487,416 @@ async def get_dados_desde_junho(
     salvar_csv: bool = Query(
         default=True,
         description="Salvar dados em CSV para integração com dbt"
-    )
+    ),
+    particionado: bool = Query(
+        default=True,
+        description="Gera e grava por dia (data=YYYY-MM-DD/), pulando os dias já gravados"
+    ),
+    seed: Optional[int] = Query(
+        default=None,
+        description="Seed das partições (padrão: API_SEED_PARTICOES)"
+    ),
+    orientacao: str = Query(
+        default="linhas",
+        pattern="^(linhas|colunas)$",
+        description="linhas: lista de objetos por tabela; colunas: {coluna: [valores]} por tabela"
+    ),
+    accept_encoding: Optional[str] = Header(default=None, include_in_schema=False)
 ) -> Dict[str, Any]:
     """
     Endpoint específico para o projeto: gera dados desde 10/06/2025 até hoje.
     
-    **Uso recomendado para integração com dbt.**
+    **Uso recomendado para integração com dbt.** Por padrão é particionado:
+    cada chamada grava só os dias que ainda não têm partição, então
+    reexecuções não geram cópias do período para o consolidador deduplicar.
     """
     
     return await get_dados_periodo(
         data_inicio=date(2025, 6, 10),
         data_fim=date.today(),
         salvar_csv=salvar_csv,
-        seed=None
+        carregar_postgres=False,
+        seed=seed,
+        formato="json",
+        tabela="pedidos",
+        particionado=particionado,
+        orientacao=orientacao,
+        if_none_match=None,
+        accept_encoding=accept_encoding
+    )
+
+def _validar_periodo(data_inicio: date, data_fim: date):
+    if data_inicio > data_fim:
+        raise HTTPException(status_code=400, detail="Data de início deve ser anterior à data de fim")
+    if data_inicio > date.today():
+        raise HTTPException(status_code=400, detail="Data de início não pode ser futura")
+
+@app.get("/dados/paginas", summary="Dados de um período longo, página a página (cursor)")
+async def get_dados_paginas(
+    data_inicio: Optional[date] = Query(
+        default=None,
+        description="Data de início do período (YYYY-MM-DD); obrigatória sem cursor",
+        example="2024-06-10"
+    ),
+    data_fim: Optional[date] = Query(
+        default=None,
+        description="Data de fim do período (YYYY-MM-DD). Se não informada, usa data atual"
+    ),
+    tabela: str = Query(
+        default="pedidos",
+        pattern="^(cadastros|pedidos)$",
+        description="Tabela paginada"
+    ),
+    seed: Optional[int] = Query(
+        default=None,
+        description="Seed dos dias (padrão: API_SEED_PARTICOES, a mesma das partições)"
+    ),
+    limite: int = Query(
+        default=1000,
+        ge=1,
+        le=PAGINA_MAX,
+        description="Registros por página"
+    ),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Cursor devolvido em proximo_cursor (ou por /dados/paginas/fatias); substitui período, tabela e seed"
+    ),
+    accept_encoding: Optional[str] = Header(default=None, include_in_schema=False)
+) -> Dict[str, Any]:
+    """
+    Percorre um período página a página, com cursor opaco.
+    
+    Cada dia é gerado só a partir de (seed, data), com os mesmos dados das
+    partições de `particionado=true`. O cursor guarda a seed, a tabela, o fim
+    do período e a posição, então cada página é gerada sozinha, em tempo e
+    memória proporcionais ao `limite`, sem gerar as páginas anteriores.
+    
+    **Exemplo de uso:**
+    - `/dados/paginas?data_inicio=2024-06-10&limite=5000` - primeira página
+    - `/dados/paginas?cursor=...&limite=5000` - página seguinte (`proximo_cursor`
+      é `null` na última)
+    - `/dados/paginas/fatias?data_inicio=2024-06-10&dias_por_fatia=30` - cursores
+      iniciais de fatias do período, para percorrer em paralelo
+    """
+    
+    try:
+        if cursor is None:
+            if data_inicio is None:
+                raise HTTPException(status_code=400, detail="Informe data_inicio ou cursor")
+            if data_fim is None:
+                data_fim = date.today()
+            _validar_periodo(data_inicio, data_fim)
+            cursor = cursor_inicial(data_inicio, data_fim, tabela, seed).codificar()
+        else:
+            # A tabela (assim como o período e a seed) vem do cursor
+            tabela = Cursor.decodificar(cursor).tabela
+        
+        with duracao_etapa.cronometrar(etapa="geracao"):
+            registros, proximo_cursor = await executor.executar(gerar_pagina, cursor=cursor, limite=limite)
+        
+        with duracao_etapa.cronometrar(etapa="serializacao"):
+            corpo = serializar_json({
+                "tabela": tabela,
+                "dados": registros,
+                "paginacao": {
+                    "cursor": cursor,
+                    "proximo_cursor": proximo_cursor,
+                    "limite": limite,
+                    "registros": len(registros)
+                },
+                "api_info": {
+                    "gerado_em": datetime.now().isoformat(),
+                    "endpoint": "/dados/paginas"
+                }
+            })
+        registrar_linhas({f"total_{tabela}": len(registros)})
+        return await _responder_json(corpo, None, accept_encoding)
+        
+    except HTTPException:
+        raise
+    except CursorInvalido as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorSaturado as e:
+        # Fila cheia: o cliente deve reduzir o ritmo e tentar de novo
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except ExecutorIndisponivel as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Erro interno do servidor: {str(e)}"
+        )
+
+@app.get("/dados/paginas/fatias", summary="Cursores iniciais de fatias de um período")
+async def get_fatias_paginas(
+    data_inicio: date = Query(
+        ...,
+        description="Data de início do período (YYYY-MM-DD)",
+        example="2024-06-10"
+    ),
+    data_fim: Optional[date] = Query(
+        default=None,
+        description="Data de fim do período (YYYY-MM-DD). Se não informada, usa data atual"
+    ),
+    tabela: str = Query(
+        default="pedidos",
+        pattern="^(cadastros|pedidos)$",
+        description="Tabela paginada"
+    ),
+    dias_por_fatia: int = Query(
+        default=30,
+        ge=1,
+        description="Dias de cada fatia"
+    ),
+    seed: Optional[int] = Query(
+        default=None,
+        description="Seed dos dias (padrão: API_SEED_PARTICOES)"
+    )
+) -> Dict[str, Any]:
+    """
+    Divide o período em fatias independentes, cada uma com o cursor da sua
+    primeira página em /dados/paginas (ex.: uma task do Airflow por fatia).
+    """
+    if data_fim is None:
+        data_fim = date.today()
+    _validar_periodo(data_inicio, data_fim)
+    
+    return {
+        "tabela": tabela,
+        "fatias": fatiar_periodo(data_inicio, data_fim, tabela, dias_por_fatia, seed)
+    }
+
+@app.get("/dados/mudancas", summary="Mudanças de status dos pedidos (CDC)")
+async def get_dados_mudancas(
+    desde: Optional[datetime] = Query(
+        default=None,
+        description="Eventos com updated_at depois deste instante (YYYY-MM-DDTHH:MM:SS); obrigatório sem cursor",
+        example="2025-06-20T00:00:00"
+    ),
+    ate: Optional[datetime] = Query(
+        default=None,
+        description="Eventos com updated_at até este instante. Se não informado (ou futuro), usa o instante atual; "
+                    "limitado a API_MUDANCAS_JANELA_DIAS dias depois de desde"
+    ),
+    seed: Optional[int] = Query(
+        default=None,
+        description="Seed dos dias (padrão: API_SEED_PARTICOES, a mesma das partições)"
+    ),
+    limite: int = Query(
+        default=1000,
+        ge=1,
+        le=PAGINA_MAX,
+        description="Eventos por página"
+    ),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Cursor devolvido em proximo_cursor; substitui desde, ate e seed"
+    ),
+    accept_encoding: Optional[str] = Header(default=None, include_in_schema=False)
+) -> Dict[str, Any]:
+    """
+    Feed de mudanças (change data capture) dos pedidos, para exercitar os
+    modelos incrementais com update/merge.
+    
+    Cada pedido nasce `pendente` (evento `insert`) e muda de status ao longo
+    dos dias seguintes (eventos `update`: pago, enviado, entregue ou
+    cancelado). Cada evento é o pedido completo após a mudança, com
+    `operacao`, `updated_at` e `status_anterior`. Os eventos saem por dia de
+    criação do pedido e, dentro do dia, em ordem de `updated_at`, então os
+    de cada pedido chegam em ordem (basta um MERGE por `id_pedido`).
+    Os pedidos são os das partições (mesma seed), e o status gravado nas
+    partições é o deste ciclo de vida no fim do dia; nenhuma mudança acontece
+    depois de `DIAS_CICLO_MAX` dias da criação.
+    
+    **Uso incremental:** a janela vai de `desde` até `ate`, limitada a
+    `API_MUDANCAS_JANELA_DIAS` dias, e sai em páginas de `limite` eventos.
+    Siga `proximo_cursor` até ele ser `null`; depois passe `proximo_desde`
+    como `desde` na próxima chamada. Nenhum evento se repete nem é perdido.
+    """
+    agora = datetime.now()
+    try:
+        if cursor is None:
+            if desde is None:
+                raise HTTPException(status_code=400, detail="Informe desde ou cursor")
+            # Instantes com fuso são convertidos para o horário local, como os gerados
+            desde, ate = [
+                instante.astimezone().replace(tzinfo=None) if instante is not None and instante.tzinfo else instante
+                for instante in (desde, ate)
+            ]
+            ate = agora if ate is None else min(ate, agora)
+            if desde >= ate:
+                raise HTTPException(status_code=400, detail="desde deve ser anterior a ate e ao instante atual")
+            cursor = cursor_mudancas(desde, ate, seed).codificar()
+        
+        with duracao_etapa.cronometrar(etapa="geracao"):
+            mudancas, proximo_cursor, janela = await executor.executar(pagina_mudancas, cursor=cursor, limite=limite)
+        
+        with duracao_etapa.cronometrar(etapa="serializacao"):
+            corpo = serializar_json({
+                "periodo": janela,
+                "proximo_desde": janela["ate"],
+                "dias_ciclo_max": DIAS_CICLO_MAX,
+                "mudancas": mudancas,
+                "paginacao": {
+                    "cursor": cursor,
+                    "proximo_cursor": proximo_cursor,
+                    "limite": limite,
+                    "registros": len(mudancas)
+                },
+                "api_info": {
+                    "gerado_em": agora.isoformat(),
+                    "endpoint": "/dados/mudancas"
+                }
+            })
+        registrar_linhas({"total_pedidos": len(mudancas)})
+        return await _responder_json(corpo, None, accept_encoding)
+        
+    except HTTPException:
+        raise
+    except CursorInvalido as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorSaturado as e:
+        # Fila cheia: o cliente deve reduzir o ritmo e tentar de novo
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except ExecutorIndisponivel as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Erro interno do servidor: {str(e)}"
+        )
+
+@app.post("/jobs", status_code=202, summary="Iniciar geração em segundo plano")
+async def criar_job(especificacao: EspecificacaoJob, response: Response) -> Dict[str, Any]:
+    """
+    Enfileira uma geração grande (período, volumes por dia, seed, formato e sink),
+    executada fora da requisição. Acompanhe em `GET /jobs/{id}`.
+    
+    **Destino:**
+    - `formato=csv`: partições `data=YYYY-MM-DD/` no volume de seeds (dias já
+      gravados são pulados, como em `particionado=true`)
+    - `formato=parquet` ou `ndjson`: um arquivo por tabela em `seeds/jobs/{id}/`
+    - `sink=postgres`: tabelas raw do Postgres com `COPY`, sem arquivos
+    
+    Os jobs dividem um pool de processos e um orçamento de memória globais
+    (`API_JOBS_PROCESSOS`, `API_JOBS_MEMORIA_MB`); até `API_JOBS_SIMULTANEOS`
+    executam ao mesmo tempo e os demais aguardam na fila.
+    """
+    data_fim = especificacao.data_fim or date.today()
+    _validar_periodo(especificacao.data_inicio, data_fim)
+    
+    job = gerenciador_jobs.criar(especificacao)
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job.status()
+
+@app.get("/jobs", summary="Listar jobs")
+async def listar_jobs() -> Dict[str, Any]:
+    """Jobs na fila, em execução e os encerrados mais recentes."""
+    return {"jobs": [job.status() for job in gerenciador_jobs.listar()], **gerenciador_jobs.status()}
+
+@app.get("/jobs/{id_job}", summary="Estado e progresso de um job")
+async def obter_job(id_job: str) -> Dict[str, Any]:
+    """Estado, linhas geradas, linhas/s, ETA e arquivos gravados."""
+    job = gerenciador_jobs.obter(id_job)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job não encontrado: {id_job}")
+    return job.status()
+
+@app.delete("/jobs/{id_job}", summary="Cancelar um job")
+async def cancelar_job(id_job: str) -> Dict[str, Any]:
+    """
+    Cancela o job: se ainda estiver na fila, não chega a executar; em execução,
+    para depois do dia atual (os dias já gravados ficam).
+    """
+    job = gerenciador_jobs.cancelar(id_job)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job não encontrado: {id_job}")
+    return job.status()
+
+@app.get("/eventos/stream", summary="Stream de eventos em tempo real (SSE)")
+async def stream_eventos(
+    taxa: int = Query(
+        default=100,
+        ge=1,
+        le=TAXA_MAX,
+        description="Taxa alvo em eventos por segundo"
+    ),
+    eventos_por_quadro: Optional[int] = Query(
+        default=None,
+        ge=1,
+        le=TAXA_MAX,
+        description="Eventos por mensagem (padrão: taxa / 20, ou seja, ~20 mensagens por segundo)"
+    ),
+    duracao: Optional[float] = Query(
+        default=None,
+        gt=0,
+        description="Encerra após estes segundos (padrão: até o cliente desconectar)"
+    ),
+    max_eventos: Optional[int] = Query(
+        default=None,
+        ge=1,
+        description="Encerra após este número de eventos"
+    ),
+    seed: Optional[int] = Query(
+        default=None,
+        description="Seed do gerador (padrão: aleatória)"
     )
+):
+    """
+    Emite cadastros, pedidos e mudanças de status de pedidos continuamente, no
+    ritmo da taxa alvo (balde de fichas), em Server-Sent Events.
+    
+    **Mensagens:**
+    - `event: eventos`: `{"sequencia", "eventos": [{"tipo", "instante", "dados"}]}`,
+      com `tipo` cadastro, pedido ou status_pedido
+    - `event: estatisticas`: a cada segundo e no fim, eventos
+      enviados, taxa obtida (total e no último intervalo) e atraso em relação ao ritmo alvo
+    
+    Eventos e atraso também vão para `/metrics` (`dw_api_stream_*`).
+    """
+    async def corpo():
+        async for tipo, dados in emitir(taxa, eventos_por_quadro, duracao, max_eventos, seed):
+            yield formatar_sse(tipo, dados)
+    
+    return StreamingResponse(
+        corpo(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/eventos/ws")
+async def websocket_eventos(
+    websocket: WebSocket,
+    taxa: int = Query(default=100, ge=1, le=TAXA_MAX),
+    eventos_por_quadro: Optional[int] = Query(default=None, ge=1, le=TAXA_MAX),
+    duracao: Optional[float] = Query(default=None, gt=0),
+    max_eventos: Optional[int] = Query(default=None, ge=1),
+    seed: Optional[int] = Query(default=None)
+):
+    """Os mesmos eventos de /eventos/stream por WebSocket: cada mensagem é `{"tipo": ..., **dados}`."""
+    await websocket.accept()
+    try:
+        async for tipo, dados in emitir(taxa, eventos_por_quadro, duracao, max_eventos, seed):
+            await websocket.send_text(serializar_json({"tipo": tipo, **dados}).decode())
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
 
 @app.get("/health", summary="Verificação de saúde da API")
 async def health_check():
@@ -185,9 +904,22 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "message": "API funcionando corretamente"
+        "message": "API funcionando corretamente",
+        "executor": executor.status(),
+        "cache": cache_respostas.status(),
+        "postgres": carregador_postgres.status(),
+        "sink": {"modo": API_SINK, "postgres": sink_postgres.status()},
+        "jobs": gerenciador_jobs.status()
     }
 
+@app.get("/metrics", summary="Métricas no formato Prometheus")
+async def metrics():
+    """Latência por endpoint, duração das etapas, linhas geradas e fila do executor."""
+    return Response(
+        content=registro_metricas.exportar(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 # Função para executar a API
 def run_api(host: str = "0.0.0.0", port: int = 8000, reload: bool = True):
     """Executa a API FastAPI."""
@@ -0,0 +1,85 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+# Limites do cache de respostas (variáveis de ambiente do docker-compose)
+CACHE_MAX_ITENS = int(os.getenv("API_CACHE_ITENS", 256))
+CACHE_MAX_MB = int(os.getenv("API_CACHE_MB", 64))
+
+class CacheRespostas:
+    """
+    Cache LRU em memória de respostas já serializadas.
+
+    Cada entrada guarda o corpo (bytes) e o ETag calculado sobre ele. As
+    entradas menos usadas são descartadas quando o número de itens ou o
+    total de bytes passa do limite.
+    """
+
+    def __init__(self, max_itens: int = CACHE_MAX_ITENS, max_bytes: int = CACHE_MAX_MB * 1024 * 1024):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.descartes = 0
+
+    @staticmethod
+    def calcular_etag(corpo: bytes) -> str:
+        return '"' + hashlib.sha256(corpo).hexdigest()[:32] + '"'
+
+    def obter(self, chave: Hashable) -> Optional[Tuple[bytes, str]]:
+        """Retorna (corpo, etag) da chave, ou None. Conta hit/miss."""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return entrada
+
+    def guardar(self, chave: Hashable, corpo: bytes) -> str:
+        """Guarda o corpo na chave e retorna o ETag."""
+        etag = self.calcular_etag(corpo)
+
+        # Respostas maiores que o cache inteiro não são guardadas
+        if len(corpo) > self.max_bytes:
+            return etag
+
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior[0])
+
+            self._entradas[chave] = (corpo, etag)
+            self._bytes += len(corpo)
+
+            while len(self._entradas) > self.max_itens or self._bytes > self.max_bytes:
+                _, (corpo_antigo, _) = self._entradas.popitem(last=False)
+                self._bytes -= len(corpo_antigo)
+                self.descartes += 1
+
+        return etag
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "itens": len(self._entradas),
+                "bytes": self._bytes,
+                "max_itens": self.max_itens,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "descartes": self.descartes
+            }
+
+cache_respostas = CacheRespostas()
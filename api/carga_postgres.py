@@ -0,0 +1,180 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List
+
+import pandas as pd
+
+from esquemas import ESQUEMAS, colunas, colunas_sql, dataframe_tipado
+
+# Conexão com o Postgres do docker-compose (as mesmas variáveis do serviço dw-api).
+# Fora do container, o padrão é a porta exposta no host (5433, como no profiles.yml).
+POSTGRES_HOST = os.getenv("DB_HOST", "localhost")
+POSTGRES_PORT = int(os.getenv("DB_PORT", 5433))
+POSTGRES_DB = os.getenv("DB_NAME", "dbt_db")
+POSTGRES_USUARIO = os.getenv("DBT_USER")
+POSTGRES_SENHA = os.getenv("DBT_PASSWORD")
+POSTGRES_SCHEMA = os.getenv("POSTGRES_SCHEMA_RAW", "raw")
+POSTGRES_POOL_MAX = int(os.getenv("POSTGRES_POOL_MAX", 4))
+
+# Bytes pedidos ao fluxo CSV a cada leitura do COPY
+TAMANHO_LEITURA_COPY = 1024 * 1024
+
+def sql_criar_tabelas(schema: str) -> List[str]:
+    """Comandos que criam o schema e as tabelas raw a partir do registro de esquemas."""
+    comandos = [f"CREATE SCHEMA IF NOT EXISTS {schema}"]
+    for tabela in ESQUEMAS:
+        comandos.append(f"CREATE TABLE IF NOT EXISTS {schema}.{tabela} ({colunas_sql(tabela)})")
+    return comandos
+
+def csv_para_copy(tabela: str, df: pd.DataFrame) -> bytes:
+    """Lote em CSV sem cabeçalho, na ordem de colunas do registro (formato do COPY)."""
+    return df[colunas(tabela)].to_csv(index=False, header=False).encode("utf-8")
+
+class FluxoCsv:
+    """
+    Arquivo somente leitura sobre um iterador de pedaços CSV (bytes).
+
+    O COPY FROM STDIN lê deste objeto, de modo que cada lote é convertido
+    para CSV só quando o Postgres pede mais dados, sem montar o arquivo
+    inteiro em memória.
+    """
+
+    def __init__(self, pedacos: Iterable[bytes]):
+        self._pedacos = iter(pedacos)
+        self._atual = b""
+        self._posicao = 0
+
+    def read(self, tamanho: int = -1) -> bytes:
+        while self._posicao >= len(self._atual):
+            self._atual = next(self._pedacos, None)
+            self._posicao = 0
+            if self._atual is None:
+                self._atual = b""
+                return b""
+
+        if tamanho is None or tamanho < 0:
+            tamanho = len(self._atual) - self._posicao
+        dados = self._atual[self._posicao:self._posicao + tamanho]
+        self._posicao += len(dados)
+        return dados
+
+class CarregadorPostgres:
+    """
+    Carrega lotes de cadastros e pedidos em tabelas raw do Postgres com
+    COPY FROM STDIN (CSV), usando conexões de um pool.
+
+    As tabelas são criadas a partir do registro de esquemas, sem restrições,
+    no schema POSTGRES_SCHEMA; a deduplicação fica para os modelos do dbt.
+    """
+
+    def __init__(self,
+                 host: str = POSTGRES_HOST,
+                 porta: int = POSTGRES_PORT,
+                 banco: str = POSTGRES_DB,
+                 usuario: str = POSTGRES_USUARIO,
+                 senha: str = POSTGRES_SENHA,
+                 schema: str = POSTGRES_SCHEMA,
+                 max_conexoes: int = POSTGRES_POOL_MAX):
+        self.parametros = {"host": host, "port": porta, "dbname": banco, "user": usuario, "password": senha}
+        self.schema = schema
+        self.max_conexoes = max_conexoes
+        self._pool = None
+        self._lock = threading.Lock()
+        self._tabelas_criadas = False
+        self.linhas_copiadas = {tabela: 0 for tabela in ESQUEMAS}
+
+    def _obter_pool(self):
+        """Cria o pool na primeira carga (psycopg2 só é importado aqui)."""
+        with self._lock:
+            if self._pool is None:
+                from psycopg2.pool import ThreadedConnectionPool
+                self._pool = ThreadedConnectionPool(1, self.max_conexoes, **self.parametros)
+            return self._pool
+
+    @contextmanager
+    def conexao(self):
+        """Conexão do pool numa transação: commit ao sair, rollback em caso de erro."""
+        pool = self._obter_pool()
+        con = pool.getconn()
+        try:
+            yield con
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        finally:
+            pool.putconn(con)
+
+    def encerrar(self):
+        """Fecha todas as conexões do pool."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+    def criar_tabelas(self):
+        """Cria o schema e as tabelas raw, se ainda não existirem."""
+        if self._tabelas_criadas:
+            return
+        with self.conexao() as con, con.cursor() as cur:
+            for comando in sql_criar_tabelas(self.schema):
+                cur.execute(comando)
+        self._tabelas_criadas = True
+
+    @staticmethod
+    def _pedacos_csv(tabela: str, lotes: Iterable[pd.DataFrame], contador: List[int]) -> Iterator[bytes]:
+        """Converte cada lote em CSV (sem cabeçalho, na ordem do registro), contando as linhas."""
+        for df in lotes:
+            if df.empty:
+                continue
+            contador[0] += len(df)
+            yield csv_para_copy(tabela, df)
+
+    def _copiar(self, cur, tabela: str, lotes: Iterable[pd.DataFrame]) -> int:
+        contador = [0]
+        cur.copy_expert(
+            f"COPY {self.schema}.{tabela} ({', '.join(colunas(tabela))}) FROM STDIN WITH (FORMAT csv)",
+            FluxoCsv(self._pedacos_csv(tabela, lotes, contador)),
+            size=TAMANHO_LEITURA_COPY
+        )
+        return contador[0]
+
+    def copiar_lotes(self, tabela: str, lotes: Iterable[pd.DataFrame], substituir: bool = False) -> int:
+        """
+        Copia os lotes (DataFrames) para a tabela raw num único COPY.
+
+        Com substituir=True, a tabela é esvaziada (TRUNCATE) na mesma transação.
+        Retorna o número de linhas copiadas.
+        """
+        self.criar_tabelas()
+        with self.conexao() as con, con.cursor() as cur:
+            if substituir:
+                cur.execute(f"TRUNCATE {self.schema}.{tabela}")
+            linhas = self._copiar(cur, tabela, lotes)
+        with self._lock:
+            self.linhas_copiadas[tabela] += linhas
+        return linhas
+
+    def copiar_dados(self, dados: Dict) -> Dict[str, int]:
+        """Copia o resultado de gerar_dados_periodo (cadastros e pedidos) numa única transação."""
+        self.criar_tabelas()
+        linhas = {}
+        with self.conexao() as con, con.cursor() as cur:
+            for tabela in ESQUEMAS:
+                linhas[tabela] = self._copiar(cur, tabela, [dataframe_tipado(dados['dados'][tabela], tabela)])
+        with self._lock:
+            for tabela, quantidade in linhas.items():
+                self.linhas_copiadas[tabela] += quantidade
+        return linhas
+
+    def status(self) -> dict:
+        return {
+            "host": self.parametros["host"],
+            "porta": self.parametros["port"],
+            "schema": self.schema,
+            "pool_aberto": self._pool is not None,
+            "linhas_copiadas": dict(self.linhas_copiadas)
+        }
+
+carregador_postgres = CarregadorPostgres()
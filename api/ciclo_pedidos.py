@@ -0,0 +1,107 @@
+"""
+Ciclo de vida do status dos pedidos.
+
+Cada pedido nasce "pendente" e passa por até três transições (pago ou
+cancelado, enviado ou cancelado, entregue), com intervalos exponenciais.
+O instante de criação e as transições são função só de (id_pedido,
+data_pedido): os sorteios saem de um hash do id (splitmix64), então o mesmo
+pedido tem o mesmo ciclo em qualquer lote, processo ou chamada. Assim o
+status gravado pelo gerador (status_em no fim do período gerado) e o feed de
+mudanças (mudancas.py) nunca se contradizem.
+
+Tudo é vetorizado em matrizes n x 3 do NumPy, sem laço em Python por pedido.
+"""
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from esquemas import STATUS_PEDIDO
+
+# Códigos (posição em STATUS_PEDIDO) usados nas matrizes de status
+PENDENTE, PAGO, ENVIADO, ENTREGUE, CANCELADO = (
+    STATUS_PEDIDO.index(status) for status in ('pendente', 'pago', 'enviado', 'entregue', 'cancelado')
+)
+NOMES_STATUS = np.array(STATUS_PEDIDO, dtype=object)
+
+# Horas médias até cada transição (pago, enviado, entregue) e chance de
+# cancelamento no lugar das duas primeiras
+HORAS_TRANSICOES = (6.0, 24.0, 72.0)
+CHANCE_CANCELAMENTO_PENDENTE = 0.1
+CHANCE_CANCELAMENTO_PAGO = 0.05
+
+# Transições depois de tantos dias da criação não acontecem: o pedido fica no
+# último status alcançado. Também é o quanto o feed volta para achar pedidos abertos
+DIAS_CICLO_MAX = 30
+
+# Posições dos dígitos hexadecimais num UUID formatado (sem os hífens)
+_POSICOES_HEX = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+_VALOR_HEX = np.zeros(256, dtype=np.uint64)
+for _valor, _caractere in enumerate(b'0123456789abcdef'):
+    _VALOR_HEX[_caractere] = _valor
+    _VALOR_HEX[bytes([_caractere]).upper()[0]] = _valor
+
+_OURO = np.uint64(0x9E3779B97F4A7C15)
+
+def _misturar(x: np.ndarray) -> np.ndarray:
+    """Finalizador do splitmix64 (multiplicações módulo 2**64)."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def sorteios_do_id(ids: Sequence[str], quantidade: int) -> np.ndarray:
+    """Matriz (n, quantidade) de uniformes em (0, 1) derivados de cada id_pedido (UUID)."""
+    caracteres = np.array(ids, dtype='S36').view(np.uint8).reshape(-1, 36)
+    digitos = _VALOR_HEX[caracteres[:, _POSICOES_HEX]]
+    pesos = np.uint64(16) ** np.arange(15, -1, -1, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        alto = (digitos[:, :16] * pesos).sum(axis=1, dtype=np.uint64)
+        baixo = (digitos[:, 16:] * pesos).sum(axis=1, dtype=np.uint64)
+        base = _misturar(alto ^ _misturar(baixo))
+        bits = _misturar(base[:, None] + _OURO * np.arange(1, quantidade + 1, dtype=np.uint64))
+    # 53 bits de mantissa, centrados no intervalo (nunca 0 nem 1)
+    return ((bits >> np.uint64(11)).astype(np.float64) + 0.5) / 2.0 ** 53
+
+def ciclo_de_vida(ids: Sequence[str], datas: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Instante de criação (uniforme dentro de data_pedido) e transições de status de cada pedido.
+
+    Returns:
+        (criados_em, momentos, destinos): criados_em em datetime64[s]; momentos
+        e destinos são matrizes (n, 3) com o instante de cada transição (NaT se
+        ela não acontece) e o código do status de destino
+    """
+    sorteios = sorteios_do_id(ids, 6)
+    criados_em = (
+        np.asarray(datas).astype('datetime64[D]').astype('datetime64[s]')
+        + (sorteios[:, 0] * 86_400).astype(np.int64).astype('timedelta64[s]')
+    )
+    segundos = (-np.log(sorteios[:, 1:4]) * np.array(HORAS_TRANSICOES) * 3600).astype(np.int64)
+
+    destinos = np.empty((len(criados_em), 3), dtype=np.int8)
+    destinos[:, 0] = np.where(sorteios[:, 4] < CHANCE_CANCELAMENTO_PENDENTE, CANCELADO, PAGO)
+    destinos[:, 1] = np.where(sorteios[:, 5] < CHANCE_CANCELAMENTO_PAGO, CANCELADO, ENVIADO)
+    destinos[:, 2] = ENTREGUE
+
+    # Cada transição só acontece se a anterior não levou a um status final
+    acontece = np.ones(destinos.shape, dtype=bool)
+    acontece[:, 1] = destinos[:, 0] == PAGO
+    acontece[:, 2] = acontece[:, 1] & (destinos[:, 1] == ENVIADO)
+
+    momentos = criados_em[:, None] + np.cumsum(segundos, axis=1).astype('timedelta64[s]')
+    acontece &= momentos <= (criados_em + np.timedelta64(DIAS_CICLO_MAX, 'D'))[:, None]
+    momentos[~acontece] = np.datetime64('NaT')
+    return criados_em, momentos, destinos
+
+def status_em(momentos: np.ndarray, destinos: np.ndarray, instante: np.datetime64) -> np.ndarray:
+    """Código do status de cada pedido no instante (pendente se nenhuma transição aconteceu até lá)."""
+    # As transições que acontecem são um prefixo de cada linha, em ordem de tempo
+    transicoes = (momentos <= instante).sum(axis=1)
+    return np.where(transicoes > 0, destinos[np.arange(len(destinos)), np.maximum(transicoes - 1, 0)], PENDENTE)
+
+def status_no_fim_do_dia(ids: Sequence[str], datas: np.ndarray, dia) -> np.ndarray:
+    """Nomes dos status no último segundo de `dia` (o estado de um extrato daquele dia)."""
+    if len(ids) == 0:
+        return np.array([], dtype=object)
+    _, momentos, destinos = ciclo_de_vida(ids, datas)
+    instante = np.datetime64(dia, 'D').astype('datetime64[s]') + np.timedelta64(86_399, 's')
+    return NOMES_STATUS[status_em(momentos, destinos, instante)]
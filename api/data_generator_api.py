@@ -1,14 +1,63 @@
-import numpy as np
-from faker import Faker
 import uuid
 import random
-import pandas as pd
-from datetime import datetime, date
-from typing import Dict, List, Optional
+import hashlib
+import shutil
+import tempfile
+from datetime import datetime, date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
 import json
+import logging
+import os
+import numpy as np
+
+from identificadores import alocar_cpfs, alocar_cpfs_periodo, capacidade_cpf_periodo
+from ciclo_pedidos import status_no_fim_do_dia
+from esquemas import GENEROS, UFS, dataframe_tipado
+from perfil_carga import PerfilCarga, carregar_perfil
+from vocabulario import Vocabulario, obter_vocabulario
+
+logger = logging.getLogger(__name__)
+
+# Perfil de carga (TOML) opcional: volumes por dia, sazonalidade das datas,
+# concentração de clientes e status por idade do pedido. Sem ele, os volumes
+# e as escolhas são uniformes, como antes.
+API_PERFIL_CARGA = os.getenv("API_PERFIL_CARGA")
+PERFIL_CARGA: Optional[PerfilCarga] = carregar_perfil(API_PERFIL_CARGA) if API_PERFIL_CARGA else None
+
+# Seed da geração particionada por dia quando a chamada não informa uma: cada
+# dia depende só de (seed, data), então reexecuções reproduzem as partições
+API_SEED_PARTICOES = int(os.getenv("API_SEED_PARTICOES", 42))
+
+# Pedidos por bloco no cálculo vetorizado do status (iterar_pedidos_periodo)
+LOTE_STATUS = 1024
+
+# Diretório das partições diárias (data=YYYY-MM-DD/), no volume de seeds
+PARTICOES_PATH = os.getenv("API_PARTICOES_PATH", "/app/seeds")
+
+def criar_geradores(seed: Optional[int] = None) -> Tuple[random.Random, Vocabulario]:
+    """
+    Cria o gerador de números de uma chamada de geração e obtém o vocabulário.
+    
+    Com seed, a saída depende apenas de (data_inicio, data_fim, seed). Sem
+    seed, a saída é aleatória. O vocabulário (nomes, cidades, logradouros e
+    bairros do Faker) é pré-gerado e só é lido: pode ser compartilhado entre
+    threads, e cada texto é sorteado com o gerador da chamada.
+    """
+    return random.Random(seed), obter_vocabulario()
 
-# Configurações iniciais
-fake = Faker('pt_BR')
+def _uuid(rng: random.Random) -> str:
+    """UUID versão 4 tirado do gerador da chamada (uuid.uuid4 não aceita seed)."""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def _data_entre(rng: random.Random, inicio: date, fim: date) -> date:
+    """Data uniforme entre `inicio` e `fim` (inclusive)."""
+    return inicio + timedelta(days=rng.randint(0, (fim - inicio).days))
+
+def _digitos(rng: random.Random, mascara: str) -> str:
+    """Preenche cada '#' da máscara com um dígito, como formatar_mascara no gerador colunar."""
+    quantidade = mascara.count('#')
+    digitos = iter(f"{rng.randrange(10 ** quantidade):0{quantidade}d}")
+    return ''.join(next(digitos) if caractere == '#' else caractere for caractere in mascara)
 
 def gerar_dados_periodo(
     data_inicio: str, 
@@ -27,27 +76,17 @@ def gerar_dados_periodo(
         dict: Dados gerados com cadastros e pedidos
     """
     
-    # Configurar seed se fornecido
-    if seed is not None:
-        random.seed(seed)
-        np.random.seed(seed)
-        # fake.seed_instance(seed)  
-    
-    # Volumes randomizados (mais realista)
-    total_cadastros = random.randint(2, 20)
-    total_pedidos = random.randint(40, 90)
-    
-    print(f"Gerando dados para período {data_inicio} a {data_fim}")
-    print(f"Volumes: {total_cadastros} cadastros, {total_pedidos} pedidos")
+    rng, vocabulario = criar_geradores(seed)
+    total_cadastros, total_pedidos = sortear_volumes(data_inicio, data_fim, rng)
     
     # Gerar cadastros
-    cadastros_data = gerar_cadastros_periodo(data_inicio, data_fim, total_cadastros)
+    cadastros_data = gerar_cadastros_periodo(data_inicio, data_fim, total_cadastros, rng, vocabulario)
     
     # Extrair CPFs para gerar pedidos
     cpfs = [cadastro['cpf'] for cadastro in cadastros_data]
     
     # Gerar pedidos (pode usar CPFs existentes + alguns dos novos cadastros)
-    pedidos_data = gerar_pedidos_periodo(data_inicio, data_fim, total_pedidos, cpfs)
+    pedidos_data = gerar_pedidos_periodo(data_inicio, data_fim, total_pedidos, cpfs, rng, vocabulario)
     
     return {
         "periodo": {
@@ -65,89 +104,238 @@ def gerar_dados_periodo(
         }
     }
 
-def gerar_cadastros_periodo(data_inicio: str, data_fim: str, quantidade: int) -> List[Dict]:
+def sortear_volumes(data_inicio: str, data_fim: str, rng: random.Random) -> Tuple[int, int]:
+    """
+    Sorteia os volumes de cadastros e pedidos.
+    
+    Com PERFIL_CARGA, os volumes são proporcionais aos dias do período e à
+    sazonalidade do perfil (Poisson dia a dia); sem ele, são fixos por chamada.
+    """
+    
+    if PERFIL_CARGA is not None:
+        inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+        fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
+        rng_volumes = np.random.default_rng(rng.getrandbits(64))
+        total_cadastros = PERFIL_CARGA.sortear_volume(rng_volumes, 'cadastros', inicio, fim)
+        total_pedidos = PERFIL_CARGA.sortear_volume(rng_volumes, 'pedidos', inicio, fim)
+    else:
+        # Volumes randomizados (mais realista)
+        total_cadastros = rng.randint(2, 20)
+        total_pedidos = rng.randint(40, 90)
+    
+    logger.debug("Gerando dados para período %s a %s: %d cadastros, %d pedidos",
+                 data_inicio, data_fim, total_cadastros, total_pedidos)
+    
+    return total_cadastros, total_pedidos
+
+def iterar_dados_periodo(
+    data_inicio: str,
+    data_fim: str,
+    seed: Optional[int] = None
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    Versão em streaming de gerar_dados_periodo.
+    
+    Produz tuplas (tabela, registro) à medida que os registros são gerados:
+    primeiro os cadastros, depois os pedidos e, por último, uma tupla
+    ('estatisticas', {...}) com os mesmos totais de gerar_dados_periodo.
+    """
+    rng, vocabulario = criar_geradores(seed)
+    total_cadastros, total_pedidos = sortear_volumes(data_inicio, data_fim, rng)
+    
+    # Apenas os CPFs ficam em memória (necessários para os pedidos)
+    cpfs = []
+    for cadastro in iterar_cadastros_periodo(data_inicio, data_fim, total_cadastros, rng, vocabulario):
+        cpfs.append(cadastro['cpf'])
+        yield 'cadastros', cadastro
+    
+    gerados_pedidos = 0
+    for pedido in iterar_pedidos_periodo(data_inicio, data_fim, total_pedidos, cpfs, rng, vocabulario):
+        gerados_pedidos += 1
+        yield 'pedidos', pedido
+    
+    yield 'estatisticas', {
+        "total_cadastros": total_cadastros,
+        "total_pedidos": gerados_pedidos,
+        "cpfs_disponiveis": len(cpfs)
+    }
+
+def gerar_cadastros_periodo(
+    data_inicio: str,
+    data_fim: str,
+    quantidade: int,
+    rng: Optional[random.Random] = None,
+    vocabulario: Optional[Vocabulario] = None
+) -> List[Dict]:
     """Gera cadastros para o período especificado."""
-    cadastros = []
-    cpfs_gerados = set()
-    
-    for _ in range(quantidade):
-        # Gerar CPF único
-        tentativas = 0
-        while tentativas < 100:  # Evitar loop infinito
-            cpf = fake.bothify(text='###.###.###-##')
-            if cpf not in cpfs_gerados:
-                cpfs_gerados.add(cpf)
-                break
-            tentativas += 1
-        
+    return list(iterar_cadastros_periodo(data_inicio, data_fim, quantidade, rng, vocabulario))
+
+def iterar_cadastros_periodo(
+    data_inicio: str,
+    data_fim: str,
+    quantidade: int,
+    rng: Optional[random.Random] = None,
+    vocabulario: Optional[Vocabulario] = None
+) -> Iterator[Dict]:
+    """Gera cadastros para o período especificado, um por vez."""
+    if rng is None or vocabulario is None:
+        rng, vocabulario = criar_geradores()
+    
+    inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+    fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
+    
+    # CPFs válidos e distintos, sorteados de uma vez (sem tentativas) dos
+    # blocos reservados aos dias do período: partições de dias diferentes não
+    # repetem CPF
+    rng_np = np.random.default_rng(rng.getrandbits(64))
+    if quantidade <= capacidade_cpf_periodo(inicio, fim):
+        _, cpfs = alocar_cpfs_periodo(rng_np, quantidade, inicio, fim)
+    else:
+        logger.warning("%d cadastros não cabem nos blocos de CPF de %s a %s; sorteando no espaço inteiro",
+                       quantidade, data_inicio, data_fim)
+        _, cpfs = alocar_cpfs(rng_np, quantidade)
+    
+    # Com perfil de carga, as datas de cadastro seguem a sazonalidade
+    datas_cadastro = None
+    if PERFIL_CARGA is not None:
+        datas_cadastro = PERFIL_CARGA.sortear_datas(rng_np, inicio, fim, quantidade)
+        datas_cadastro = datas_cadastro.astype('datetime64[D]').astype(str)
+    
+    for indice, cpf in enumerate(cpfs.tolist()):
         cadastro = {
-            'id': str(uuid.uuid4()),
-            'nome': fake.name(),
-            'data_nascimento': fake.date_of_birth(minimum_age=18, maximum_age=90).isoformat(),
+            'id': _uuid(rng),
+            'nome': vocabulario.escolher('nomes', rng),
+            # Idade entre 18 e 90 anos na data de fim do período (e não na data
+            # de hoje), para que a saída não mude de um dia para o outro
+            'data_nascimento': _data_entre(
+                rng,
+                fim - timedelta(days=int(91 * 365.25) - 1),
+                fim - timedelta(days=int(18 * 365.25))
+            ).isoformat(),
             'cpf': cpf,
-            'cep': fake.postcode(),
-            'cidade': fake.city(),
-            'estado': fake.state_abbr(),
+            'cep': _digitos(rng, '########'),
+            'cidade': vocabulario.escolher('cidades', rng),
+            'estado': rng.choice(UFS),
             'pais': 'Brasil',
-            'genero': random.choice(['M', 'F']),
-            'telefone': fake.phone_number(),
+            'genero': rng.choice(GENEROS),
+            'telefone': _digitos(rng, '+55 ## ####-####'),
             'email': f"{cpf.replace('.', '').replace('-', '')}@exemplo.com.br",
-            'data_cadastro': fake.date_between(
-                start_date=datetime.strptime(data_inicio, '%Y-%m-%d').date(),
-                end_date=datetime.strptime(data_fim, '%Y-%m-%d').date()
-            ).isoformat()
+            'data_cadastro': (
+                _data_entre(rng, inicio, fim).isoformat() if datas_cadastro is None
+                else datas_cadastro[indice]
+            )
         }
-        cadastros.append(cadastro)
-    
-    return cadastros
+        yield cadastro
 
-def gerar_pedidos_periodo(data_inicio: str, data_fim: str, quantidade: int, cpfs_disponiveis: List[str]) -> List[Dict]:
+def gerar_pedidos_periodo(
+    data_inicio: str,
+    data_fim: str,
+    quantidade: int,
+    cpfs_disponiveis: List[str],
+    rng: Optional[random.Random] = None,
+    vocabulario: Optional[Vocabulario] = None
+) -> List[Dict]:
     """Gera pedidos para o período especificado."""
-    pedidos = []
-    
-    # Se não temos CPFs suficientes, gerar alguns extras
-    if len(cpfs_disponiveis) < quantidade // 2:
-        cpfs_extras = []
-        for _ in range(quantidade // 2):
-            cpf_extra = fake.bothify(text='###.###.###-##')
-            cpfs_extras.append(cpf_extra)
-        cpfs_disponiveis.extend(cpfs_extras)
-    
-    for _ in range(quantidade):
-        # Selecionar CPF aleatório
-        cpf = random.choice(cpfs_disponiveis)
+    return list(iterar_pedidos_periodo(data_inicio, data_fim, quantidade, cpfs_disponiveis, rng, vocabulario))
+
+def iterar_pedidos_periodo(
+    data_inicio: str,
+    data_fim: str,
+    quantidade: int,
+    cpfs_disponiveis: List[str],
+    rng: Optional[random.Random] = None,
+    vocabulario: Optional[Vocabulario] = None
+) -> Iterator[Dict]:
+    """
+    Gera pedidos para o período especificado, um por vez.
+    
+    Os pedidos só referenciam CPFs de `cpfs_disponiveis` (cadastros existentes);
+    sem CPFs disponíveis, nenhum pedido é gerado. Com PERFIL_CARGA, clientes
+    e datas são sorteados de uma vez conforme o perfil.
+    
+    O status é o do ciclo de vida do pedido (ciclo_pedidos.py) no fim da
+    data de fim do período, o mesmo que o feed de mudanças dá ao pedido
+    naquele instante; por isso os pedidos saem em blocos de LOTE_STATUS,
+    com o status calculado de uma vez para o bloco.
+    """
+    if rng is None or vocabulario is None:
+        rng, vocabulario = criar_geradores()
+    
+    inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+    fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
+    
+    if not cpfs_disponiveis:
+        return
+    
+    perfil = PERFIL_CARGA
+    if perfil is not None:
+        rng_np = np.random.default_rng(rng.getrandbits(64))
+        pesos = perfil.pesos_clientes(rng_np, len(cpfs_disponiveis))
+        indices_cpf = perfil.sortear_clientes(rng_np, pesos, quantidade)
+        datas_pedido = perfil.sortear_datas(rng_np, inicio, fim, quantidade).astype('datetime64[D]')
+        datas_pedido = datas_pedido.astype(str)
+    
+    bloco = []
+    for indice in range(quantidade):
+        # Selecionar CPF aleatório (ou conforme a concentração de clientes do perfil)
+        cpf = rng.choice(cpfs_disponiveis) if perfil is None else cpfs_disponiveis[indices_cpf[indice]]
         
         # Gerar dados do pedido
-        valor_total = round(random.uniform(50, 2000), 2)
-        tem_desconto = random.random() < 0.2  # 20% de chance de ter desconto
-        valor_desconto = round(valor_total * random.uniform(0.05, 0.2), 2) if tem_desconto else 0.0
+        valor_total = round(rng.uniform(50, 2000), 2)
+        tem_desconto = rng.random() < 0.2  # 20% de chance de ter desconto
+        valor_desconto = round(valor_total * rng.uniform(0.05, 0.2), 2) if tem_desconto else 0.0
         
         # Gerar cupom se houver desconto
-        cupom = f"CUPOM{str(uuid.uuid4())[:8].upper()}" if tem_desconto else None
+        cupom = f"CUPOM{_uuid(rng)[:8].upper()}" if tem_desconto else None
         
         pedido = {
-            'id_pedido': str(uuid.uuid4()),
+            'id_pedido': _uuid(rng),
             'cpf': cpf,
             'valor_pedido': valor_total,
-            'valor_frete': round(random.uniform(5, 100), 2),
+            'valor_frete': round(rng.uniform(5, 100), 2),
             'valor_desconto': valor_desconto,
             'cupom': cupom,
-            'endereco_entrega_logradouro': fake.street_name(),
-            'endereco_entrega_numero': fake.building_number(),
-            'endereco_entrega_bairro': fake.neighborhood(),
-            'endereco_entrega_cidade': fake.city(),
-            'endereco_entrega_estado': fake.state_abbr(),
+            'endereco_entrega_logradouro': vocabulario.escolher('logradouros', rng),
+            'endereco_entrega_numero': str(rng.randrange(1, 10 ** rng.randint(1, 4))),
+            'endereco_entrega_bairro': vocabulario.escolher('bairros', rng),
+            'endereco_entrega_cidade': vocabulario.escolher('cidades', rng),
+            'endereco_entrega_estado': rng.choice(UFS),
             'endereco_entrega_pais': 'Brasil',
-            'status_pedido': random.choice(['pendente', 'pago', 'enviado', 'entregue', 'cancelado']),
-            'data_pedido': fake.date_between(
-                start_date=datetime.strptime(data_inicio, '%Y-%m-%d').date(),
-                end_date=datetime.strptime(data_fim, '%Y-%m-%d').date()
-            ).isoformat()
+            'status_pedido': None,
+            'data_pedido': (
+                _data_entre(rng, inicio, fim).isoformat() if perfil is None
+                else datas_pedido[indice]
+            )
         }
-        pedidos.append(pedido)
-    
+        bloco.append(pedido)
+        if len(bloco) == LOTE_STATUS or indice == quantidade - 1:
+            yield from _com_status(bloco, fim)
+            bloco = []
+
+def _com_status(pedidos: List[Dict], fim: date) -> List[Dict]:
+    """Preenche status_pedido com o status de cada pedido no fim do dia `fim`."""
+    status = status_no_fim_do_dia(
+        [pedido['id_pedido'] for pedido in pedidos],
+        np.array([pedido['data_pedido'] for pedido in pedidos], dtype='datetime64[D]'),
+        fim
+    )
+    for pedido, nome in zip(pedidos, status.tolist()):
+        pedido['status_pedido'] = nome
     return pedidos
 
+def ler_high_water_mark(caminho: str = "/app/seeds/watermark.json") -> Optional[date]:
+    """
+    Lê a maior data já consolidada, gravada pelo SeedsConsolidator (modo incremental).
+    
+    Returns:
+        date ou None, se o arquivo ainda não existe ou não tem high-water mark
+    """
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho) as arquivo:
+        marca = json.load(arquivo).get("high_water_mark")
+    return date.fromisoformat(marca) if marca else None
+
 def salvar_dados_csv(dados: Dict, pasta_destino: str = "/app/seeds") -> Dict[str, str]:
     """
     Salva os dados gerados em arquivos CSV para integração com dbt.
@@ -159,64 +347,34 @@ def salvar_dados_csv(dados: Dict, pasta_destino: str = "/app/seeds") -> Dict[str
     Returns:
         dict: Caminhos dos arquivos gerados
     """
-    import os
-    
-    # DEBUG: Print do diretório atual e destino
-    print(f"=== DEBUG PATHS ===")
-    print(f"Diretório atual de trabalho: {os.getcwd()}")
-    print(f"Pasta destino configurada: {pasta_destino}")
-    print(f"Pasta destino absoluta: {os.path.abspath(pasta_destino)}")
-    
-    # Verificar se a pasta existe
-    if os.path.exists(pasta_destino):
-        print(f"✅ Pasta destino existe!")
-        print(f"Conteúdo atual da pasta: {os.listdir(pasta_destino)}")
-    else:
-        print(f"❌ Pasta destino NÃO existe! Tentando criar...")
+    # Detalhes do destino só quando o log DEBUG está ligado (listdir custa uma
+    # varredura do diretório a cada chamada)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Pasta destino: %s (absoluta: %s, cwd: %s)",
+                     pasta_destino, os.path.abspath(pasta_destino), os.getcwd())
+        if os.path.exists(pasta_destino):
+            logger.debug("Conteúdo atual da pasta: %s", os.listdir(pasta_destino))
     
-    # Criar pasta se não existir
-    try:
-        os.makedirs(pasta_destino, exist_ok=True)
-        print(f"✅ Pasta criada/verificada com sucesso!")
-    except Exception as e:
-        print(f"❌ Erro ao criar pasta: {e}")
+    os.makedirs(pasta_destino, exist_ok=True)
     
-    # Converter para DataFrames
-    df_cadastros = pd.DataFrame(dados['dados']['cadastros'])
-    df_pedidos = pd.DataFrame(dados['dados']['pedidos'])
+    # Converter para DataFrames com as colunas e tipos do registro de esquemas
+    df_cadastros = dataframe_tipado(dados['dados']['cadastros'], 'cadastros')
+    df_pedidos = dataframe_tipado(dados['dados']['pedidos'], 'pedidos')
     
     # Gerar nomes de arquivo com timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     arquivo_cadastros = os.path.join(pasta_destino, f"cadastros_api_{timestamp}.csv")
     arquivo_pedidos = os.path.join(pasta_destino, f"pedidos_api_{timestamp}.csv")
     
-    print(f"Tentando salvar:")
-    print(f"- Cadastros em: {arquivo_cadastros}")
-    print(f"- Pedidos em: {arquivo_pedidos}")
-    
     # Salvar CSVs
     try:
         df_cadastros.to_csv(arquivo_cadastros, index=False)
-        print(f"✅ Cadastros salvos com sucesso!")
-        
         df_pedidos.to_csv(arquivo_pedidos, index=False)
-        print(f"✅ Pedidos salvos com sucesso!")
-        
-        # Verificar se os arquivos realmente foram criados
-        if os.path.exists(arquivo_cadastros):
-            print(f"✅ Arquivo cadastros confirmado: {os.path.getsize(arquivo_cadastros)} bytes")
-        else:
-            print(f"❌ Arquivo cadastros NÃO encontrado!")
-            
-        if os.path.exists(arquivo_pedidos):
-            print(f"✅ Arquivo pedidos confirmado: {os.path.getsize(arquivo_pedidos)} bytes")
-        else:
-            print(f"❌ Arquivo pedidos NÃO encontrado!")
-            
-    except Exception as e:
-        print(f"❌ Erro ao salvar arquivos: {e}")
-    
-    print(f"=== FIM DEBUG ===")
+    except Exception:
+        logger.exception("Erro ao salvar arquivos em %s", pasta_destino)
+    else:
+        logger.debug("Salvos: %s (%d linhas), %s (%d linhas)",
+                     arquivo_cadastros, len(df_cadastros), arquivo_pedidos, len(df_pedidos))
     
     return {
         "cadastros": arquivo_cadastros,
@@ -224,6 +382,110 @@ def salvar_dados_csv(dados: Dict, pasta_destino: str = "/app/seeds") -> Dict[str
         "timestamp": timestamp
     }
 
+def semente_dia(seed: int, dia: date) -> int:
+    """Semente de um dia, derivada só de (seed, data): a mesma em qualquer janela que contenha o dia."""
+    resumo = hashlib.sha256(f"{seed}:{dia.isoformat()}".encode()).digest()
+    return int.from_bytes(resumo[:8], 'big')
+
+def caminho_particao(dia: date, pasta_destino: str = "/app/seeds") -> str:
+    """Diretório da partição de um dia (data=YYYY-MM-DD)."""
+    return os.path.join(pasta_destino, f"data={dia.isoformat()}")
+
+def salvar_particao(dados: Dict, dia: date, pasta_destino: str = "/app/seeds") -> Dict[str, str]:
+    """
+    Grava os CSVs de um dia em data=YYYY-MM-DD/ (cadastros_api_YYYY-MM-DD.csv e
+    pedidos_api_YYYY-MM-DD.csv, encontrados pelo SeedsConsolidator).
+    
+    Os arquivos são escritos num diretório temporário renomeado de uma vez: a
+    partição existe completa ou não existe. Se outra chamada publicar o mesmo
+    dia antes, a dela é mantida (o conteúdo é o mesmo, pois depende só de
+    (seed, data)).
+    """
+    os.makedirs(pasta_destino, exist_ok=True)
+    destino = caminho_particao(dia, pasta_destino)
+    temporario = tempfile.mkdtemp(prefix=f".data={dia.isoformat()}-", dir=pasta_destino)
+    try:
+        for tabela in ('cadastros', 'pedidos'):
+            dataframe_tipado(dados['dados'][tabela], tabela).to_csv(
+                os.path.join(temporario, f"{tabela}_api_{dia.isoformat()}.csv"), index=False
+            )
+        try:
+            os.rename(temporario, destino)
+        except OSError:
+            if not os.path.isdir(destino):
+                raise
+            logger.debug("Partição %s já publicada por outra chamada", destino)
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+    
+    return {
+        tabela: os.path.join(destino, f"{tabela}_api_{dia.isoformat()}.csv")
+        for tabela in ('cadastros', 'pedidos')
+    }
+
+def gerar_dados_particionados(
+    data_inicio: str,
+    data_fim: str,
+    seed: Optional[int] = None,
+    pasta_destino: Optional[str] = None
+) -> Dict:
+    """
+    Gera o período dia a dia, cada dia a partir de (seed, data).
+    
+    Os volumes são sorteados por dia (com PERFIL_CARGA, conforme o perfil),
+    então o total acompanha o número de dias. Com pasta_destino, cada dia é
+    gravado como partição (salvar_particao) e os dias cuja partição já existe
+    são pulados sem gerar nada: reexecuções custam só os dias novos, e os
+    dados retornados são apenas os dos dias gerados nesta chamada.
+    
+    Returns:
+        dict: Mesmo formato de gerar_dados_periodo, com as listas de dias
+        gerados e já existentes nas estatísticas e as partições gravadas
+    """
+    seed = API_SEED_PARTICOES if seed is None else seed
+    inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+    fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
+    
+    cadastros, pedidos = [], []
+    dias_gerados, dias_existentes = [], []
+    particoes = {}
+    cpfs_disponiveis = 0
+    for deslocamento in range((fim - inicio).days + 1):
+        dia = inicio + timedelta(days=deslocamento)
+        if pasta_destino is not None and os.path.isdir(caminho_particao(dia, pasta_destino)):
+            dias_existentes.append(dia.isoformat())
+            continue
+        
+        dados_dia = gerar_dados_periodo(dia.isoformat(), dia.isoformat(), semente_dia(seed, dia))
+        cadastros.extend(dados_dia['dados']['cadastros'])
+        pedidos.extend(dados_dia['dados']['pedidos'])
+        cpfs_disponiveis += dados_dia['estatisticas']['cpfs_disponiveis']
+        dias_gerados.append(dia.isoformat())
+        if pasta_destino is not None:
+            particoes[dia.isoformat()] = salvar_particao(dados_dia, dia, pasta_destino)
+    
+    logger.debug("Partições de %s a %s: %d dias gerados, %d já existentes",
+                 data_inicio, data_fim, len(dias_gerados), len(dias_existentes))
+    
+    return {
+        "periodo": {
+            "data_inicio": data_inicio,
+            "data_fim": data_fim
+        },
+        "estatisticas": {
+            "total_cadastros": len(cadastros),
+            "total_pedidos": len(pedidos),
+            "cpfs_disponiveis": cpfs_disponiveis,
+            "dias_gerados": dias_gerados,
+            "dias_existentes": dias_existentes
+        },
+        "dados": {
+            "cadastros": cadastros,
+            "pedidos": pedidos
+        },
+        "particoes": particoes
+    }
+
 # Função de teste/exemplo
 if __name__ == "__main__":
     # Teste da função
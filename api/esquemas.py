@@ -0,0 +1,152 @@
+"""
+Registro único dos esquemas de cadastros e pedidos.
+
+Usado pelo gerador (scripts/data_generator.py), pela API e pelo consolidador
+(scripts/consolidate_seeds.py). Cada coluna tem um tipo lógico, traduzido
+aqui para DuckDB, Arrow e pandas, de modo que nenhum leitor precise inferir tipos.
+
+Os scripts importam este módulo adicionando ../api ao sys.path (a API roda
+num container que só enxerga o diretório api/).
+"""
+import importlib.util
+from typing import Dict, List
+
+import pandas as pd
+
+# Domínios fechados (viram categorias no pandas e ENUM na leitura pelo DuckDB)
+UFS = [
+    'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MT', 'MS', 'MG', 'PA',
+    'PB', 'PR', 'PE', 'PI', 'RJ', 'RN', 'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO'
+]
+GENEROS = ['M', 'F']
+PAISES = ['Brasil']
+STATUS_PEDIDO = ['pendente', 'pago', 'enviado', 'entregue', 'cancelado']
+
+# Tipo lógico -> tipo em cada camada. O tipo 'pandas' das colunas de texto e
+# moeda é o usado sem o pyarrow; com ele, dtypes_pandas usa o tipo 'arrow'
+# (ver _dtype_pandas), que é o mesmo do DuckDB
+TIPOS = {
+    'uuid': {'duckdb': 'UUID', 'arrow': 'string', 'pandas': 'string'},
+    'texto': {'duckdb': 'VARCHAR', 'arrow': 'string', 'pandas': 'string'},
+    'cpf': {'duckdb': 'VARCHAR(14)', 'arrow': 'string', 'pandas': 'string'},
+    'cep': {'duckdb': 'VARCHAR(9)', 'arrow': 'string', 'pandas': 'string'},
+    'data': {'duckdb': 'DATE', 'arrow': 'date32', 'pandas': 'datetime64[s]'},
+    'moeda': {'duckdb': 'DECIMAL(10,2)', 'arrow': 'decimal128(10,2)', 'pandas': 'float64'},
+    'uf': {'duckdb': 'VARCHAR(2)', 'arrow': 'dictionary', 'pandas': pd.CategoricalDtype(UFS), 'dominio': UFS},
+    'genero': {'duckdb': 'CHAR(1)', 'arrow': 'dictionary', 'pandas': pd.CategoricalDtype(GENEROS), 'dominio': GENEROS},
+    'pais': {'duckdb': 'VARCHAR(50)', 'arrow': 'dictionary', 'pandas': pd.CategoricalDtype(PAISES), 'dominio': PAISES},
+    'status': {
+        'duckdb': 'VARCHAR(30)', 'arrow': 'dictionary',
+        'pandas': pd.CategoricalDtype(STATUS_PEDIDO), 'dominio': STATUS_PEDIDO
+    },
+}
+
+# Colunas de cada tabela, na ordem dos CSVs
+ESQUEMAS = {
+    'cadastros': {
+        'id': 'uuid',
+        'nome': 'texto',
+        'data_nascimento': 'data',
+        'cpf': 'cpf',
+        'cep': 'cep',
+        'cidade': 'texto',
+        'estado': 'uf',
+        'pais': 'pais',
+        'genero': 'genero',
+        'telefone': 'texto',
+        'email': 'texto',
+        'data_cadastro': 'data',
+    },
+    'pedidos': {
+        'id_pedido': 'uuid',
+        'cpf': 'cpf',
+        'valor_pedido': 'moeda',
+        'valor_frete': 'moeda',
+        'valor_desconto': 'moeda',
+        'cupom': 'texto',
+        'endereco_entrega_logradouro': 'texto',
+        'endereco_entrega_numero': 'texto',
+        'endereco_entrega_bairro': 'texto',
+        'endereco_entrega_cidade': 'texto',
+        'endereco_entrega_estado': 'uf',
+        'endereco_entrega_pais': 'pais',
+        'status_pedido': 'status',
+        'data_pedido': 'data',
+    },
+}
+
+def colunas(tabela: str) -> List[str]:
+    """Nomes das colunas da tabela, na ordem dos CSVs."""
+    return list(ESQUEMAS[tabela])
+
+def tipos_duckdb(tabela: str, leitura_pandas: bool = False) -> Dict[str, str]:
+    """
+    Tipos DuckDB de cada coluna.
+
+    Com leitura_pandas=True, os tipos são os mais baratos de converter para
+    pandas: domínios fechados como ENUM (viram Categorical direto), UUID como
+    VARCHAR e DECIMAL como DOUBLE (em vez de objetos Python).
+    """
+    tipos = {}
+    for nome, logico in ESQUEMAS[tabela].items():
+        tipo = TIPOS[logico]
+        if leitura_pandas and 'dominio' in tipo:
+            tipos[nome] = "ENUM(" + ", ".join(f"'{valor}'" for valor in tipo['dominio']) + ")"
+        elif leitura_pandas and logico == 'uuid':
+            tipos[nome] = 'VARCHAR'
+        elif leitura_pandas and logico == 'moeda':
+            tipos[nome] = 'DOUBLE'
+        else:
+            tipos[nome] = tipo['duckdb']
+    return tipos
+
+def colunas_sql(tabela: str) -> str:
+    """Definição das colunas para CREATE TABLE (sem restrições)."""
+    return ",\n".join(f"{nome} {tipo}" for nome, tipo in tipos_duckdb(tabela).items())
+
+def colunas_read_csv(tabela: str, leitura_pandas: bool = False) -> str:
+    """Parâmetro columns={...} do read_csv do DuckDB, com os tipos explícitos."""
+    # Aspas simples dentro do tipo (valores do ENUM) são escapadas dobrando
+    tipos = {nome: tipo.replace("'", "''") for nome, tipo in tipos_duckdb(tabela, leitura_pandas).items()}
+    return "{" + ", ".join(f"'{nome}': '{tipo}'" for nome, tipo in tipos.items()) + "}"
+
+def _dtype_pandas(logico: str):
+    """
+    dtype pandas de um tipo lógico. Com o pyarrow instalado, textos viram
+    string[pyarrow] e moeda vira decimal128(10,2) do Arrow, como o DECIMAL do
+    DuckDB; sem ele, 'string' e float64.
+    """
+    tipo = TIPOS[logico]
+    if tipo['arrow'] == 'string' and importlib.util.find_spec('pyarrow') is not None:
+        return pd.StringDtype('pyarrow')
+    if tipo['arrow'].startswith('decimal') and importlib.util.find_spec('pyarrow') is not None:
+        return pd.ArrowDtype(_tipos_arrow()[tipo['arrow']])
+    return tipo['pandas']
+
+def dtypes_pandas(tabela: str) -> Dict[str, object]:
+    """dtypes pandas de cada coluna (categorias para os domínios fechados)."""
+    return {nome: _dtype_pandas(logico) for nome, logico in ESQUEMAS[tabela].items()}
+
+def dataframe_tipado(registros: List[Dict], tabela: str) -> pd.DataFrame:
+    """DataFrame dos registros (dicts) com as colunas e dtypes do registro, mesmo se vazio."""
+    return pd.DataFrame(registros, columns=colunas(tabela)).astype(dtypes_pandas(tabela))
+
+def _tipos_arrow() -> Dict[str, object]:
+    """Nome do tipo 'arrow' em TIPOS -> tipo pyarrow (pyarrow só é importado aqui)."""
+    import pyarrow as pa
+
+    return {
+        'string': pa.string(),
+        'date32': pa.date32(),
+        'decimal128(10,2)': pa.decimal128(10, 2),
+        'dictionary': pa.dictionary(pa.int8(), pa.string()),
+    }
+
+def schema_arrow(tabela: str):
+    """Schema pyarrow da tabela."""
+    import pyarrow as pa
+
+    tipos_arrow = _tipos_arrow()
+    return pa.schema([
+        (nome, tipos_arrow[TIPOS[logico]['arrow']]) for nome, logico in ESQUEMAS[tabela].items()
+    ])
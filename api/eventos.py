@@ -0,0 +1,276 @@
+"""
+Fluxo contínuo de eventos (cadastros, pedidos e mudanças de status) a uma
+taxa alvo, para testes de carga da ingestão em streaming.
+
+O ritmo é controlado por um balde de fichas: a taxa alvo repõe as fichas e
+cada quadro (um lote de eventos enviado de uma vez) consome uma ficha por
+evento. A cada segundo sai um resumo com a taxa obtida e o atraso em relação
+ao ritmo ideal (quanto o produtor está atrás de inicio + eventos / taxa).
+
+Os pedidos novos nascem "pendente" e avançam depois em eventos de status
+(pendente -> pago -> enviado -> entregue, com cancelamentos), sempre sobre
+pedidos já emitidos e CPFs de cadastros já emitidos.
+"""
+import asyncio
+import itertools
+import os
+import random
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from esquemas import GENEROS, UFS
+from identificadores import (
+    BLOCO_CPF, BLOCOS_CPF_STREAM, HEX_MAIUSCULO, bases_cpf_stream, digitos_cpf, formatar_mascara, gerar_uuids
+)
+from metricas import atraso_stream, eventos_stream
+from serializacao import serializar_json
+from vocabulario import obter_vocabulario
+
+# Maior taxa alvo aceita pelos endpoints (eventos por segundo, por conexão)
+TAXA_MAX = int(os.getenv("API_STREAM_TAXA_MAX", 50_000))
+
+# Proporção de cada tipo de evento (pedidos recebem o que sobra)
+PROPORCAO_CADASTROS = 0.1
+PROPORCAO_STATUS = 0.3
+
+# Memória do produtor: CPFs sorteáveis nos pedidos e pedidos ainda sem status final
+CPFS_RECENTES = 10_000
+PEDIDOS_ABERTOS = 100_000
+
+_UFS = np.array(UFS, dtype=object)
+_GENEROS = np.array(GENEROS, dtype=object)
+
+# Bloco de CPFs da próxima conexão sem seed (começa num bloco aleatório, para
+# que processos diferentes do uvicorn não comecem todos no mesmo)
+_blocos_stream = itertools.count(random.randrange(BLOCOS_CPF_STREAM))
+
+# Próximo status de um pedido e a chance de ser cancelado em vez de avançar
+PROXIMO_STATUS = {'pendente': 'pago', 'pago': 'enviado', 'enviado': 'entregue'}
+CHANCE_CANCELAMENTO = {'pendente': 0.1, 'pago': 0.05, 'enviado': 0.0}
+
+# Quadros por segundo quando o tamanho do quadro não é informado
+QUADROS_POR_SEGUNDO = 20
+EVENTOS_POR_QUADRO_MAX = 5_000
+
+class BaldeFichas:
+    """Balde de fichas: `taxa` fichas por segundo, acumulando no máximo `capacidade`."""
+
+    def __init__(self, taxa: float, capacidade: float):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.fichas = capacidade
+        self._ultimo = time.monotonic()
+
+    def _repor(self):
+        agora = time.monotonic()
+        self.fichas = min(self.capacidade, self.fichas + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def espera(self, quantidade: float) -> float:
+        """Consome as fichas e retorna 0, ou retorna quantos segundos faltam para tê-las."""
+        self._repor()
+        if self.fichas >= quantidade:
+            self.fichas -= quantidade
+            return 0.0
+        return (quantidade - self.fichas) / self.taxa
+
+    async def consumir(self, quantidade: float):
+        while (espera := self.espera(quantidade)) > 0:
+            await asyncio.sleep(espera)
+
+class GeradorEventos:
+    """
+    Estado do produtor de um stream: posição na sequência de CPFs e pedidos abertos.
+
+    Cada conexão percorre uma sequência própria de CPFs da região dos streams
+    (identificadores.bases_cpf_stream), começando num bloco de BLOCO_CPF
+    diferente para cada conexão do processo (ou derivado da seed), então
+    nenhum CPF se repete antes de a conexão percorrer a região inteira
+    (ESPACO_CPF_STREAM cadastros). Os quadros são montados coluna a coluna
+    com o vocabulário, sem sorteio linha a linha.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+        self.vocabulario = obter_vocabulario()
+        bloco = next(_blocos_stream) if seed is None else seed
+        self.inicio_cpfs = (bloco % BLOCOS_CPF_STREAM) * BLOCO_CPF
+        self.cadastros_emitidos = 0
+        self.abertos: Deque[Tuple[str, str, str]] = deque(maxlen=PEDIDOS_ABERTOS)
+
+    def _cadastros(self, quantidade: int, hoje: np.datetime64) -> List[Dict]:
+        rng, vocabulario = self.rng, self.vocabulario
+        posicoes = self.inicio_cpfs + self.cadastros_emitidos + np.arange(quantidade)
+        self.cadastros_emitidos += quantidade
+        digitos = digitos_cpf(bases_cpf_stream(posicoes))
+        # Idade entre 18 e 90 anos, como em gerar_cadastros_periodo
+        nascimento = hoje - np.timedelta64(int(18 * 365.25), 'D') - rng.integers(
+            0, int(91 * 365.25) - int(18 * 365.25), size=quantidade
+        )
+        colunas = {
+            'id': gerar_uuids(rng, quantidade),
+            'nome': vocabulario.amostrar('nomes', rng.integers(0, vocabulario.tamanho('nomes'), size=quantidade)),
+            'data_nascimento': nascimento.astype(str),
+            'cpf': formatar_mascara(digitos, '###.###.###-##'),
+            'cep': formatar_mascara(rng.integers(0, 10, size=(quantidade, 8)), '########'),
+            'cidade': vocabulario.amostrar('cidades', rng.integers(0, vocabulario.tamanho('cidades'), size=quantidade)),
+            'estado': _UFS[rng.integers(0, len(_UFS), size=quantidade)],
+            'pais': np.full(quantidade, 'Brasil', dtype=object),
+            'genero': _GENEROS[rng.integers(0, len(_GENEROS), size=quantidade)],
+            'telefone': formatar_mascara(rng.integers(0, 10, size=(quantidade, 10)), '+55 ## ####-####'),
+            'email': formatar_mascara(digitos, '###########@exemplo.com.br'),
+            'data_cadastro': np.full(quantidade, str(hoje), dtype=object),
+        }
+        return _linhas(colunas)
+
+    def _pedidos(self, quantidade: int, hoje: np.datetime64) -> List[Dict]:
+        rng, vocabulario = self.rng, self.vocabulario
+        # CPFs dos CPFS_RECENTES últimos cadastros emitidos
+        recentes = min(self.cadastros_emitidos, CPFS_RECENTES)
+        posicoes = self.inicio_cpfs + self.cadastros_emitidos - rng.integers(1, recentes + 1, size=quantidade)
+        valor_total = rng.uniform(50, 2000, size=quantidade)
+        tem_desconto = rng.random(quantidade) < 0.2
+        cupons = formatar_mascara(rng.integers(0, 16, size=(quantidade, 8)), 'CUPOM########', HEX_MAIUSCULO)
+        algarismos = rng.integers(1, 5, size=quantidade)
+        numeros = 1 + (rng.random(quantidade) * (10.0 ** algarismos - 1)).astype(np.int64)
+        colunas = {
+            'id_pedido': gerar_uuids(rng, quantidade),
+            'cpf': formatar_mascara(digitos_cpf(bases_cpf_stream(posicoes)), '###.###.###-##'),
+            'valor_pedido': valor_total.round(2),
+            'valor_frete': rng.uniform(5, 100, size=quantidade).round(2),
+            'valor_desconto': np.where(tem_desconto, valor_total * rng.uniform(0.05, 0.2, size=quantidade), 0.0).round(2),
+            'cupom': np.where(tem_desconto, cupons.astype(object), None),
+            'endereco_entrega_logradouro': vocabulario.amostrar(
+                'logradouros', rng.integers(0, vocabulario.tamanho('logradouros'), size=quantidade)
+            ),
+            'endereco_entrega_numero': numeros.astype(str),
+            'endereco_entrega_bairro': vocabulario.amostrar(
+                'bairros', rng.integers(0, vocabulario.tamanho('bairros'), size=quantidade)
+            ),
+            'endereco_entrega_cidade': vocabulario.amostrar(
+                'cidades', rng.integers(0, vocabulario.tamanho('cidades'), size=quantidade)
+            ),
+            'endereco_entrega_estado': _UFS[rng.integers(0, len(_UFS), size=quantidade)],
+            'endereco_entrega_pais': np.full(quantidade, 'Brasil', dtype=object),
+            'status_pedido': np.full(quantidade, 'pendente', dtype=object),
+            'data_pedido': np.full(quantidade, str(hoje), dtype=object),
+        }
+        pedidos = _linhas(colunas)
+        self.abertos.extend((pedido['id_pedido'], pedido['cpf'], 'pendente') for pedido in pedidos)
+        return pedidos
+
+    def _status(self, quantidade: int) -> List[Dict]:
+        # Os pedidos mais antigos avançam primeiro; os que não chegaram ao fim voltam para a fila
+        avancando = [self.abertos.popleft() for _ in range(quantidade)]
+        sorteios = self.rng.random(quantidade).tolist()
+        mudancas = []
+        for (id_pedido, cpf, status), sorteio in zip(avancando, sorteios):
+            novo = 'cancelado' if sorteio < CHANCE_CANCELAMENTO[status] else PROXIMO_STATUS[status]
+            if novo in PROXIMO_STATUS:
+                self.abertos.append((id_pedido, cpf, novo))
+            mudancas.append({"id_pedido": id_pedido, "cpf": cpf, "status_anterior": status, "status_pedido": novo})
+        return mudancas
+
+    def quadro(self, quantidade: int) -> List[Dict]:
+        """`quantidade` eventos com o instante atual."""
+        hoje = np.datetime64(date.today(), 'D')
+        instante = datetime.now().isoformat(timespec="milliseconds")
+        total_cadastros, total_status, total_pedidos = self.rng.multinomial(
+            quantidade, [PROPORCAO_CADASTROS, PROPORCAO_STATUS, 1 - PROPORCAO_CADASTROS - PROPORCAO_STATUS]
+        ).tolist()
+        # Sem pedidos abertos não há status para mudar; sem CPFs, não há pedidos
+        total_status = min(total_status, len(self.abertos))
+        total_pedidos = quantidade - total_cadastros - total_status
+        if self.cadastros_emitidos + total_cadastros == 0:
+            total_cadastros, total_pedidos = total_cadastros + total_pedidos, 0
+
+        # As mudanças de status são sorteadas sobre os pedidos abertos antes deste quadro
+        mudancas = self._status(total_status)
+        cadastros = self._cadastros(total_cadastros, hoje)
+        pedidos = self._pedidos(total_pedidos, hoje)
+        return (
+            [{"tipo": "cadastro", "instante": instante, "dados": dados} for dados in cadastros]
+            + [{"tipo": "pedido", "instante": instante, "dados": dados} for dados in pedidos]
+            + [{"tipo": "status_pedido", "instante": instante, "dados": dados} for dados in mudancas]
+        )
+
+def _linhas(colunas: Dict[str, np.ndarray]) -> List[Dict]:
+    """Colunas do quadro -> uma lista de dicts (tipos do Python, prontos para o JSON)."""
+    nomes = list(colunas)
+    return [dict(zip(nomes, linha)) for linha in zip(*(valores.tolist() for valores in colunas.values()))]
+
+def eventos_por_quadro_padrao(taxa: int) -> int:
+    return max(1, min(EVENTOS_POR_QUADRO_MAX, taxa // QUADROS_POR_SEGUNDO))
+
+async def emitir(
+    taxa: int,
+    eventos_por_quadro: Optional[int] = None,
+    duracao: Optional[float] = None,
+    max_eventos: Optional[int] = None,
+    seed: Optional[int] = None
+) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    Produz ("eventos", quadro) no ritmo da taxa alvo e ("estatisticas", resumo)
+    a cada segundo e no fim. Termina após `duracao` segundos ou `max_eventos`
+    eventos (sem nenhum dos dois, até o cliente desconectar).
+    """
+    eventos_por_quadro = eventos_por_quadro or eventos_por_quadro_padrao(taxa)
+    # Folga de um quadro no balde: o que o sleep passa do ponto é compensado no quadro seguinte
+    balde = BaldeFichas(taxa, capacidade=2 * eventos_por_quadro)
+    gerador = GeradorEventos(seed)
+    inicio = ultimo_resumo = time.monotonic()
+    emitidos = emitidos_no_resumo = sequencia = 0
+    atraso = 0.0
+
+    def resumo(agora: float) -> Dict:
+        decorrido = agora - inicio
+        return {
+            "eventos_enviados": emitidos,
+            "decorrido_s": round(decorrido, 3),
+            "taxa_alvo": taxa,
+            "taxa_obtida": round(emitidos / decorrido, 1) if decorrido > 0 else None,
+            "taxa_ultimo_intervalo": round(emitidos_no_resumo / (agora - ultimo_resumo), 1) if agora > ultimo_resumo else None,
+            "atraso_ms": round(atraso * 1000, 1),
+            "eventos_por_quadro": eventos_por_quadro
+        }
+
+    while True:
+        agora = time.monotonic()
+        if (duracao is not None and agora - inicio >= duracao) or (max_eventos is not None and emitidos >= max_eventos):
+            break
+
+        quantidade = eventos_por_quadro if max_eventos is None else min(eventos_por_quadro, max_eventos - emitidos)
+        await balde.consumir(quantidade)
+        # Gerado numa thread para não travar o event loop nas taxas altas
+        eventos = await asyncio.to_thread(gerador.quadro, quantidade)
+
+        agora = time.monotonic()
+        # Atraso: quanto este quadro saiu depois do instante ideal para o último evento dele
+        atraso = max(0.0, agora - (inicio + (emitidos + quantidade) / taxa))
+        atraso_stream.observar(atraso)
+        sequencia += 1
+        emitidos += len(eventos)
+        emitidos_no_resumo += len(eventos)
+        for tipo, quantidade_tipo in _contar_tipos(eventos).items():
+            eventos_stream.inc(quantidade_tipo, tipo=tipo)
+        yield "eventos", {"sequencia": sequencia, "eventos": eventos}
+
+        if agora - ultimo_resumo >= 1.0:
+            yield "estatisticas", resumo(agora)
+            ultimo_resumo, emitidos_no_resumo = agora, 0
+
+    yield "estatisticas", resumo(time.monotonic())
+
+def _contar_tipos(eventos: List[Dict]) -> Dict[str, int]:
+    contagem: Dict[str, int] = {}
+    for evento in eventos:
+        contagem[evento["tipo"]] = contagem.get(evento["tipo"], 0) + 1
+    return contagem
+
+def formatar_sse(tipo: str, dados: Dict) -> bytes:
+    """Uma mensagem Server-Sent Events (event + data em JSON numa linha)."""
+    return b"event: " + tipo.encode() + b"\ndata: " + serializar_json(dados) + b"\n\n"
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+# Configuração via variáveis de ambiente (docker-compose)
+# - API_EXECUTOR: "thread", "process" ou "inline" (executa no event loop, como antes)
+# - API_EXECUTOR_WORKERS: número de threads/processos
+# - API_EXECUTOR_FILA: tarefas aguardando além das que estão em execução
+EXECUTOR_TIPO = os.getenv("API_EXECUTOR", "thread")
+EXECUTOR_WORKERS = int(os.getenv("API_EXECUTOR_WORKERS", os.cpu_count() or 2))
+EXECUTOR_FILA = int(os.getenv("API_EXECUTOR_FILA", 16))
+
+class ExecutorSaturado(Exception):
+    """Lançada quando todos os workers estão ocupados e a fila está cheia."""
+
+class ExecutorIndisponivel(Exception):
+    """Lançada quando o pool não aceita tarefas (API subindo ou encerrando, ou pool quebrado)."""
+
+class ExecutorLimitado:
+    """
+    Executa funções síncronas (geração, escrita de CSV) fora do event loop.
+
+    No máximo `workers + fila` tarefas ficam em andamento; acima disso a
+    chamada falha na hora com ExecutorSaturado, em vez de acumular requisições.
+    """
+
+    def __init__(self, tipo: str = EXECUTOR_TIPO, workers: int = EXECUTOR_WORKERS, fila: int = EXECUTOR_FILA):
+        if tipo not in ("thread", "process", "inline"):
+            raise ValueError(f"Tipo de executor inválido: {tipo}")
+
+        self.tipo = tipo
+        self.workers = workers
+        self.capacidade = workers + fila
+        self.em_andamento = 0
+        self._pool = None
+        # em_andamento também é alterado por threads (streams liberando a vaga)
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Cria o pool de threads ou processos."""
+        if self.tipo == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="gerador")
+        elif self.tipo == "process":
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def encerrar(self):
+        """Encerra o pool, aguardando as tarefas em execução."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    @property
+    def na_fila(self) -> int:
+        """Tarefas aguardando um worker livre."""
+        return max(0, self.em_andamento - self.workers)
+
+    def _ocupar(self):
+        """Ocupa uma vaga, ou lança ExecutorSaturado/ExecutorIndisponivel."""
+        with self._lock:
+            if self.em_andamento >= self.capacidade:
+                raise ExecutorSaturado(
+                    f"Executor saturado: {self.em_andamento} tarefas em andamento (capacidade {self.capacidade})"
+                )
+            if self.tipo != "inline" and self._pool is None:
+                raise ExecutorIndisponivel("Executor indisponível: o pool não foi iniciado ou já foi encerrado")
+            self.em_andamento += 1
+
+    def _desocupar(self):
+        with self._lock:
+            self.em_andamento -= 1
+
+    async def executar(self, funcao, *args, **kwargs):
+        """Executa `funcao(*args, **kwargs)` no pool e aguarda o resultado."""
+        self._ocupar()
+        try:
+            if self._pool is None:
+                return funcao(*args, **kwargs)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, partial(funcao, *args, **kwargs))
+        except BrokenExecutor as e:
+            # Um processo do pool morreu (ex.: falta de memória): o pool não aceita mais tarefas
+            raise ExecutorIndisponivel(f"Executor indisponível: {e}") from e
+        finally:
+            self._desocupar()
+
+    def reservar(self) -> "VagaExecutor":
+        """
+        Ocupa uma vaga pelo tempo de vida de uma resposta em streaming, que é
+        gerada fora do pool (na thread do Starlette) mas entra no mesmo limite.
+        Lança ExecutorSaturado/ExecutorIndisponivel como executar().
+        """
+        self._ocupar()
+        return VagaExecutor(self)
+
+    def status(self) -> dict:
+        return {
+            "tipo": self.tipo,
+            "workers": self.workers,
+            "capacidade": self.capacidade,
+            "em_andamento": self.em_andamento,
+            "na_fila": self.na_fila
+        }
+
+class VagaExecutor:
+    """Vaga reservada por ExecutorLimitado.reservar(); liberar() pode ser chamado mais de uma vez."""
+
+    def __init__(self, executor: ExecutorLimitado):
+        self._executor = executor
+        self._liberada = False
+        self._lock = threading.Lock()
+
+    def liberar(self):
+        with self._lock:
+            if self._liberada:
+                return
+            self._liberada = True
+        self._executor._desocupar()
+
+    def envolver(self, pedacos):
+        """Itera `pedacos` e libera a vaga quando o stream termina, falha ou é fechado."""
+        try:
+            yield from pedacos
+        finally:
+            self.liberar()
+
+executor = ExecutorLimitado()
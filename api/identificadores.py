@@ -0,0 +1,181 @@
+"""
+Alocação de CPFs únicos e válidos, sem laços de tentativa.
+
+Os 9 dígitos-base são sorteados como inteiros distintos (amostragem sem
+reposição do NumPy) e os 2 dígitos verificadores são calculados em lote.
+Usado pelo gerador colunar, pelo gerador linha a linha e pela API. Os
+clientes podem ser guardados só pelas bases (uint32) e formatados sob demanda.
+"""
+from datetime import date
+
+import numpy as np
+
+# Quantidade de bases possíveis (9 dígitos) e tamanho padrão do bloco de cada lote
+ESPACO_CPF = 10 ** 9
+BLOCO_CPF = 10 ** 6
+
+# Na API, cada dia (contado a partir de EPOCA_CPF) tem BLOCO_CPF_DIA bases
+# reservadas, então partições de dias diferentes nunca repetem CPF. Os
+# últimos BLOCOS_CPF_STREAM blocos de BLOCO_CPF ficam para os streams de
+# eventos; os blocos diários cobrem o resto, os dias de 1900 até 2146
+BLOCO_CPF_DIA = 10_000
+EPOCA_CPF = date(1900, 1, 1)
+BLOCOS_CPF_STREAM = 100
+ESPACO_CPF_STREAM = BLOCOS_CPF_STREAM * BLOCO_CPF
+
+# Permutação afim do espaço de bases: (índice * a + b) mod 10^9 é uma bijeção
+# porque a não tem fator 2 nem 5. Blocos de índices disjuntos continuam
+# disjuntos depois dela, mas os CPFs de um mesmo lote ficam espalhados.
+_MULTIPLICADOR = 738_219_451
+_DESLOCAMENTO = 271_828_182
+
+# Pesos do cálculo dos dígitos verificadores
+_PESOS_DV1 = np.arange(10, 1, -1)
+_PESOS_DV2 = np.arange(11, 1, -1)
+
+# Potências de 10 para decompor as bases em dígitos (mais significativo primeiro)
+_POTENCIAS = 10 ** np.arange(8, -1, -1, dtype=np.int64)
+
+_DIGITOS = np.frombuffer(b'0123456789', dtype=np.uint8)
+
+# Alfabetos hexadecimais da formatação vetorizada (UUIDs e cupons)
+HEX = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+HEX_MAIUSCULO = np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)
+
+def formatar_mascara(valores, mascara, alfabeto=_DIGITOS):
+    """
+    Formata uma matriz (n, k) de índices do alfabeto segundo uma máscara.
+
+    Cada '#' da máscara recebe, em ordem, um caractere de `alfabeto`; os demais
+    caracteres são copiados literalmente. Retorna um array de strings com n itens.
+    """
+    molde = np.frombuffer(mascara.encode('ascii'), dtype=np.uint8)
+    posicoes = np.flatnonzero(molde == ord('#'))
+    saida = np.broadcast_to(molde, (len(valores), len(molde))).copy()
+    saida[:, posicoes] = alfabeto[valores]
+    return saida.view(f'S{len(molde)}').ravel().astype(str)
+
+def gerar_uuids(rng, quantidade):
+    """Gera UUIDs versão 4 formatados como texto, sem laço em Python."""
+    brutos = rng.integers(0, 256, size=(quantidade, 16), dtype=np.uint8)
+    brutos[:, 6] = (brutos[:, 6] & 0x0F) | 0x40
+    brutos[:, 8] = (brutos[:, 8] & 0x3F) | 0x80
+
+    nibbles = np.empty((quantidade, 32), dtype=np.uint8)
+    nibbles[:, 0::2] = brutos >> 4
+    nibbles[:, 1::2] = brutos & 0x0F
+    return formatar_mascara(nibbles, '########-####-####-####-############', HEX)
+
+def tamanho_bloco_cpf(total, tamanho_lote):
+    """
+    Tamanho do bloco de cada lote para gerar `total` CPFs em lotes de
+    `tamanho_lote`: BLOCO_CPF enquanto os lotes couberem no espaço; acima de
+    ESPACO_CPF // BLOCO_CPF lotes, o espaço é dividido igualmente entre eles.
+    """
+    if total > ESPACO_CPF:
+        raise ValueError(f"No máximo {ESPACO_CPF:,} CPFs distintos (pedido: {total:,})")
+    lotes = max(1, -(-total // tamanho_lote))
+    return min(BLOCO_CPF, ESPACO_CPF // lotes)
+
+def sortear_bases_cpf(rng, quantidade, bloco=None, tamanho_bloco=BLOCO_CPF):
+    """
+    Sorteia `quantidade` bases de CPF distintas (inteiros de 0 a 10^9 - 1).
+
+    Sem bloco, a amostra é uniforme no espaço inteiro. Com bloco, os índices
+    saem do intervalo [bloco * tamanho_bloco, (bloco + 1) * tamanho_bloco) e
+    passam pela permutação afim, de modo que lotes gerados em processos
+    diferentes (um bloco por lote, todos do mesmo tamanho) nunca repetem CPF
+    entre si.
+    """
+    if bloco is None:
+        return rng.choice(ESPACO_CPF, size=quantidade, replace=False)
+
+    if quantidade > tamanho_bloco:
+        raise ValueError(f"Um lote aloca no máximo {tamanho_bloco} CPFs (pedido: {quantidade})")
+    if not 0 <= bloco < ESPACO_CPF // tamanho_bloco:
+        raise ValueError(
+            f"Bloco de CPFs fora do intervalo: {bloco} (há {ESPACO_CPF // tamanho_bloco} blocos de {tamanho_bloco})"
+        )
+
+    return _sortear_no_intervalo(rng, quantidade, bloco * tamanho_bloco, tamanho_bloco)
+
+def _sortear_no_intervalo(rng, quantidade, primeiro, tamanho):
+    """Bases distintas dos índices [primeiro, primeiro + tamanho), após a permutação afim."""
+    indices = primeiro + rng.choice(tamanho, size=quantidade, replace=False)
+    return (indices * _MULTIPLICADOR + _DESLOCAMENTO) % ESPACO_CPF
+
+def _intervalo_periodo(inicio, fim):
+    """Primeiro índice e quantidade de índices reservados aos dias de `inicio` a `fim`."""
+    primeiro_dia = (inicio - EPOCA_CPF).days
+    dias = (fim - inicio).days + 1
+    if primeiro_dia < 0 or dias < 1 or (primeiro_dia + dias) * BLOCO_CPF_DIA > ESPACO_CPF - ESPACO_CPF_STREAM:
+        return 0, 0
+    return primeiro_dia * BLOCO_CPF_DIA, dias * BLOCO_CPF_DIA
+
+def capacidade_cpf_periodo(inicio, fim):
+    """Quantos CPFs cabem nos blocos dos dias de `inicio` a `fim` (0 fora dos dias cobertos)."""
+    return _intervalo_periodo(inicio, fim)[1]
+
+def sortear_bases_cpf_periodo(rng, quantidade, inicio, fim):
+    """
+    Sorteia `quantidade` bases distintas dos blocos reservados aos dias de
+    `inicio` a `fim`: períodos sem dias em comum nunca repetem CPF entre si.
+    """
+    primeiro, tamanho = _intervalo_periodo(inicio, fim)
+    if quantidade > tamanho:
+        raise ValueError(
+            f"O período {inicio} a {fim} comporta no máximo {tamanho} CPFs (pedido: {quantidade})"
+        )
+    return _sortear_no_intervalo(rng, quantidade, primeiro, tamanho)
+
+def bases_cpf_stream(indices):
+    """
+    Bases das posições `indices` (0 a ESPACO_CPF_STREAM - 1) da região dos
+    streams: posições distintas dão CPFs distintos, e nenhum deles sai dos
+    blocos diários.
+    """
+    indices = ESPACO_CPF - ESPACO_CPF_STREAM + np.asarray(indices, dtype=np.int64) % ESPACO_CPF_STREAM
+    return (indices * _MULTIPLICADOR + _DESLOCAMENTO) % ESPACO_CPF
+
+def digitos_cpf(bases):
+    """Matriz (n, 11) uint8 com os 9 dígitos-base e os 2 dígitos verificadores."""
+    bases = np.asarray(bases, dtype=np.int64)
+    digitos = np.empty((len(bases), 11), dtype=np.uint8)
+    digitos[:, :9] = (bases[:, None] // _POTENCIAS) % 10
+
+    resto = (digitos[:, :9] @ _PESOS_DV1) % 11
+    digitos[:, 9] = np.where(resto < 2, 0, 11 - resto)
+    resto = (digitos[:, :10] @ _PESOS_DV2) % 11
+    digitos[:, 10] = np.where(resto < 2, 0, 11 - resto)
+    return digitos
+
+def alocar_cpfs(rng, quantidade, bloco=None, tamanho_bloco=BLOCO_CPF):
+    """
+    Aloca `quantidade` CPFs distintos e válidos.
+
+    Retorna a matriz de dígitos (n, 11), para quem deriva outros campos dos
+    dígitos (ex.: e-mail), e os CPFs formatados ('###.###.###-##').
+    """
+    digitos = digitos_cpf(sortear_bases_cpf(rng, quantidade, bloco, tamanho_bloco))
+    return digitos, formatar_mascara(digitos, '###.###.###-##')
+
+def alocar_cpfs_periodo(rng, quantidade, inicio, fim):
+    """Como alocar_cpfs, com as bases dos blocos dos dias de `inicio` a `fim`."""
+    digitos = digitos_cpf(sortear_bases_cpf_periodo(rng, quantidade, inicio, fim))
+    return digitos, formatar_mascara(digitos, '###.###.###-##')
+
+def formatar_cpfs(bases):
+    """CPFs formatados ('###.###.###-##') a partir das bases de 9 dígitos."""
+    return formatar_mascara(digitos_cpf(bases), '###.###.###-##')
+
+def selecionar_cpfs(cpfs, indices):
+    """
+    CPFs formatados nas posições `indices` de `cpfs`.
+
+    `cpfs` pode ser um array de bases (inteiros, 4 bytes por cliente em
+    uint32), formatadas só para as posições sorteadas, ou de CPFs já formatados.
+    """
+    cpfs = np.asarray(cpfs)
+    if cpfs.dtype.kind in 'iu':
+        return formatar_cpfs(cpfs[indices])
+    return cpfs[indices]
@@ -0,0 +1,420 @@
+"""
+Jobs de geração em segundo plano (POST /jobs), para volumes que não cabem
+numa requisição HTTP.
+
+Cada job gera o período dia a dia, com as mesmas sementes por dia das
+partições (semente_dia), e grava o resultado no volume de seeds:
+
+- csv: partições data=YYYY-MM-DD/ em PARTICOES_PATH (as mesmas de
+  particionado=true; dias já gravados são pulados e o consolidador as encontra)
+- parquet / ndjson: um arquivo por tabela em JOBS_PATH/<id>/
+- sink postgres: cada dia vai para as tabelas raw com COPY, sem arquivos
+
+Os dias são gerados num pool de processos compartilhado por todos os jobs
+(o orçamento de CPU é o número de processos). Cada dia em andamento reserva
+a sua estimativa de memória num orçamento global; um job só envia outro dia
+ao pool quando há memória livre. No máximo JOBS_SIMULTANEOS jobs rodam ao
+mesmo tempo; os demais esperam na fila. O cancelamento é verificado entre
+os dias: os dias já gravados ficam, os em andamento são descartados.
+
+O estado dos jobs fica em memória (perde-se ao reiniciar a API).
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from carga_postgres import carregador_postgres
+from data_generator_api import (
+    API_SEED_PARTICOES, PARTICOES_PATH, PERFIL_CARGA, caminho_particao, criar_geradores,
+    gerar_cadastros_periodo, gerar_pedidos_periodo, salvar_particao, semente_dia, sortear_volumes
+)
+from identificadores import BLOCO_CPF_DIA
+from serializacao import serializar_json
+
+logger = logging.getLogger(__name__)
+
+# Orçamento global dos jobs (variáveis de ambiente do docker-compose)
+# - API_JOBS_SIMULTANEOS: jobs executando ao mesmo tempo (os demais ficam na fila)
+# - API_JOBS_PROCESSOS: processos geradores compartilhados pelos jobs (orçamento de CPU)
+# - API_JOBS_MEMORIA_MB: memória estimada dos dias em andamento, somando todos os jobs
+JOBS_SIMULTANEOS = int(os.getenv("API_JOBS_SIMULTANEOS", 2))
+JOBS_PROCESSOS = int(os.getenv("API_JOBS_PROCESSOS", max(1, (os.cpu_count() or 2) // 2)))
+JOBS_MEMORIA_MB = int(os.getenv("API_JOBS_MEMORIA_MB", 512))
+
+# Arquivos parquet/ndjson dos jobs, no volume de seeds
+JOBS_PATH = os.getenv("API_JOBS_PATH", os.path.join(PARTICOES_PATH, "jobs"))
+
+# Jobs encerrados mantidos para consulta
+JOBS_HISTORICO = int(os.getenv("API_JOBS_HISTORICO", 100))
+
+# Estimativa conservadora por registro em andamento (dict em Python, cópia
+# serializada na volta do processo gerador e a conversão na escrita)
+BYTES_POR_REGISTRO = 4096
+
+ESTADOS_FINAIS = ("concluido", "cancelado", "erro")
+
+class EspecificacaoJob(BaseModel):
+    """Especificação de uma geração em segundo plano."""
+    data_inicio: date = Field(..., description="Primeiro dia do período")
+    data_fim: Optional[date] = Field(default=None, description="Último dia do período (padrão: hoje)")
+    seed: Optional[int] = Field(default=None, description="Seed dos dias (padrão: API_SEED_PARTICOES)")
+    cadastros_por_dia: Optional[int] = Field(
+        default=None, ge=0, le=BLOCO_CPF_DIA,
+        description="Cadastros por dia, até o bloco de CPFs do dia (padrão: sorteado como na API ou pelo perfil de carga)"
+    )
+    pedidos_por_dia: Optional[int] = Field(
+        default=None, ge=0, description="Pedidos por dia (padrão: sorteado como na API ou pelo perfil de carga)"
+    )
+    formato: str = Field(default="csv", pattern="^(csv|parquet|ndjson)$", description="Formato dos arquivos")
+    sink: str = Field(default="arquivos", pattern="^(arquivos|postgres)$", description="Destino dos dados")
+
+def gerar_dia(seed: int, dia: str, cadastros: Optional[int], pedidos: Optional[int]) -> Dict:
+    """
+    Dados de um dia (executado no processo gerador). Sem volumes fixos, é o
+    mesmo dia de gerar_dados_particionados e de /dados/paginas.
+    """
+    rng, vocabulario = criar_geradores(semente_dia(seed, date.fromisoformat(dia)))
+    total_cadastros, total_pedidos = sortear_volumes(dia, dia, rng)
+    total_cadastros = total_cadastros if cadastros is None else cadastros
+    total_pedidos = total_pedidos if pedidos is None else pedidos
+
+    lista_cadastros = gerar_cadastros_periodo(dia, dia, total_cadastros, rng, vocabulario)
+    cpfs = [cadastro['cpf'] for cadastro in lista_cadastros]
+    lista_pedidos = gerar_pedidos_periodo(dia, dia, total_pedidos, cpfs, rng, vocabulario)
+    return {
+        "periodo": {"data_inicio": dia, "data_fim": dia},
+        "estatisticas": {
+            "total_cadastros": len(lista_cadastros),
+            "total_pedidos": len(lista_pedidos),
+            "cpfs_disponiveis": len(cpfs)
+        },
+        "dados": {"cadastros": lista_cadastros, "pedidos": lista_pedidos}
+    }
+
+def _registros_estimados_por_dia(especificacao: EspecificacaoJob) -> int:
+    """Registros esperados num dia, para reservar memória (pelo teto quando o volume é sorteado)."""
+    if PERFIL_CARGA is not None:
+        # Folga sobre a média para os dias de pico da sazonalidade e da variação de Poisson
+        padrao = {tabela: 3 * volume for tabela, volume in PERFIL_CARGA.volume_diario.items()}
+    else:
+        padrao = {"cadastros": 20, "pedidos": 90}
+    cadastros = padrao["cadastros"] if especificacao.cadastros_por_dia is None else especificacao.cadastros_por_dia
+    pedidos = padrao["pedidos"] if especificacao.pedidos_por_dia is None else especificacao.pedidos_por_dia
+    return int(cadastros + pedidos)
+
+class _Escrita:
+    """Destino dos dias de um job, conforme formato e sink."""
+
+    def __init__(self, job: "Job"):
+        self.job = job
+        self.especificacao = job.especificacao
+        self._escritores = {}
+        self._arquivos = {}
+
+    def existente(self, dia: date) -> bool:
+        """Dia já gravado numa partição (só no formato csv com arquivos)."""
+        return (
+            self.especificacao.sink == "arquivos" and self.especificacao.formato == "csv"
+            and os.path.isdir(caminho_particao(dia, PARTICOES_PATH))
+        )
+
+    def escrever(self, dia: date, dados: Dict):
+        if self.especificacao.sink == "postgres":
+            carregador_postgres.copiar_dados(dados)
+            return
+        if self.especificacao.formato == "csv":
+            salvar_particao(dados, dia, PARTICOES_PATH)
+            self.job.artefatos.append(caminho_particao(dia, PARTICOES_PATH))
+            return
+
+        os.makedirs(self.job.pasta, exist_ok=True)
+        for tabela, registros in dados["dados"].items():
+            if self.especificacao.formato == "parquet":
+                self._escrever_parquet(tabela, registros)
+            else:
+                self._escrever_ndjson(tabela, registros)
+
+    def _caminho(self, tabela: str) -> str:
+        caminho = os.path.join(self.job.pasta, f"{tabela}.{self.especificacao.formato}")
+        if caminho not in self.job.artefatos:
+            self.job.artefatos.append(caminho)
+        return caminho
+
+    def _escrever_parquet(self, tabela: str, registros: List[Dict]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        from esquemas import schema_arrow
+        from streaming import schema_registros
+
+        if tabela not in self._escritores:
+            schema = schema_arrow(tabela)
+            self._escritores[tabela] = (
+                pq.ParquetWriter(self._caminho(tabela), schema, compression="zstd"), schema, schema_registros(schema)
+            )
+        escritor, schema, schema_texto = self._escritores[tabela]
+        if registros:
+            escritor.write_batch(pa.RecordBatch.from_pylist(registros, schema=schema_texto).cast(schema))
+
+    def _escrever_ndjson(self, tabela: str, registros: List[Dict]):
+        if tabela not in self._arquivos:
+            self._arquivos[tabela] = open(self._caminho(tabela), "wb")
+        arquivo = self._arquivos[tabela]
+        for registro in registros:
+            arquivo.write(serializar_json(registro) + b"\n")
+
+    def fechar(self):
+        for escritor, _, _ in self._escritores.values():
+            escritor.close()
+        for arquivo in self._arquivos.values():
+            arquivo.close()
+
+class Job:
+    """Estado e progresso de um job."""
+
+    def __init__(self, especificacao: EspecificacaoJob):
+        self.id = uuid.uuid4().hex[:12]
+        self.especificacao = especificacao
+        self.seed = API_SEED_PARTICOES if especificacao.seed is None else especificacao.seed
+        data_fim = especificacao.data_fim or date.today()
+        self.dias = [especificacao.data_inicio + timedelta(days=i) for i in range((data_fim - especificacao.data_inicio).days + 1)]
+        self.pasta = os.path.join(JOBS_PATH, self.id)
+        self.estado = "na_fila"
+        self.erro: Optional[str] = None
+        self.artefatos: List[str] = []
+        self.linhas = {"cadastros": 0, "pedidos": 0}
+        self.dias_gerados = 0
+        self.dias_existentes = 0
+        self.criado_em = datetime.now()
+        self.iniciado_em: Optional[datetime] = None
+        self.encerrado_em: Optional[datetime] = None
+        self.cancelado = threading.Event()
+        self._inicio = None
+        self._futuro = None
+
+    def registrar_dia(self, dados: Dict):
+        self.linhas["cadastros"] += dados["estatisticas"]["total_cadastros"]
+        self.linhas["pedidos"] += dados["estatisticas"]["total_pedidos"]
+        self.dias_gerados += 1
+
+    def status(self) -> Dict:
+        """Estado e progresso (linhas, linhas/s e ETA pela média dos dias já gerados)."""
+        decorrido = (time.perf_counter() - self._inicio) if self._inicio is not None else 0.0
+        if self.encerrado_em is not None and self.iniciado_em is not None:
+            decorrido = (self.encerrado_em - self.iniciado_em).total_seconds()
+        concluidos = self.dias_gerados + self.dias_existentes
+        total_linhas = sum(self.linhas.values())
+        eta = None
+        if self.estado == "executando" and self.dias_gerados:
+            eta = round(decorrido / self.dias_gerados * (len(self.dias) - concluidos), 1)
+        return {
+            "id": self.id,
+            "estado": self.estado,
+            "especificacao": self.especificacao.model_dump(mode="json"),
+            "seed": self.seed,
+            "progresso": {
+                "dias_total": len(self.dias),
+                "dias_concluidos": concluidos,
+                "dias_existentes": self.dias_existentes,
+                "linhas": dict(self.linhas, total=total_linhas),
+                "linhas_por_s": round(total_linhas / decorrido) if decorrido > 0 else None,
+                "decorrido_s": round(decorrido, 1),
+                "eta_s": eta
+            },
+            "artefatos": list(self.artefatos),
+            "erro": self.erro,
+            "criado_em": self.criado_em.isoformat(),
+            "iniciado_em": self.iniciado_em.isoformat() if self.iniciado_em else None,
+            "encerrado_em": self.encerrado_em.isoformat() if self.encerrado_em else None
+        }
+
+class GerenciadorJobs:
+    """
+    Fila e execução dos jobs: JOBS_SIMULTANEOS coordenadores (threads) enviam
+    dias a um pool de processos compartilhado, limitados pelo orçamento de memória.
+    """
+
+    def __init__(self, simultaneos: int = JOBS_SIMULTANEOS, processos: int = JOBS_PROCESSOS,
+                 memoria_mb: int = JOBS_MEMORIA_MB):
+        self.simultaneos = simultaneos
+        self.processos = processos
+        self.orcamento_bytes = memoria_mb * 1024 * 1024
+        self.memoria_reservada = 0
+        self._memoria = threading.Condition()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._coordenadores = None
+        self._geradores = None
+
+    def iniciar(self):
+        self._coordenadores = ThreadPoolExecutor(max_workers=self.simultaneos, thread_name_prefix="job")
+        # spawn: os processos não herdam as threads e locks da API
+        self._geradores = ProcessPoolExecutor(
+            max_workers=self.processos, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def encerrar(self):
+        """Cancela os jobs em andamento e encerra os pools."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancelado.set()
+        with self._memoria:
+            self._memoria.notify_all()
+        if self._coordenadores is not None:
+            self._coordenadores.shutdown(wait=True, cancel_futures=True)
+            self._coordenadores = None
+        if self._geradores is not None:
+            self._geradores.shutdown(wait=True, cancel_futures=True)
+            self._geradores = None
+
+    # Jobs
+
+    def criar(self, especificacao: EspecificacaoJob) -> Job:
+        job = Job(especificacao)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._descartar_antigos()
+        job._futuro = self._coordenadores.submit(self._executar, job)
+        return job
+
+    def obter(self, id_job: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(id_job)
+
+    def listar(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancelar(self, id_job: str) -> Optional[Job]:
+        job = self.obter(id_job)
+        if job is None or job.estado in ESTADOS_FINAIS:
+            return job
+        job.cancelado.set()
+        # Um job ainda na fila sai sem chegar a executar
+        if job._futuro is not None and job._futuro.cancel():
+            self._encerrar_job(job, "cancelado")
+        with self._memoria:
+            self._memoria.notify_all()
+        return job
+
+    def _descartar_antigos(self):
+        encerrados = [id_job for id_job, job in self._jobs.items() if job.estado in ESTADOS_FINAIS]
+        for id_job in encerrados[:max(0, len(encerrados) - JOBS_HISTORICO)]:
+            del self._jobs[id_job]
+
+    @staticmethod
+    def _encerrar_job(job: Job, estado: str, erro: Optional[str] = None):
+        job.estado = estado
+        job.erro = erro
+        job.encerrado_em = datetime.now()
+
+    # Orçamento de memória
+
+    def _reservar(self, quantidade: int, job: Job, esperar: bool) -> bool:
+        """
+        Reserva memória para um dia. Sem esperar, falha se não houver espaço;
+        esperando, bloqueia até haver espaço (ou o job ser cancelado). Um dia
+        maior que o orçamento inteiro roda sozinho, em vez de nunca rodar.
+        """
+        with self._memoria:
+            while self.memoria_reservada and self.memoria_reservada + quantidade > self.orcamento_bytes:
+                if not esperar or job.cancelado.is_set():
+                    return False
+                self._memoria.wait(timeout=0.5)
+            self.memoria_reservada += quantidade
+            return True
+
+    def _liberar(self, quantidade: int):
+        with self._memoria:
+            self.memoria_reservada -= quantidade
+            self._memoria.notify_all()
+
+    # Execução
+
+    def _executar(self, job: Job):
+        if job.cancelado.is_set():
+            self._encerrar_job(job, "cancelado")
+            return
+
+        job.estado = "executando"
+        job.iniciado_em = datetime.now()
+        job._inicio = time.perf_counter()
+        especificacao = job.especificacao
+        reserva = _registros_estimados_por_dia(especificacao) * BYTES_POR_REGISTRO
+        escrita = _Escrita(job)
+        dias = iter(job.dias)
+        adiado = None
+        pendentes = deque()
+        logger.info("Job %s iniciado: %d dias, formato %s, sink %s",
+                    job.id, len(job.dias), especificacao.formato, especificacao.sink)
+        try:
+            while True:
+                # Mantém até `processos` dias do job em andamento, enquanto houver memória
+                while not job.cancelado.is_set() and len(pendentes) < self.processos:
+                    # Um dia que ficou sem memória na volta anterior vem antes dos demais
+                    dia, adiado = (adiado, None) if adiado is not None else (next(dias, None), None)
+                    if dia is None:
+                        break
+                    if escrita.existente(dia):
+                        job.dias_existentes += 1
+                        continue
+                    if not self._reservar(reserva, job, esperar=not pendentes):
+                        adiado = dia
+                        break
+                    futuro = self._geradores.submit(
+                        gerar_dia, job.seed, dia.isoformat(), especificacao.cadastros_por_dia, especificacao.pedidos_por_dia
+                    )
+                    pendentes.append((dia, futuro))
+
+                if not pendentes:
+                    break
+
+                # Os dias são gravados na ordem do período
+                dia, futuro = pendentes.popleft()
+                try:
+                    dados = futuro.result()
+                finally:
+                    self._liberar(reserva)
+                if job.cancelado.is_set():
+                    continue
+                escrita.escrever(dia, dados)
+                job.registrar_dia(dados)
+
+            self._encerrar_job(job, "cancelado" if job.cancelado.is_set() else "concluido")
+        except Exception as e:
+            for _, futuro in pendentes:
+                futuro.cancel()
+            for _ in pendentes:
+                self._liberar(reserva)
+            # Na parada da API, os dias em andamento são cancelados junto com o pool
+            if job.cancelado.is_set():
+                self._encerrar_job(job, "cancelado")
+            else:
+                logger.exception("Job %s falhou", job.id)
+                self._encerrar_job(job, "erro", str(e))
+        finally:
+            escrita.fechar()
+        logger.info("Job %s %s: %s", job.id, job.estado, job.linhas)
+
+    def status(self) -> Dict:
+        with self._lock:
+            estados = [job.estado for job in self._jobs.values()]
+        return {
+            "simultaneos": self.simultaneos,
+            "processos": self.processos,
+            "memoria_mb": self.orcamento_bytes // (1024 * 1024),
+            "memoria_reservada_mb": round(self.memoria_reservada / (1024 * 1024), 1),
+            "jobs": {estado: estados.count(estado) for estado in ("na_fila", "executando", *ESTADOS_FINAIS)}
+        }
+
+gerenciador_jobs = GerenciadorJobs()
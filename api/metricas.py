@@ -0,0 +1,175 @@
+"""
+Métricas da API no formato texto do Prometheus (exposto em /metrics).
+
+Contadores, histogramas e medidores simples, sem dependência externa: cada
+observação custa um lock e uma busca binária nos limites do histograma.
+Medidores com função (ex.: fila do executor) são lidos só na coleta.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Limites (em segundos) dos histogramas de latência
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _formatar_rotulos(nomes: Tuple[str, ...], valores: Tuple, extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Tuple[str, ...] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos: Dict) -> Tuple:
+        return tuple(rotulos[nome] for nome in self.rotulos)
+
+    def _cabecalho(self) -> List[str]:
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+
+class Contador(_Metrica):
+    """Valor que só cresce (requisições, linhas geradas)."""
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Tuple[str, ...] = ()):
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: Dict[Tuple, float] = {}
+
+    def inc(self, valor: float = 1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def coletar(self) -> List[str]:
+        with self._lock:
+            valores = list(self._valores.items())
+        return self._cabecalho() + [
+            f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}"
+            for chave, valor in valores
+        ]
+
+class Histograma(_Metrica):
+    """Distribuição de durações em faixas cumulativas, com soma e contagem."""
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Tuple[str, ...] = (), limites=LIMITES_LATENCIA):
+        super().__init__(nome, ajuda, rotulos)
+        self.limites = tuple(sorted(limites))
+        # Por combinação de rótulos: [contagens por faixa (+Inf no fim), soma]
+        self._series: Dict[Tuple, list] = {}
+
+    def observar(self, valor: float, **rotulos):
+        chave = self._chave(rotulos)
+        faixa = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * (len(self.limites) + 1), 0.0]
+            serie[0][faixa] += 1
+            serie[1] += valor
+
+    @contextmanager
+    def cronometrar(self, **rotulos):
+        """Observa a duração do bloco, mesmo se ele lançar uma exceção."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **rotulos)
+
+    def coletar(self) -> List[str]:
+        with self._lock:
+            series = [(chave, list(contagens), soma) for chave, (contagens, soma) in self._series.items()]
+        linhas = self._cabecalho()
+        for chave, contagens, soma in series:
+            acumulado = 0
+            for limite, contagem in zip(self.limites + (float("inf"),), contagens):
+                acumulado += contagem
+                rotulos = _formatar_rotulos(self.rotulos, chave, f'le="{_formatar_numero(float(limite))}"')
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            rotulos = _formatar_rotulos(self.rotulos, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{rotulos} {acumulado}")
+        return linhas
+
+class Medidor(_Metrica):
+    """Valor instantâneo, lido de uma função no momento da coleta."""
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, funcao: Callable[[], float]):
+        super().__init__(nome, ajuda)
+        self.funcao = funcao
+
+    def coletar(self) -> List[str]:
+        return self._cabecalho() + [f"{self.nome} {_formatar_numero(self.funcao())}"]
+
+class RegistroMetricas:
+    """Conjunto de métricas exportadas juntas em /metrics."""
+
+    def __init__(self):
+        self._metricas: List[_Metrica] = []
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        self._metricas.append(metrica)
+        return metrica
+
+    def contador(self, nome: str, ajuda: str, rotulos: Tuple[str, ...] = ()) -> Contador:
+        return self.registrar(Contador(nome, ajuda, rotulos))
+
+    def histograma(self, nome: str, ajuda: str, rotulos: Tuple[str, ...] = (), limites=LIMITES_LATENCIA) -> Histograma:
+        return self.registrar(Histograma(nome, ajuda, rotulos, limites))
+
+    def medidor(self, nome: str, ajuda: str, funcao: Callable[[], float]) -> Medidor:
+        return self.registrar(Medidor(nome, ajuda, funcao))
+
+    def exportar(self) -> str:
+        """Todas as métricas no formato texto do Prometheus (versão 0.0.4)."""
+        linhas = []
+        for metrica in self._metricas:
+            linhas.extend(metrica.coletar())
+        return "\n".join(linhas) + "\n"
+
+registro_metricas = RegistroMetricas()
+
+# Métricas da API
+requisicoes = registro_metricas.contador(
+    "dw_api_requisicoes_total", "Requisições atendidas, por endpoint e status HTTP", ("endpoint", "status")
+)
+latencia_endpoint = registro_metricas.histograma(
+    "dw_api_latencia_segundos", "Latência das requisições por endpoint (até o início da resposta)", ("endpoint",)
+)
+duracao_etapa = registro_metricas.histograma(
+    "dw_api_etapa_segundos", "Duração das etapas internas (geracao, serializacao, compressao, escrita_csv, carga_postgres)", ("etapa",)
+)
+linhas_geradas = registro_metricas.contador(
+    "dw_api_linhas_geradas_total", "Registros gerados, por tabela", ("tabela",)
+)
+eventos_stream = registro_metricas.contador(
+    "dw_api_stream_eventos_total", "Eventos enviados pelos streams em tempo real, por tipo", ("tipo",)
+)
+atraso_stream = registro_metricas.histograma(
+    "dw_api_stream_atraso_segundos", "Atraso de cada quadro dos streams em relação ao ritmo da taxa alvo"
+)
+
+def registrar_linhas(estatisticas: Optional[Dict]):
+    """Soma os totais de gerar_dados_periodo/iterar_dados_periodo ao contador de linhas."""
+    if not estatisticas:
+        return
+    linhas_geradas.inc(estatisticas.get("total_cadastros", 0), tabela="cadastros")
+    linhas_geradas.inc(estatisticas.get("total_pedidos", 0), tabela="pedidos")
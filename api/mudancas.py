@@ -0,0 +1,189 @@
+"""
+Feed de mudanças (CDC) do status dos pedidos.
+
+O ciclo de vida de cada pedido (ciclo_pedidos.py) é função só de
+(id_pedido, data_pedido), então as mudanças de qualquer intervalo podem ser
+recalculadas sem guardar estado entre chamadas, e batem com o status que o
+gerador grava nas partições e em /dados/periodo.
+
+O feed tem um evento "insert" na criação e um "update" por transição, com
+updated_at; aplicado em ordem (MERGE por id_pedido), leva ao status atual.
+
+Na API, os pedidos de cada dia são os das partições data=YYYY-MM-DD (mesma
+seed e mesmo dia). Cada janela vai de `desde` a no máximo
+MUDANCAS_JANELA_DIAS dias depois e é entregue em páginas. Os eventos saem
+por dia de criação do pedido e, dentro do dia, em ordem de updated_at (os de
+cada pedido, portanto, em ordem); como em paginacao.py, o cursor guarda o
+dia e o deslocamento dentro dele, e cada página processa só os dias que cobre.
+"""
+import os
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ciclo_pedidos import DIAS_CICLO_MAX, PENDENTE, ciclo_de_vida
+from data_generator_api import API_SEED_PARTICOES
+from esquemas import STATUS_PEDIDO
+from paginacao import CursorInvalido, codificar_campos, decodificar_campos, registros_do_dia
+
+# Maior janela (desde -> ate) de uma chamada do feed: o custo é gerar os dias
+# da janela mais DIAS_CICLO_MAX dias antes dela (pedidos ainda abertos)
+MUDANCAS_JANELA_DIAS = int(os.getenv("API_MUDANCAS_JANELA_DIAS", 7))
+
+# Dias de pedidos (com o ciclo de vida calculado) mantidos em memória pelo feed
+DIAS_EM_CACHE = 128
+
+# Versão e tipo do cursor do feed (não é aceito como cursor de /dados/paginas, nem o contrário)
+VERSAO_CURSOR_MUDANCAS = 2
+TIPO_CURSOR_MUDANCAS = "mudancas"
+
+def mudancas_no_intervalo(
+    criados_em: np.ndarray,
+    momentos: np.ndarray,
+    destinos: np.ndarray,
+    desde: np.datetime64,
+    ate: np.datetime64
+) -> Dict[str, np.ndarray]:
+    """
+    Eventos com desde < updated_at <= ate, em ordem de updated_at.
+
+    Returns:
+        dict com 'indice' (linha do pedido), 'etapa' (-1 no insert, senão a
+        transição), 'operacao', 'status_pedido' e 'status_anterior' (códigos;
+        -1 no insert) e 'updated_at'
+    """
+    criados = np.flatnonzero((criados_em > desde) & (criados_em <= ate))
+    linhas, etapas = np.nonzero((momentos > desde) & (momentos <= ate))
+    anteriores = np.where(etapas > 0, destinos[linhas, np.maximum(etapas - 1, 0)], PENDENTE)
+
+    indice = np.concatenate([criados, linhas])
+    etapa = np.concatenate([np.full(len(criados), -1), etapas])
+    updated_at = np.concatenate([criados_em[criados], momentos[linhas, etapas]])
+    # Empates no mesmo segundo: o insert vem antes das transições, e estas na ordem do ciclo
+    ordem = np.lexsort((etapa, indice, updated_at))
+    return {
+        'indice': indice[ordem],
+        'etapa': etapa[ordem],
+        'operacao': np.where(np.arange(len(indice)) < len(criados), 'insert', 'update').astype(object)[ordem],
+        'status_pedido': np.concatenate([np.full(len(criados), PENDENTE, dtype=np.int8), destinos[linhas, etapas]])[ordem],
+        'status_anterior': np.concatenate([np.full(len(criados), -1, dtype=np.int8), anteriores])[ordem],
+        'updated_at': updated_at[ordem],
+    }
+
+@lru_cache(maxsize=DIAS_EM_CACHE)
+def _pedidos_do_dia(seed: int, dia: date) -> Tuple[List[Dict], np.ndarray, np.ndarray, np.ndarray]:
+    """Pedidos da partição do dia com instante de criação e ciclo de vida."""
+    pedidos = registros_do_dia(seed, 'pedidos', dia)
+    criados_em, momentos, destinos = ciclo_de_vida(
+        [pedido['id_pedido'] for pedido in pedidos], np.full(len(pedidos), np.datetime64(dia, 'D'))
+    )
+    return pedidos, criados_em, momentos, destinos
+
+def limitar_janela(desde: datetime, ate: datetime) -> datetime:
+    """Fim efetivo da janela: `ate`, ou MUDANCAS_JANELA_DIAS depois de `desde` se for antes."""
+    return min(ate, desde + timedelta(days=MUDANCAS_JANELA_DIAS))
+
+def mudancas_do_dia(seed: int, dia: date, desde: datetime, ate: datetime) -> List[Dict]:
+    """
+    Mudanças dos pedidos criados em `dia` com desde < updated_at <= ate, em
+    ordem de updated_at: cada evento é o pedido completo com o status após a
+    mudança, operacao (insert/update), updated_at e status_anterior.
+    """
+    pedidos, criados_em, momentos, destinos = _pedidos_do_dia(seed, dia)
+    eventos = mudancas_no_intervalo(
+        criados_em, momentos, destinos, np.datetime64(desde, 's'), np.datetime64(ate, 's')
+    )
+    return [
+        {
+            **pedidos[indice],
+            'status_pedido': STATUS_PEDIDO[status],
+            'operacao': operacao,
+            'updated_at': updated_at,
+            'status_anterior': STATUS_PEDIDO[anterior] if anterior >= 0 else None
+        }
+        for indice, operacao, status, anterior, updated_at in zip(
+            eventos['indice'].tolist(), eventos['operacao'], eventos['status_pedido'].tolist(),
+            eventos['status_anterior'].tolist(), eventos['updated_at'].astype(str)
+        )
+    ]
+
+def primeiro_dia(desde: datetime) -> date:
+    """Dia de criação mais antigo com pedidos que ainda podem mudar depois de `desde`."""
+    return desde.date() - timedelta(days=DIAS_CICLO_MAX)
+
+def gerar_mudancas(desde: datetime, ate: datetime, seed: Optional[int] = None) -> List[Dict]:
+    """Todas as mudanças da janela (já limitada), na ordem das páginas de pagina_mudancas."""
+    seed = API_SEED_PARTICOES if seed is None else seed
+    mudancas = []
+    dia = primeiro_dia(desde)
+    while dia <= ate.date():
+        mudancas.extend(mudancas_do_dia(seed, dia, desde, ate))
+        dia += timedelta(days=1)
+    return mudancas
+
+class CursorMudancas:
+    """Posição no feed: janela (seed, desde, ate) e próximo evento (dia de criação e deslocamento no dia)."""
+
+    def __init__(self, seed: int, desde: datetime, ate: datetime, dia: Optional[date] = None, deslocamento: int = 0):
+        self.seed = seed
+        self.desde = desde
+        self.ate = ate
+        self.dia = primeiro_dia(desde) if dia is None else dia
+        self.deslocamento = deslocamento
+
+    def codificar(self) -> str:
+        return codificar_campos([
+            VERSAO_CURSOR_MUDANCAS, TIPO_CURSOR_MUDANCAS, self.seed,
+            self.desde.isoformat(), self.ate.isoformat(), self.dia.isoformat(), self.deslocamento
+        ])
+
+    @classmethod
+    def decodificar(cls, texto: str) -> "CursorMudancas":
+        campos = decodificar_campos(texto)
+        try:
+            versao, tipo, seed, desde, ate, dia, deslocamento = campos
+            cursor = cls(
+                int(seed), datetime.fromisoformat(desde), datetime.fromisoformat(ate),
+                date.fromisoformat(dia), int(deslocamento)
+            )
+        except (ValueError, TypeError) as e:
+            raise CursorInvalido(f"Cursor inválido: {texto}") from e
+        if (versao != VERSAO_CURSOR_MUDANCAS or tipo != TIPO_CURSOR_MUDANCAS or cursor.deslocamento < 0
+                or cursor.desde >= cursor.ate or limitar_janela(cursor.desde, cursor.ate) != cursor.ate
+                or not primeiro_dia(cursor.desde) <= cursor.dia <= cursor.ate.date()):
+            raise CursorInvalido(f"Cursor inválido: {texto}")
+        return cursor
+
+def cursor_mudancas(desde: datetime, ate: datetime, seed: Optional[int] = None) -> CursorMudancas:
+    """Cursor da primeira página da janela (o fim é limitado a MUDANCAS_JANELA_DIAS)."""
+    return CursorMudancas(API_SEED_PARTICOES if seed is None else seed, desde, limitar_janela(desde, ate))
+
+def pagina_mudancas(cursor: str, limite: int) -> Tuple[List[Dict], Optional[str], Dict]:
+    """
+    Até `limite` eventos a partir do cursor, o cursor da página seguinte (None
+    na última página da janela) e a janela ({"desde", "ate"}).
+
+    Como em paginacao.gerar_pagina, só os dias que a página cobre são
+    processados: a geração para assim que `limite` eventos foram reunidos.
+    """
+    posicao = CursorMudancas.decodificar(cursor)
+    janela = {"desde": posicao.desde.isoformat(), "ate": posicao.ate.isoformat()}
+    mudancas: List[Dict] = []
+    dia, deslocamento = posicao.dia, posicao.deslocamento
+    while dia <= posicao.ate.date():
+        do_dia = mudancas_do_dia(posicao.seed, dia, posicao.desde, posicao.ate)
+        faltam = limite - len(mudancas)
+        mudancas.extend(do_dia[deslocamento:deslocamento + faltam])
+        if deslocamento + faltam < len(do_dia):
+            # A página acabou no meio do dia: a próxima continua nele
+            proximo = CursorMudancas(posicao.seed, posicao.desde, posicao.ate, dia, deslocamento + faltam)
+            return mudancas, proximo.codificar(), janela
+        dia, deslocamento = dia + timedelta(days=1), 0
+        if len(mudancas) == limite:
+            break
+
+    if dia > posicao.ate.date():
+        return mudancas, None, janela
+    return mudancas, CursorMudancas(posicao.seed, posicao.desde, posicao.ate, dia).codificar(), janela
@@ -0,0 +1,121 @@
+"""
+Paginação por cursor dos dados gerados, para períodos longos.
+
+Cada dia é gerado só a partir de (seed, data), como nas partições de
+gerar_dados_particionados, então qualquer página pode ser refeita sozinha:
+o cursor guarda a seed, a tabela, o fim da fatia e a posição (dia e
+deslocamento dentro do dia). Uma página gera apenas os dias que cobre
+(O(tamanho da página + um dia)), sem passar pelas páginas anteriores.
+
+fatiar_periodo divide o período em fatias de dias com um cursor inicial
+cada, para que clientes (ex.: tasks do Airflow) percorram fatias em paralelo.
+"""
+import base64
+import binascii
+import json
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from data_generator_api import API_SEED_PARTICOES, gerar_dados_periodo, semente_dia
+
+# Versão do formato do cursor (cursores de outra versão são recusados)
+VERSAO_CURSOR = 1
+
+TABELAS = ('cadastros', 'pedidos')
+
+class CursorInvalido(ValueError):
+    """Lançada para cursores que não foram emitidos por esta API (ou de outra versão)."""
+
+class Cursor:
+    """Posição de uma página: próximo registro a enviar e fim da fatia."""
+
+    def __init__(self, seed: int, tabela: str, dia: date, data_fim: date, deslocamento: int = 0):
+        self.seed = seed
+        self.tabela = tabela
+        self.dia = dia
+        self.data_fim = data_fim
+        self.deslocamento = deslocamento
+
+    def codificar(self) -> str:
+        """Texto opaco (base64url de um JSON compacto) enviado ao cliente."""
+        return codificar_campos([
+            VERSAO_CURSOR, self.seed, self.tabela, self.dia.isoformat(), self.data_fim.isoformat(), self.deslocamento
+        ])
+
+    @classmethod
+    def decodificar(cls, texto: str) -> "Cursor":
+        campos = decodificar_campos(texto)
+        try:
+            versao, seed, tabela, dia, data_fim, deslocamento = campos
+            cursor = cls(int(seed), tabela, date.fromisoformat(dia), date.fromisoformat(data_fim), int(deslocamento))
+        except (ValueError, TypeError) as e:
+            raise CursorInvalido(f"Cursor inválido: {texto}") from e
+        if versao != VERSAO_CURSOR or tabela not in TABELAS or cursor.deslocamento < 0 or cursor.dia > cursor.data_fim:
+            raise CursorInvalido(f"Cursor inválido: {texto}")
+        return cursor
+
+def codificar_campos(campos: List) -> str:
+    """Lista de campos como texto opaco (base64url de um JSON compacto, sem padding)."""
+    return base64.urlsafe_b64encode(json.dumps(campos, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decodificar_campos(texto: str) -> List:
+    """Inverso de codificar_campos; CursorInvalido se o texto não é uma lista codificada."""
+    try:
+        campos = json.loads(base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise CursorInvalido(f"Cursor inválido: {texto}") from e
+    if not isinstance(campos, list):
+        raise CursorInvalido(f"Cursor inválido: {texto}")
+    return campos
+
+def registros_do_dia(seed: int, tabela: str, dia: date) -> List[Dict]:
+    """Registros de uma tabela num dia (os mesmos da partição data=YYYY-MM-DD)."""
+    dados = gerar_dados_periodo(dia.isoformat(), dia.isoformat(), semente_dia(seed, dia))
+    return dados['dados'][tabela]
+
+def cursor_inicial(data_inicio: date, data_fim: date, tabela: str, seed: Optional[int] = None) -> Cursor:
+    return Cursor(API_SEED_PARTICOES if seed is None else seed, tabela, data_inicio, data_fim)
+
+def gerar_pagina(cursor: str, limite: int) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Até `limite` registros a partir do cursor e o cursor da página seguinte
+    (None na última página da fatia).
+    """
+    posicao = Cursor.decodificar(cursor)
+    registros: List[Dict] = []
+    dia, deslocamento = posicao.dia, posicao.deslocamento
+    while dia <= posicao.data_fim:
+        do_dia = registros_do_dia(posicao.seed, posicao.tabela, dia)
+        faltam = limite - len(registros)
+        registros.extend(do_dia[deslocamento:deslocamento + faltam])
+        if deslocamento + faltam < len(do_dia):
+            # A página acabou no meio do dia: a próxima continua nele
+            proximo = Cursor(posicao.seed, posicao.tabela, dia, posicao.data_fim, deslocamento + faltam)
+            return registros, proximo.codificar()
+        dia, deslocamento = dia + timedelta(days=1), 0
+        if len(registros) == limite:
+            break
+
+    if dia > posicao.data_fim:
+        return registros, None
+    return registros, Cursor(posicao.seed, posicao.tabela, dia, posicao.data_fim).codificar()
+
+def fatiar_periodo(
+    data_inicio: date,
+    data_fim: date,
+    tabela: str,
+    dias_por_fatia: int,
+    seed: Optional[int] = None
+) -> List[Dict]:
+    """Fatias de até `dias_por_fatia` dias do período, cada uma com o seu cursor inicial."""
+    fatias = []
+    inicio = data_inicio
+    while inicio <= data_fim:
+        fim = min(inicio + timedelta(days=dias_por_fatia - 1), data_fim)
+        fatias.append({
+            "data_inicio": inicio.isoformat(),
+            "data_fim": fim.isoformat(),
+            "cursor": cursor_inicial(inicio, fim, tabela, seed).codificar()
+        })
+        inicio = fim + timedelta(days=1)
+    return fatias
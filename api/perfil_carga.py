@@ -0,0 +1,137 @@
+"""
+Perfil de carga: volumes por dia, sazonalidade, concentração de clientes e
+mix de status dos pedidos, lidos de um arquivo TOML (ver perfis/padrao.toml).
+
+Todas as amostragens são vetorizadas com NumPy. O perfil é usado pelo
+gerador colunar (scripts/data_generator.py --perfil) e pela API
+(variável de ambiente API_PERFIL_CARGA).
+"""
+import os
+import tomllib
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from esquemas import STATUS_PEDIDO
+
+# Perfil distribuído junto com a API
+PERFIL_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfis", "padrao.toml")
+
+DISTRIBUICOES_CLIENTES = ("uniforme", "zipf", "pareto")
+
+def _pesos(valores, quantidade: int, nome: str) -> np.ndarray:
+    pesos = np.asarray(valores, dtype=float)
+    if pesos.shape != (quantidade,) or (pesos < 0).any() or pesos.sum() == 0:
+        raise ValueError(f"{nome} deve ter {quantidade} pesos não negativos (recebido: {valores})")
+    return pesos
+
+class PerfilCarga:
+    """
+    Modelo de carga carregado de um TOML com as seções:
+
+    - [volume]: cadastros_por_dia e pedidos_por_dia (médias num dia de peso 1)
+    - [sazonalidade]: meses (12 pesos, jan-dez) e dias_semana (7 pesos, seg-dom)
+    - [clientes]: distribuicao ("uniforme", "zipf" ou "pareto") e expoente
+    - [[status.faixas]]: mix de status por idade do pedido (ate_dias; a última
+      faixa, sem ate_dias, vale para os pedidos mais antigos). Usado pelo
+      gerador colunar; na API o status vem do ciclo de vida (ciclo_pedidos.py),
+      para bater com o feed de mudanças
+    """
+
+    def __init__(self, config: Dict, nome: str = "personalizado"):
+        self.nome = config.get("nome", nome)
+
+        volume = config.get("volume", {})
+        self.volume_diario = {
+            "cadastros": float(volume.get("cadastros_por_dia", 5)),
+            "pedidos": float(volume.get("pedidos_por_dia", 40)),
+        }
+
+        sazonalidade = config.get("sazonalidade", {})
+        self.pesos_mes = _pesos(sazonalidade.get("meses", [1.0] * 12), 12, "sazonalidade.meses")
+        self.pesos_dia_semana = _pesos(sazonalidade.get("dias_semana", [1.0] * 7), 7, "sazonalidade.dias_semana")
+
+        clientes = config.get("clientes", {})
+        self.distribuicao_clientes = clientes.get("distribuicao", "uniforme")
+        if self.distribuicao_clientes not in DISTRIBUICOES_CLIENTES:
+            raise ValueError(f"clientes.distribuicao inválida: {self.distribuicao_clientes}")
+        self.expoente_clientes = float(clientes.get("expoente", 1.1))
+
+        # Faixas de idade (limite superior em dias, inf na última) e CDF dos status em cada uma
+        faixas = config.get("status", {}).get("faixas", [{}])
+        self.limites_status = np.array([faixa.get("ate_dias", np.inf) for faixa in faixas], dtype=float)
+        if not np.all(np.diff(self.limites_status) > 0) or np.isfinite(self.limites_status[-1]):
+            raise ValueError("status.faixas deve ter ate_dias crescente e a última faixa sem ate_dias")
+        self.cdf_status = np.array([
+            np.cumsum(_pesos([faixa.get(status, 1.0) for status in STATUS_PEDIDO], len(STATUS_PEDIDO), "status.faixas"))
+            for faixa in faixas
+        ])
+        self.cdf_status /= self.cdf_status[:, -1:]
+
+    # Calendário
+
+    def pesos_diarios(self, inicio: date, fim: date) -> Tuple[np.ndarray, np.ndarray]:
+        """Dias do período (datetime64[D]) e o peso de cada um (mês x dia da semana)."""
+        dias = np.arange(np.datetime64(inicio, "D"), np.datetime64(fim, "D") + 1)
+        meses = dias.astype("datetime64[M]").astype(np.int64) % 12
+        # 1970-01-01 foi uma quinta-feira; 0 = segunda
+        dias_semana = (dias.astype(np.int64) + 3) % 7
+        return dias, self.pesos_mes[meses] * self.pesos_dia_semana[dias_semana]
+
+    def volume_esperado(self, tabela: str, inicio: date, fim: date, escala: float = 1.0) -> int:
+        """Total esperado de registros da tabela no período."""
+        _, pesos = self.pesos_diarios(inicio, fim)
+        return int(round(self.volume_diario[tabela] * escala * pesos.sum()))
+
+    def sortear_volume(self, rng, tabela: str, inicio: date, fim: date, escala: float = 1.0) -> int:
+        """Total de registros no período, com variação de Poisson dia a dia."""
+        _, pesos = self.pesos_diarios(inicio, fim)
+        return int(rng.poisson(self.volume_diario[tabela] * escala * pesos).sum())
+
+    def sortear_datas(self, rng, inicio: date, fim: date, quantidade: int) -> np.ndarray:
+        """Datas (datetime64[s]) distribuídas conforme a sazonalidade do perfil."""
+        dias, pesos = self.pesos_diarios(inicio, fim)
+        return rng.choice(dias, size=quantidade, p=pesos / pesos.sum()).astype("datetime64[s]")
+
+    # Clientes
+
+    def pesos_clientes(self, rng, quantidade: int) -> np.ndarray:
+        """
+        Probabilidade de cada cliente fazer um pedido.
+
+        Na Zipf, o cliente de posição k tem peso k^-expoente; as posições são
+        sorteadas para que os clientes mais ativos não sejam sempre os primeiros.
+        """
+        if self.distribuicao_clientes == "zipf":
+            pesos = (rng.permutation(quantidade) + 1.0) ** -self.expoente_clientes
+        elif self.distribuicao_clientes == "pareto":
+            pesos = rng.pareto(self.expoente_clientes, size=quantidade) + 1.0
+        else:
+            pesos = np.ones(quantidade)
+        return pesos / pesos.sum()
+
+    @staticmethod
+    def sortear_clientes(rng, pesos: np.ndarray, quantidade: int) -> np.ndarray:
+        """Índices dos clientes de cada pedido, conforme os pesos."""
+        return rng.choice(len(pesos), size=quantidade, p=pesos)
+
+    # Status
+
+    def sortear_status(self, rng, idades_dias) -> np.ndarray:
+        """Códigos (índices de STATUS_PEDIDO) conforme a idade de cada pedido em dias."""
+        idades = np.asarray(idades_dias, dtype=float)
+        faixas = np.searchsorted(self.limites_status, idades, side="left")
+        sorteios = rng.random(len(idades))
+        codigos = np.empty(len(idades), dtype=np.int8)
+        for faixa, cdf in enumerate(self.cdf_status):
+            selecao = faixas == faixa
+            codigos[selecao] = np.searchsorted(cdf, sorteios[selecao], side="right")
+        return np.minimum(codigos, len(STATUS_PEDIDO) - 1)
+
+def carregar_perfil(caminho: Optional[str] = None) -> PerfilCarga:
+    """Lê um perfil TOML (por padrão, perfis/padrao.toml)."""
+    caminho = caminho or PERFIL_PADRAO
+    with open(caminho, "rb") as arquivo:
+        config = tomllib.load(arquivo)
+    return PerfilCarga(config, nome=os.path.splitext(os.path.basename(caminho))[0])
@@ -0,0 +1,101 @@
+"""
+Serialização das respostas JSON e compressão negociada pelo Accept-Encoding.
+
+O JSON é gerado pelo orjson quando instalado (o mesmo documento compacto do
+json da biblioteca padrão, em uma fração do tempo) e pode vir orientado a
+colunas: em dados.cadastros e dados.pedidos, um objeto {coluna: [valores]}
+em vez de uma lista de objetos que repete as chaves em cada linha.
+
+A compressão (zstd, br ou gzip) só é aplicada a corpos a partir de
+API_COMPRESSAO_MIN_BYTES e nas codificações que o cliente aceita. gzip vem
+da biblioteca padrão; zstd e br só são oferecidos se os pacotes zstandard e
+brotli estiverem instalados.
+"""
+import gzip
+import json
+import os
+from typing import Callable, Dict, Optional
+
+from esquemas import colunas
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Corpos menores que isto vão sem compressão (o ganho não paga o cabeçalho e a CPU)
+COMPRESSAO_MIN_BYTES = int(os.getenv("API_COMPRESSAO_MIN_BYTES", 1024))
+
+# A partir deste tamanho a compressão sai do event loop (asyncio.to_thread);
+# abaixo dele, o custo da thread é maior que o da compressão
+COMPRESSAO_THREAD_MIN_BYTES = int(os.getenv("API_COMPRESSAO_THREAD_MIN_BYTES", 64 * 1024))
+
+# Níveis escolhidos pela velocidade: respostas são comprimidas a cada requisição
+NIVEL_GZIP = int(os.getenv("API_NIVEL_GZIP", 5))
+NIVEL_ZSTD = int(os.getenv("API_NIVEL_ZSTD", 3))
+NIVEL_BROTLI = int(os.getenv("API_NIVEL_BROTLI", 4))
+
+def _compressores() -> Dict[str, Callable[[bytes], bytes]]:
+    """Codificações disponíveis neste ambiente, na ordem de preferência do servidor."""
+    compressores = {}
+    try:
+        import zstandard
+        compressores["zstd"] = zstandard.ZstdCompressor(level=NIVEL_ZSTD).compress
+    except ImportError:
+        pass
+    try:
+        import brotli
+        compressores["br"] = lambda corpo: brotli.compress(corpo, quality=NIVEL_BROTLI)
+    except ImportError:
+        pass
+    compressores["gzip"] = lambda corpo: gzip.compress(corpo, compresslevel=NIVEL_GZIP, mtime=0)
+    return compressores
+
+COMPRESSORES = _compressores()
+
+def serializar_json(conteudo: Dict) -> bytes:
+    """JSON compacto em UTF-8, como o JSONResponse do FastAPI (orjson se disponível)."""
+    if orjson is not None:
+        return orjson.dumps(conteudo)
+    return json.dumps(conteudo, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def orientar_colunas(dados: Dict) -> Dict:
+    """
+    Cópia da resposta com dados.cadastros e dados.pedidos orientados a colunas
+    ({coluna: [valores]}, na ordem do registro de esquemas, mesmo sem linhas).
+    """
+    por_coluna = {
+        tabela: {coluna: [registro[coluna] for registro in registros] for coluna in colunas(tabela)}
+        for tabela, registros in dados["dados"].items()
+    }
+    return {**dados, "dados": por_coluna}
+
+def negociar_codificacao(accept_encoding: Optional[str], tamanho: int) -> Optional[str]:
+    """
+    Codificação da resposta conforme o Accept-Encoding (com pesos q), ou None.
+
+    Entre as aceitas com o mesmo peso, vale a ordem de COMPRESSORES; q=0
+    recusa a codificação e "*" vale para as não citadas.
+    """
+    if not accept_encoding or tamanho < COMPRESSAO_MIN_BYTES:
+        return None
+
+    pesos = {}
+    for item in accept_encoding.split(","):
+        nome, _, parametros = item.strip().partition(";")
+        peso = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                peso = float(parametro[2:])
+            except ValueError:
+                peso = 0.0
+        pesos[nome.strip().lower()] = peso
+
+    padrao = pesos.get("*", 0.0)
+    candidatas = [(pesos.get(nome, padrao), nome) for nome in COMPRESSORES]
+    peso, escolhida = max(candidatas, key=lambda candidata: candidata[0])
+    return escolhida if peso > 0 else None
+
+def comprimir(corpo: bytes, codificacao: str) -> bytes:
+    return COMPRESSORES[codificacao](corpo)
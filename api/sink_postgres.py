@@ -0,0 +1,110 @@
+import asyncio
+import io
+import os
+from typing import Dict, Optional
+
+from carga_postgres import (
+    POSTGRES_DB, POSTGRES_HOST, POSTGRES_PORT, POSTGRES_SCHEMA, POSTGRES_SENHA, POSTGRES_USUARIO,
+    csv_para_copy, sql_criar_tabelas
+)
+from esquemas import ESQUEMAS, colunas, dataframe_tipado
+
+# Destino dos dados persistidos pela API (salvar_csv=true):
+# - "arquivos": CSVs no diretório de seeds, consolidados depois (comportamento original)
+# - "postgres": COPY direto nas tabelas raw, por um pool assíncrono aberto na subida da API
+API_SINK = os.getenv("API_SINK", "arquivos")
+SINK_POOL_MIN = int(os.getenv("API_SINK_POOL_MIN", 1))
+SINK_POOL_MAX = int(os.getenv("API_SINK_POOL_MAX", 8))
+
+def montar_copias(dados: Dict) -> Dict[str, bytes]:
+    """CSV do COPY de cada tabela com registros (as vazias ficam de fora)."""
+    return {
+        tabela: csv_para_copy(tabela, dataframe_tipado(dados['dados'][tabela], tabela))
+        for tabela in ESQUEMAS
+        if dados['dados'][tabela]
+    }
+
+class SinkPostgres:
+    """
+    Grava os dados gerados pela API nas tabelas raw do Postgres com COPY
+    (CSV), usando um pool asyncpg.
+
+    O pool é criado em iniciar() e fechado em encerrar() (lifespan da API);
+    cada chamada de gravar() usa uma conexão do pool e uma transação.
+    """
+
+    def __init__(self,
+                 host: str = POSTGRES_HOST,
+                 porta: int = POSTGRES_PORT,
+                 banco: str = POSTGRES_DB,
+                 usuario: str = POSTGRES_USUARIO,
+                 senha: str = POSTGRES_SENHA,
+                 schema: str = POSTGRES_SCHEMA,
+                 min_conexoes: int = SINK_POOL_MIN,
+                 max_conexoes: int = SINK_POOL_MAX):
+        self.parametros = {"host": host, "port": porta, "database": banco, "user": usuario, "password": senha}
+        self.schema = schema
+        self.min_conexoes = min_conexoes
+        self.max_conexoes = max_conexoes
+        self._pool = None
+        self.gravacoes = 0
+        self.linhas_gravadas = {tabela: 0 for tabela in ESQUEMAS}
+
+    @property
+    def ativo(self) -> bool:
+        return self._pool is not None
+
+    async def iniciar(self):
+        """Abre o pool e garante que as tabelas raw existam (asyncpg só é importado aqui)."""
+        import asyncpg
+
+        self._pool = await asyncpg.create_pool(
+            min_size=self.min_conexoes, max_size=self.max_conexoes, **self.parametros
+        )
+        async with self._pool.acquire() as con:
+            for comando in sql_criar_tabelas(self.schema):
+                await con.execute(comando)
+
+    async def encerrar(self):
+        """Fecha o pool, aguardando as conexões em uso."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def gravar(self, dados: Dict) -> Dict[str, int]:
+        """Copia cadastros e pedidos de gerar_dados_periodo numa única transação."""
+        if self._pool is None:
+            raise RuntimeError("Sink Postgres não iniciado (API_SINK=postgres)")
+
+        # DataFrame e CSV são montados numa thread, antes de ocupar uma conexão
+        # do pool: feitos aqui, travariam o event loop para todos os clientes
+        corpos = await asyncio.to_thread(montar_copias, dados)
+        linhas = {tabela: len(dados['dados'][tabela]) for tabela in ESQUEMAS}
+        async with self._pool.acquire() as con, con.transaction():
+            for tabela, corpo in corpos.items():
+                await con.copy_to_table(
+                    tabela,
+                    source=io.BytesIO(corpo),
+                    columns=colunas(tabela),
+                    schema_name=self.schema,
+                    format="csv"
+                )
+
+        self.gravacoes += 1
+        for tabela, quantidade in linhas.items():
+            self.linhas_gravadas[tabela] += quantidade
+        return linhas
+
+    def status(self) -> Optional[dict]:
+        if self._pool is None:
+            return None
+        return {
+            "schema": self.schema,
+            "conexoes": self._pool.get_size(),
+            "conexoes_livres": self._pool.get_idle_size(),
+            "max_conexoes": self.max_conexoes,
+            "gravacoes": self.gravacoes,
+            "linhas_gravadas": dict(self.linhas_gravadas)
+        }
+
+sink_postgres = SinkPostgres()
@@ -0,0 +1,83 @@
+import io
+import json
+from typing import Dict, Iterable, Iterator, Tuple
+
+from esquemas import schema_arrow
+from serializacao import serializar_json
+
+# Quantidade de registros agrupados em cada pedaço enviado ao cliente
+REGISTROS_POR_PEDACO = 500
+
+def stream_ndjson(eventos: Iterable[Tuple[str, Dict]], api_info: Dict) -> Iterator[bytes]:
+    """
+    Converte os eventos de iterar_dados_periodo em NDJSON.
+
+    Cada linha é {"tipo": "cadastros" | "pedidos", "dados": {...}}; a última
+    linha é o trailer {"tipo": "estatisticas", "dados": {...}, "api_info": {...}}.
+    """
+    pedaco = []
+    for tabela, registro in eventos:
+        linha = {"tipo": tabela, "dados": registro}
+        if tabela == "estatisticas":
+            linha["api_info"] = api_info
+        pedaco.append(serializar_json(linha))
+
+        if len(pedaco) >= REGISTROS_POR_PEDACO:
+            yield b"\n".join(pedaco) + b"\n"
+            pedaco = []
+
+    if pedaco:
+        yield b"\n".join(pedaco) + b"\n"
+
+def schema_registros(schema):
+    """
+    Schema dos registros como chegam do gerador (dicts com datas em texto ISO e
+    valores em float); RecordBatch.from_pylist(..., schema_registros(schema)).cast(schema)
+    converte datas, decimais e categorias para o schema do registro.
+    """
+    import pyarrow as pa
+
+    return pa.schema([
+        (campo.name, pa.float64() if pa.types.is_decimal(campo.type) else pa.string()) for campo in schema
+    ])
+
+def stream_arrow(eventos: Iterable[Tuple[str, Dict]], tabela: str, api_info: Dict) -> Iterator[bytes]:
+    """
+    Converte os registros de uma tabela em um stream Arrow IPC.
+
+    Os registros saem em record batches de REGISTROS_POR_PEDACO linhas. As
+    estatísticas vão como metadado (chave "estatisticas") do último batch.
+    """
+    import pyarrow as pa
+
+    schema = schema_arrow(tabela)
+    schema_texto = schema_registros(schema)
+
+    buffer = io.BytesIO()
+    escritor = pa.ipc.new_stream(buffer, schema)
+
+    def _batch(linhas):
+        return pa.RecordBatch.from_pylist(linhas, schema=schema_texto).cast(schema)
+
+    def _descarregar():
+        # Devolve os bytes escritos desde a última chamada
+        dados = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return dados
+
+    linhas = []
+    for tipo, registro in eventos:
+        if tipo == tabela:
+            linhas.append(registro)
+            if len(linhas) >= REGISTROS_POR_PEDACO:
+                escritor.write_batch(_batch(linhas))
+                linhas = []
+                yield _descarregar()
+        elif tipo == "estatisticas":
+            metadados = {"estatisticas": json.dumps(registro), "api_info": json.dumps(api_info)}
+            escritor.write_batch(_batch(linhas), custom_metadata=metadados)
+            linhas = []
+
+    escritor.close()
+    yield _descarregar()
@@ -0,0 +1,152 @@
+"""
+Vocabulário pt_BR pré-gerado com o Faker (nomes, cidades, logradouros e bairros).
+
+O vocabulário é construído uma vez e gravado em disco como arrays NumPy de
+bytes UTF-8 de largura fixa (.npy), lidos depois com memory-map: processos
+diferentes (workers do uvicorn, processos geradores) compartilham as mesmas
+páginas e nenhum deles precisa importar ou inicializar o Faker. Os geradores
+sorteiam índices nesses arrays em vez de chamar o Faker por linha.
+
+O diretório do cache leva a versão do formato, a versão do Faker e o
+tamanho, então uma atualização do Faker gera um cache novo. Para construir
+o cache antes da primeira requisição (ex.: no build da imagem):
+
+    python vocabulario.py
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Versão do formato do cache (mudar ao alterar CAMPOS ou a forma de gravar)
+VERSAO_VOCABULARIO = 1
+
+# Itens por lista e diretório dos caches (variáveis de ambiente do docker-compose)
+TAMANHO_VOCABULARIO = int(os.getenv("VOCABULARIO_TAMANHO", 20_000))
+VOCABULARIO_DIR = os.getenv(
+    "VOCABULARIO_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "vocabulario_cache")
+)
+
+# Semente do Faker na construção: o mesmo cache em qualquer máquina
+SEMENTE_VOCABULARIO = 0
+
+# Lista do vocabulário -> provedor do Faker que a gera
+CAMPOS = {
+    'nomes': 'name',
+    'cidades': 'city',
+    'logradouros': 'street_name',
+    'bairros': 'neighborhood',
+}
+
+class Vocabulario:
+    """
+    Listas do vocabulário lidas de um diretório de cache.
+
+    Os arrays de bytes ficam em memory-map; o texto de cada lista é
+    decodificado uma vez por processo, na primeira vez em que é usado.
+    `vocabulario['nomes']` devolve o array de textos (dtype object).
+    """
+
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+        self._brutos = {
+            campo: np.load(os.path.join(diretorio, f"{campo}.npy"), mmap_mode='r') for campo in CAMPOS
+        }
+        self._textos: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def textos(self, campo: str) -> np.ndarray:
+        textos = self._textos.get(campo)
+        if textos is None:
+            with self._lock:
+                textos = self._textos.get(campo)
+                if textos is None:
+                    textos = np.char.decode(self._brutos[campo], 'utf-8').astype(object)
+                    self._textos[campo] = textos
+        return textos
+
+    __getitem__ = textos
+
+    def tamanho(self, campo: str) -> int:
+        return len(self._brutos[campo])
+
+    def amostrar(self, campo: str, indices) -> np.ndarray:
+        """Textos nas posições `indices` (sorteio vetorizado)."""
+        return self.textos(campo)[indices]
+
+    def escolher(self, campo: str, rng: random.Random) -> str:
+        """Um texto sorteado com o gerador da chamada (geração linha a linha)."""
+        textos = self.textos(campo)
+        return textos[rng.randrange(len(textos))]
+
+def _versao_faker() -> str:
+    try:
+        return version('faker')
+    except PackageNotFoundError:
+        return 'desconhecida'
+
+def diretorio_cache(tamanho: int = TAMANHO_VOCABULARIO, base: str = VOCABULARIO_DIR) -> str:
+    """Diretório do cache para esta versão do formato, do Faker e este tamanho."""
+    return os.path.join(base, f"v{VERSAO_VOCABULARIO}-faker{_versao_faker()}-{tamanho}")
+
+def construir_cache(tamanho: int = TAMANHO_VOCABULARIO, base: str = VOCABULARIO_DIR) -> str:
+    """
+    Gera as listas com o Faker e publica o cache (o Faker só é importado aqui).
+
+    Os arquivos são gravados num diretório temporário e renomeados de uma vez;
+    se outro processo publicar o mesmo cache antes, o dele é mantido.
+    """
+    from faker import Faker
+
+    diretorio = diretorio_cache(tamanho, base)
+    os.makedirs(base, exist_ok=True)
+    fake = Faker('pt_BR')
+    fake.seed_instance(SEMENTE_VOCABULARIO)
+
+    temporario = tempfile.mkdtemp(prefix=".construindo-", dir=base)
+    try:
+        for campo, provedor in CAMPOS.items():
+            gerar = getattr(fake, provedor)
+            np.save(os.path.join(temporario, f"{campo}.npy"), np.array([gerar().encode('utf-8') for _ in range(tamanho)]))
+        try:
+            os.rename(temporario, diretorio)
+        except OSError:
+            if not os.path.isdir(diretorio):
+                raise
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+    return diretorio
+
+# Vocabulários já abertos neste processo, por (tamanho, base)
+_abertos: Dict[Tuple[int, str], Vocabulario] = {}
+_lock_abertos = threading.Lock()
+
+def obter_vocabulario(tamanho: int = TAMANHO_VOCABULARIO, base: str = VOCABULARIO_DIR) -> Vocabulario:
+    """Vocabulário do processo: aberto na primeira chamada e construído se o cache não existir."""
+    chave = (tamanho, base)
+    with _lock_abertos:
+        vocabulario = _abertos.get(chave)
+        if vocabulario is None:
+            diretorio = diretorio_cache(tamanho, base)
+            if not os.path.isdir(diretorio):
+                diretorio = construir_cache(tamanho, base)
+            vocabulario = _abertos[chave] = Vocabulario(diretorio)
+        return vocabulario
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Constrói o cache do vocabulário pt_BR.")
+    parser.add_argument("--tamanho", type=int, default=TAMANHO_VOCABULARIO, help="Itens por lista")
+    parser.add_argument("--diretorio", default=VOCABULARIO_DIR, help="Diretório base dos caches")
+    args = parser.parse_args()
+
+    destino = diretorio_cache(args.tamanho, args.diretorio)
+    if os.path.isdir(destino):
+        print(f"Cache já existe: {destino}")
+    else:
+        print(f"Cache construído: {construir_cache(args.tamanho, args.diretorio)}")
@@ -0,0 +1,129 @@
+"""
+Benchmark de carga da API: latência p50/p99 de /dados/periodo e /health
+com chamadas concorrentes, comparando os tipos de executor.
+
+Para cada tipo (API_EXECUTOR=inline reproduz o comportamento antigo, com a
+geração rodando no event loop) o script sobe um uvicorn local, dispara as
+requisições e imprime um resumo em JSON.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_api_carga.py --concorrencia 16 --requisicoes 200
+    python benchmarks/bench_api_carga.py --executores inline thread process
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api")
+
+def percentil(valores, p):
+    """Percentil p (0-100) por interpolação linear."""
+    if not valores:
+        return None
+    if len(valores) == 1:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method="inclusive")[p - 1]
+
+def resumir(latencias_ms, status):
+    return {
+        "requisicoes": len(latencias_ms),
+        "p50_ms": round(percentil(latencias_ms, 50), 2) if latencias_ms else None,
+        "p99_ms": round(percentil(latencias_ms, 99), 2) if latencias_ms else None,
+        "max_ms": round(max(latencias_ms), 2) if latencias_ms else None,
+        "status": {str(codigo): status.count(codigo) for codigo in sorted(set(status))},
+    }
+
+def requisitar(url):
+    """Faz um GET e devolve (latência em ms, status HTTP)."""
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=60) as resposta:
+            resposta.read()
+            codigo = resposta.status
+    except urllib.error.HTTPError as e:
+        codigo = e.code
+    return (time.perf_counter() - inicio) * 1000, codigo
+
+def aguardar_api(base_url, timeout=30):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            requisitar(f"{base_url}/health")
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f"API não respondeu em {base_url}")
+
+def executar_carga(base_url, concorrencia, requisicoes):
+    """Dispara as requisições de /dados/periodo e mede /health em paralelo."""
+    url_periodo = f"{base_url}/dados/periodo?data_inicio=2025-06-10&data_fim=2025-06-24"
+    latencias, status = [], []
+    latencias_health, status_health = [], []
+    fim = threading.Event()
+
+    def sondar_health():
+        while not fim.is_set():
+            latencia, codigo = requisitar(f"{base_url}/health")
+            latencias_health.append(latencia)
+            status_health.append(codigo)
+            time.sleep(0.05)
+
+    sonda = threading.Thread(target=sondar_health, daemon=True)
+    sonda.start()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as pool:
+        for latencia, codigo in pool.map(lambda _: requisitar(url_periodo), range(requisicoes)):
+            latencias.append(latencia)
+            status.append(codigo)
+    duracao = time.perf_counter() - inicio
+
+    fim.set()
+    sonda.join()
+
+    resultado = resumir(latencias, status)
+    resultado["requisicoes_por_s"] = round(requisicoes / duracao, 1)
+    return {"dados_periodo": resultado, "health": resumir(latencias_health, status_health)}
+
+def benchmark_executor(tipo, args):
+    porta = args.porta
+    ambiente = dict(os.environ, API_EXECUTOR=tipo)
+    if args.workers:
+        ambiente["API_EXECUTOR_WORKERS"] = str(args.workers)
+
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=API_DIR,
+        env=ambiente,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{porta}"
+        aguardar_api(base_url)
+        return executar_carga(base_url, args.concorrencia, args.requisicoes)
+    finally:
+        processo.terminate()
+        processo.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga da DW Data API")
+    parser.add_argument("--executores", nargs="+", default=["inline", "thread"], choices=["inline", "thread", "process"])
+    parser.add_argument("--concorrencia", type=int, default=16)
+    parser.add_argument("--requisicoes", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None, help="API_EXECUTOR_WORKERS")
+    parser.add_argument("--porta", type=int, default=8765)
+    args = parser.parse_args()
+
+    resultados = {tipo: benchmark_executor(tipo, args) for tipo in args.executores}
+    print(json.dumps(resultados, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark da leitura dos arquivos da API no SeedsConsolidator com 10/100/1000
+arquivos pequenos (~80 pedidos cada, como as chamadas agendadas da API).
+
+Compara:
+- pandas_loop: um pd.read_csv por arquivo (comportamento anterior)
+- duckdb_lote: SeedsConsolidator.read_files, uma leitura para todos os arquivos
+- incremental: consolidate_table_incremental completo (leitura + upsert + manifesto)
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_consolidacao.py --arquivos 10 100 1000
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from consolidate_seeds import SeedsConsolidator
+from gerador_colunar import gerar_lote_pedidos_colunar
+from vocabulario import obter_vocabulario
+
+def criar_arquivos(pasta, quantidade, linhas_por_arquivo, vocabulario):
+    rng = np.random.default_rng(0)
+    cpfs = [f"{i:03d}.000.000-00" for i in range(1000)]
+    for i in range(quantidade):
+        df = gerar_lote_pedidos_colunar(rng, cpfs, linhas_por_arquivo, vocabulario, date(2025, 6, 24))
+        df.to_csv(os.path.join(pasta, f"pedidos_api_{i:06d}.csv"), index=False)
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - inicio, resultado
+
+def benchmark(quantidade, linhas_por_arquivo, vocabulario):
+    with tempfile.TemporaryDirectory() as base:
+        api_dir = os.path.join(base, "api")
+        dbt_dir = os.path.join(base, "dbt")
+        os.makedirs(api_dir)
+        os.makedirs(dbt_dir)
+        criar_arquivos(api_dir, quantidade, linhas_por_arquivo, vocabulario)
+        arquivos = sorted(glob.glob(os.path.join(api_dir, "pedidos_api_*.csv")))
+
+        consolidator = SeedsConsolidator(api_dir, dbt_dir)
+
+        tempo_pandas, df_pandas = cronometrar(
+            lambda: pd.concat([pd.read_csv(arquivo) for arquivo in arquivos], ignore_index=True)
+        )
+        tempo_duckdb, df_duckdb = cronometrar(lambda: consolidator.read_files("pedidos", arquivos))
+        tempo_incremental, _ = cronometrar(lambda: consolidator.consolidate_table_incremental("pedidos"))
+        consolidator.close()
+
+        linhas = len(df_duckdb)
+        assert len(df_pandas) == linhas
+        return {
+            "arquivos": quantidade,
+            "linhas": linhas,
+            "pandas_loop_s": round(tempo_pandas, 4),
+            "duckdb_lote_s": round(tempo_duckdb, 4),
+            "incremental_s": round(tempo_incremental, 4),
+            "aceleracao_leitura": round(tempo_pandas / tempo_duckdb, 1),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de ingestão de múltiplos CSVs da API")
+    parser.add_argument("--arquivos", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--linhas", type=int, default=80, help="Linhas por arquivo")
+    args = parser.parse_args()
+
+    # Silencia o log do consolidador durante as medições
+    logging.getLogger("consolidate_seeds").setLevel(logging.WARNING)
+
+    vocabulario = obter_vocabulario()
+    resultados = [benchmark(quantidade, args.linhas, vocabulario) for quantidade in args.arquivos]
+    print(json.dumps(resultados, indent=2))
+
+if __name__ == "__main__":
+    main()
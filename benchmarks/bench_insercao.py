@@ -0,0 +1,118 @@
+"""
+Benchmark da inserção no DuckDB (inserir_em_lote) em linhas/s.
+
+Compara, com os mesmos lotes do gerador colunar:
+- pandas_ignore: DataFrame registrado + INSERT OR IGNORE + SELECT COUNT(*) do
+  lote (caminho anterior)
+- pandas: inserir_em_lote com DataFrames
+- arrow: inserir_em_lote com RecordBatches do Arrow (lidos sem cópia)
+
+A geração dos lotes fica fora da medição. Os pedidos são 5x os cadastros,
+como nos volumes padrão do data_generator.py.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_insercao.py --cadastros 10000 100000
+    python benchmarks/bench_insercao.py --cadastros 1000000 --sem-ignore
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+import duckdb
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+HOJE = date(2025, 6, 24)
+LINHAS_POR_LOTE = 5_000
+
+def inserir_ignore(dg, tabela, df):
+    """Caminho anterior de inserir_em_lote, reproduzido para comparação."""
+    dg.con.register("temp_df", df)
+    try:
+        dg.con.execute(f"INSERT OR IGNORE INTO {tabela} SELECT * FROM temp_df")
+        dg.con.execute("SELECT COUNT(*) as inseridos FROM temp_df").fetchone()
+    finally:
+        dg.con.unregister("temp_df")
+
+def medir(dg, lotes, inserir):
+    """Insere cadastros e depois pedidos num banco em memória; devolve (segundos, linhas na tabela)."""
+    dg.con = duckdb.connect()
+    try:
+        dg.criar_tabelas()
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for tabela in ("cadastros", "pedidos"):
+                for lote in lotes[tabela]:
+                    inserir(tabela, lote)
+        duracao = time.perf_counter() - inicio
+        linhas = sum(dg.con.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0] for tabela in lotes)
+    finally:
+        dg.con.close()
+        dg.con = None
+    return duracao, linhas
+
+def gerar(dg, total_cadastros, seed, arrow):
+    lotes = {"cadastros": list(
+        dg.gerar_lotes_colunar("cadastros", total_cadastros, LINHAS_POR_LOTE, seed, 1, HOJE, arrow=arrow)
+    )}
+    # CPFs ordenados, como o data_generator.py os lê do DuckDB (iguais nos dois formatos)
+    cpfs = sorted(
+        cpf for lote in lotes["cadastros"]
+        for cpf in (lote.column("cpf").to_pylist() if arrow else lote["cpf"].tolist())
+    )
+    lotes["pedidos"] = list(
+        dg.gerar_lotes_colunar("pedidos", total_cadastros * 5, LINHAS_POR_LOTE, seed, 1, HOJE, cpfs, arrow=arrow)
+    )
+    return lotes
+
+def benchmark(dg, total_cadastros, seed, sem_ignore):
+    with contextlib.redirect_stdout(io.StringIO()):
+        lotes_pandas = gerar(dg, total_cadastros, seed, arrow=False)
+        lotes_arrow = gerar(dg, total_cadastros, seed, arrow=True)
+    total = total_cadastros * 6
+
+    metodos = {
+        "pandas": (lotes_pandas, dg.inserir_em_lote),
+        "arrow": (lotes_arrow, dg.inserir_em_lote),
+    }
+    if not sem_ignore:
+        metodos["pandas_ignore"] = (lotes_pandas, lambda tabela, df: inserir_ignore(dg, tabela, df))
+
+    resultado = {"cadastros": total_cadastros, "pedidos": total_cadastros * 5}
+    for nome, (lotes, inserir) in metodos.items():
+        duracao, linhas = medir(dg, lotes, inserir)
+        assert linhas == total, (nome, linhas, total)
+        resultado[f"{nome}_s"] = round(duracao, 3)
+        resultado[f"{nome}_linhas_por_s"] = round(total / duracao)
+    if not sem_ignore:
+        resultado["aceleracao_arrow"] = round(resultado["pandas_ignore_s"] / resultado["arrow_s"], 1)
+    print(json.dumps(resultado), file=sys.stderr)
+    return resultado
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inserção no DuckDB: pandas x Arrow")
+    parser.add_argument("--cadastros", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sem-ignore", action="store_true", help="Não mede o caminho anterior (INSERT OR IGNORE)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base:
+        # data_generator cria ./seeds ao ser importado: o import acontece dentro da pasta temporária
+        diretorio_original = os.getcwd()
+        os.chdir(base)
+        try:
+            import data_generator as dg
+            resultados = [benchmark(dg, total, args.seed, args.sem_ignore) for total in args.cadastros]
+        finally:
+            os.chdir(diretorio_original)
+
+    print(json.dumps(resultados, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Benchmark do pipeline completo por fator de escala (SF), no estilo do TPC-H.
+
+SF 1 corresponde aos volumes padrão do data_generator.py (10 mil cadastros e
+50 mil pedidos); na API, SF 1 gera 1.000 cadastros e 5.000 pedidos (o caminho
+da API é linha a linha). Cada etapa é medida separadamente:
+
+- geracao_cadastros / geracao_pedidos: lotes do gerador (colunar ou Faker)
+- insercao_cadastros / insercao_pedidos: inserir_em_lote no DuckDB
+- exportacao: exportar_tabelas (CSV por padrão, como exportar_para_csv)
+- api_geracao / api_serializacao: gerar_*_periodo e o JSON da resposta
+- consolidacao: SeedsConsolidator.consolidate_all com os CSVs da API
+
+Para cada etapa o relatório traz tempo, linhas/s, pico de RSS do processo
+durante a etapa (zerado entre etapas via /proc/self/clear_refs; fora do Linux,
+o pico acumulado do processo) e bytes gravados ou serializados. Os processos
+geradores de --workers não entram no RSS.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_pipeline.py --sf 0.01 0.1 1
+    python benchmarks/bench_pipeline.py --sf 10 --workers 4 --formato parquet
+    python benchmarks/bench_pipeline.py --sf 0.1 --modo faker --saida resultados.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+from consolidate_seeds import SeedsConsolidator
+from data_generator_api import criar_geradores, gerar_cadastros_periodo, gerar_pedidos_periodo, salvar_dados_csv
+
+HOJE = date(2025, 6, 24)
+LINHAS_POR_LOTE = 5_000
+
+# Volumes de SF 1
+ESCALA_BASE = {"cadastros": 10_000, "pedidos": 50_000}
+ESCALA_BASE_API = {"cadastros": 1_000, "pedidos": 5_000}
+
+def _zerar_pico_rss():
+    """Zera o pico de RSS (VmHWM) do processo; retorna False se o SO não permite."""
+    try:
+        with open("/proc/self/clear_refs", "w") as arquivo:
+            arquivo.write("5")
+        return True
+    except OSError:
+        return False
+
+def _pico_rss_mb():
+    try:
+        with open("/proc/self/status") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("VmHWM:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+def _bytes_em(caminho):
+    """Tamanho de um arquivo ou, para diretórios (saídas particionadas), a soma dos arquivos."""
+    if os.path.isfile(caminho):
+        return os.path.getsize(caminho)
+    return sum(
+        os.path.getsize(os.path.join(raiz, nome))
+        for raiz, _, nomes in os.walk(caminho)
+        for nome in nomes
+    )
+
+def medir(etapa, funcao):
+    """
+    Executa funcao() e mede a etapa. funcao devolve (linhas, bytes_saida, resultado);
+    o resultado é repassado para as etapas seguintes.
+    """
+    por_etapa = _zerar_pico_rss()
+    inicio = time.perf_counter()
+    # O gerador e a API imprimem o progresso de cada lote; fora da medição isso só polui a saída
+    with contextlib.redirect_stdout(io.StringIO()):
+        linhas, bytes_saida, resultado = funcao()
+    duracao = time.perf_counter() - inicio
+    medida = {
+        "etapa": etapa,
+        "segundos": round(duracao, 4),
+        "linhas": linhas,
+        "linhas_por_s": round(linhas / duracao) if duracao > 0 else None,
+        "pico_rss_mb": round(_pico_rss_mb(), 1),
+        "pico_rss_por_etapa": por_etapa,
+        "bytes_saida": bytes_saida,
+    }
+    print(json.dumps(medida), file=sys.stderr)
+    return medida, resultado
+
+def gerar_tabela(dg, tabela, total, args, cpfs=None):
+    """Lotes de uma tabela, como no main() do data_generator.py."""
+    if args.modo == "colunar":
+        return list(dg.gerar_lotes_colunar(tabela, total, LINHAS_POR_LOTE, args.seed, args.workers, HOJE, cpfs))
+
+    lotes = []
+    tamanho_bloco = dg.tamanho_bloco_cpf(total, LINHAS_POR_LOTE)
+    for inicio in range(0, total, LINHAS_POR_LOTE):
+        tamanho = min(LINHAS_POR_LOTE, total - inicio)
+        if tabela == "cadastros":
+            lotes.append(dg.gerar_lote_cadastros(tamanho, bloco_cpf=inicio // LINHAS_POR_LOTE, tamanho_bloco=tamanho_bloco))
+        else:
+            lotes.append(dg.gerar_lote_pedidos(cpfs, tamanho))
+    return lotes
+
+def benchmark(dg, sf, args, base):
+    pasta = os.path.join(base, f"sf_{sf}")
+    seeds = os.path.join(pasta, "seeds")
+    api_dir = os.path.join(pasta, "api")
+    dbt_dir = os.path.join(pasta, "dbt")
+    for diretorio in (seeds, api_dir, dbt_dir):
+        os.makedirs(diretorio)
+
+    totais = {tabela: max(1, round(volume * sf)) for tabela, volume in ESCALA_BASE.items()}
+    totais_api = {tabela: max(1, round(volume * sf)) for tabela, volume in ESCALA_BASE_API.items()}
+    etapas = []
+
+    # Geração
+    medida, lotes_cadastros = medir(
+        "geracao_cadastros",
+        lambda: (totais["cadastros"], None, gerar_tabela(dg, "cadastros", totais["cadastros"], args))
+    )
+    etapas.append(medida)
+    # CPFs ordenados, como o data_generator.py os lê do DuckDB
+    cpfs = np.sort(np.concatenate([lote["cpf"].to_numpy(dtype=object) for lote in lotes_cadastros])).tolist()
+    medida, lotes_pedidos = medir(
+        "geracao_pedidos",
+        lambda: (totais["pedidos"], None, gerar_tabela(dg, "pedidos", totais["pedidos"], args, cpfs))
+    )
+    etapas.append(medida)
+
+    # Inserção no DuckDB
+    caminho_db = os.path.join(seeds, "data.duckdb")
+    dg.SEEDS_PATH = seeds
+    dg.con = dg.duckdb.connect(caminho_db)
+    try:
+        dg.criar_tabelas()
+        for tabela, lotes in (("cadastros", lotes_cadastros), ("pedidos", lotes_pedidos)):
+            def inserir(tabela=tabela, lotes=lotes):
+                for lote in lotes:
+                    dg.inserir_em_lote(tabela, lote)
+                dg.con.execute("CHECKPOINT")
+                return sum(len(lote) for lote in lotes), _bytes_em(caminho_db), None
+            etapas.append(medir(f"insercao_{tabela}", inserir)[0])
+        del lotes_cadastros, lotes_pedidos
+
+        # Exportação
+        def exportar():
+            destinos = [
+                dg.exportar_tabela(tabela, args.formato, particionar_mes=args.particionar_mes)
+                for tabela in ESCALA_BASE
+            ]
+            linhas = sum(dg.con.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0] for tabela in ESCALA_BASE)
+            return linhas, sum(_bytes_em(destino) for destino in destinos), None
+        etapas.append(medir("exportacao", exportar)[0])
+
+        # CSVs principais da consolidação (os seeds do dbt)
+        for tabela in ESCALA_BASE:
+            dg.con.execute(f"COPY {tabela} TO '{os.path.join(dbt_dir, tabela + '.csv')}' (FORMAT CSV, HEADER)")
+    finally:
+        dg.con.close()
+        dg.con = None
+
+    # API: geração e serialização (mesmo JSON do FastAPI)
+    inicio_api, fim_api = (HOJE - timedelta(days=30)).isoformat(), HOJE.isoformat()
+    def gerar_api():
+        rng, vocabulario = criar_geradores(args.seed)
+        cadastros = gerar_cadastros_periodo(inicio_api, fim_api, totais_api["cadastros"], rng, vocabulario)
+        pedidos = gerar_pedidos_periodo(
+            inicio_api, fim_api, totais_api["pedidos"], [c["cpf"] for c in cadastros], rng, vocabulario
+        )
+        dados = {
+            "periodo": {"data_inicio": inicio_api, "data_fim": fim_api},
+            "estatisticas": {"total_cadastros": len(cadastros), "total_pedidos": len(pedidos)},
+            "dados": {"cadastros": cadastros, "pedidos": pedidos},
+        }
+        return len(cadastros) + len(pedidos), None, dados
+    medida, dados_api = medir("api_geracao", gerar_api)
+    etapas.append(medida)
+
+    def serializar():
+        corpo = json.dumps(dados_api, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return medida["linhas"], len(corpo), None
+    etapas.append(medir("api_serializacao", serializar)[0])
+
+    # Consolidação: arquivos da API sobre os CSVs principais
+    with contextlib.redirect_stdout(io.StringIO()):
+        salvar_dados_csv(dados_api, api_dir)
+    def consolidar():
+        consolidator = SeedsConsolidator(api_dir, dbt_dir, db_path=os.path.join(pasta, "consolidado.duckdb"))
+        try:
+            consolidator.consolidate_all()
+        finally:
+            consolidator.close()
+        linhas = sum(totais.values()) + medida["linhas"]
+        return linhas, sum(_bytes_em(os.path.join(dbt_dir, f"{tabela}.csv")) for tabela in ESCALA_BASE), None
+    etapas.append(medir("consolidacao", consolidar)[0])
+
+    shutil.rmtree(pasta)
+    return {
+        "sf": sf,
+        "linhas": totais,
+        "linhas_api": totais_api,
+        "total_s": round(sum(etapa["segundos"] for etapa in etapas), 4),
+        "etapas": etapas,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline por fator de escala")
+    parser.add_argument("--sf", type=float, nargs="+", default=[0.01, 0.1, 1], help="Fatores de escala (SF 1 = volumes padrão)")
+    parser.add_argument("--modo", choices=["colunar", "faker"], default="colunar", help="Modo de geração do data_generator.py")
+    parser.add_argument("--workers", type=int, default=1, help="Processos geradores no modo colunar")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--formato", choices=["csv", "parquet", "arrow"], default="csv", help="Formato da exportação")
+    parser.add_argument("--particionar-mes", action="store_true", help="Exporta pedidos particionados por mês")
+    parser.add_argument("--saida", default=None, help="Também grava o relatório JSON neste arquivo")
+    args = parser.parse_args()
+    if args.workers > 1 and args.modo != "colunar":
+        parser.error("--workers > 1 só é suportado no modo colunar")
+
+    # Silencia o log do consolidador durante as medições
+    logging.getLogger("consolidate_seeds").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as base:
+        # data_generator cria ./seeds ao ser importado: o import acontece dentro da pasta temporária
+        diretorio_original = os.getcwd()
+        os.chdir(base)
+        try:
+            import data_generator as dg
+            resultados = [benchmark(dg, sf, args, base) for sf in args.sf]
+        finally:
+            os.chdir(diretorio_original)
+
+    relatorio = json.dumps(resultados, indent=2)
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            arquivo.write(relatorio)
+    print(relatorio)
+
+if __name__ == "__main__":
+    main()
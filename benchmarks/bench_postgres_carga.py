@@ -0,0 +1,124 @@
+"""
+Benchmark de carga de pedidos no Postgres: COPY FROM STDIN (CarregadorPostgres)
+contra o caminho atual (CSV em seeds + dbt seed), com 100 mil, 1 e 5 milhões de pedidos.
+
+Requer o Postgres do docker-compose no ar (DB_HOST/DB_PORT, padrão localhost:5433)
+e DBT_USER/DBT_PASSWORD definidos. Para o dbt seed, o script monta um projeto
+dbt temporário apontando para o mesmo banco (schema bench_seed).
+
+Os lotes são gerados sob demanda nos dois caminhos, então os tempos incluem a
+geração (medida à parte em geracao_s).
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_postgres_carga.py --pedidos 100000 1000000 5000000
+    python benchmarks/bench_postgres_carga.py --pedidos 100000 --sem-dbt
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+from carga_postgres import CarregadorPostgres, POSTGRES_HOST, POSTGRES_PORT, POSTGRES_DB
+from gerador_colunar import gerar_lote_pedidos_colunar
+from vocabulario import obter_vocabulario
+
+HOJE = date(2025, 6, 24)
+LINHAS_POR_LOTE = 100_000
+
+DBT_PROJECT = """name: bench_carga
+version: "1.0"
+profile: bench_carga
+seed-paths: ["seeds"]
+"""
+
+DBT_PROFILES = f"""bench_carga:
+  target: bench
+  outputs:
+    bench:
+      type: postgres
+      host: {POSTGRES_HOST}
+      port: {POSTGRES_PORT}
+      dbname: {POSTGRES_DB}
+      user: "{{{{ env_var('DBT_USER') }}}}"
+      pass: "{{{{ env_var('DBT_PASSWORD') }}}}"
+      schema: bench_seed
+      threads: 4
+"""
+
+def gerar_lotes(total, vocabulario):
+    """Lotes de pedidos reprodutíveis (mesma semente a cada chamada)."""
+    rng = np.random.default_rng(0)
+    cpfs = [f"{i:03d}.{i:03d}.000-00" for i in range(1000)]
+    for inicio in range(0, total, LINHAS_POR_LOTE):
+        yield gerar_lote_pedidos_colunar(rng, cpfs, min(LINHAS_POR_LOTE, total - inicio), vocabulario, HOJE)
+
+def medir_geracao(total, vocabulario):
+    inicio = time.perf_counter()
+    for _ in gerar_lotes(total, vocabulario):
+        pass
+    return time.perf_counter() - inicio
+
+def medir_copy(total, vocabulario, carregador):
+    inicio = time.perf_counter()
+    linhas = carregador.copiar_lotes("pedidos", gerar_lotes(total, vocabulario), substituir=True)
+    duracao = time.perf_counter() - inicio
+    assert linhas == total
+    return duracao
+
+def medir_dbt_seed(total, vocabulario):
+    with tempfile.TemporaryDirectory() as projeto:
+        os.makedirs(os.path.join(projeto, "seeds"))
+        with open(os.path.join(projeto, "dbt_project.yml"), "w") as f:
+            f.write(DBT_PROJECT)
+        with open(os.path.join(projeto, "profiles.yml"), "w") as f:
+            f.write(DBT_PROFILES)
+
+        # Escrita do CSV conta no tempo: faz parte do caminho atual (salvar_dados_csv + dbt seed)
+        inicio = time.perf_counter()
+        caminho_csv = os.path.join(projeto, "seeds", "pedidos.csv")
+        for indice, lote in enumerate(gerar_lotes(total, vocabulario)):
+            lote.to_csv(caminho_csv, mode="a", header=indice == 0, index=False)
+        subprocess.run(
+            ["dbt", "seed", "--full-refresh", "--project-dir", projeto, "--profiles-dir", projeto],
+            check=True,
+            stdout=subprocess.DEVNULL
+        )
+        return time.perf_counter() - inicio
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark COPY FROM STDIN x dbt seed")
+    parser.add_argument("--pedidos", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--sem-dbt", action="store_true", help="Mede apenas o COPY")
+    args = parser.parse_args()
+
+    vocabulario = obter_vocabulario()
+    carregador = CarregadorPostgres(schema="bench_copy")
+    resultados = []
+    try:
+        for total in args.pedidos:
+            resultado = {
+                "pedidos": total,
+                "geracao_s": round(medir_geracao(total, vocabulario), 2),
+                "copy_s": round(medir_copy(total, vocabulario, carregador), 2),
+            }
+            resultado["copy_linhas_por_s"] = round(total / resultado["copy_s"])
+            if not args.sem_dbt:
+                resultado["dbt_seed_s"] = round(medir_dbt_seed(total, vocabulario), 2)
+                resultado["aceleracao"] = round(resultado["dbt_seed_s"] / resultado["copy_s"], 1)
+            resultados.append(resultado)
+            print(json.dumps(resultado), file=sys.stderr)
+    finally:
+        carregador.encerrar()
+
+    print(json.dumps(resultados, indent=2))
+
+if __name__ == "__main__":
+    main()
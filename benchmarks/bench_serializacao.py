@@ -0,0 +1,105 @@
+"""
+Benchmark da serialização JSON e da compressão das respostas da API.
+
+Para respostas de /dados/periodo com N linhas (cadastros + pedidos, na
+proporção 1:5), mede cada combinação de:
+
+- serializador: json (biblioteca padrão, caminho anterior) e orjson (se instalado)
+- orientação: linhas (lista de objetos) e colunas ({coluna: [valores]})
+- codificação: identity, gzip e, se os pacotes estiverem instalados, zstd e br
+
+O relatório traz ms de serialização e de compressão por 10 mil linhas e os
+bytes enviados (corpo comprimido). A geração dos dados fica fora da medição.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_serializacao.py --linhas 10000 100000
+    python benchmarks/bench_serializacao.py --linhas 60000 --repeticoes 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+from data_generator_api import criar_geradores, gerar_cadastros_periodo, gerar_pedidos_periodo
+from serializacao import COMPRESSORES, orientar_colunas, orjson
+
+HOJE = date(2025, 6, 24)
+
+def serializadores():
+    disponiveis = {
+        "json": lambda conteudo: json.dumps(conteudo, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+    }
+    if orjson is not None:
+        disponiveis["orjson"] = orjson.dumps
+    return disponiveis
+
+def gerar_resposta(linhas, seed):
+    """Resposta no formato de gerar_dados_periodo com `linhas` registros no total."""
+    total_cadastros = max(1, linhas // 6)
+    inicio, fim = (HOJE - timedelta(days=90)).isoformat(), HOJE.isoformat()
+    rng, vocabulario = criar_geradores(seed)
+    cadastros = gerar_cadastros_periodo(inicio, fim, total_cadastros, rng, vocabulario)
+    pedidos = gerar_pedidos_periodo(
+        inicio, fim, linhas - total_cadastros, [cadastro["cpf"] for cadastro in cadastros], rng, vocabulario
+    )
+    return {
+        "periodo": {"data_inicio": inicio, "data_fim": fim},
+        "estatisticas": {"total_cadastros": len(cadastros), "total_pedidos": len(pedidos)},
+        "dados": {"cadastros": cadastros, "pedidos": pedidos},
+    }
+
+def cronometrar(funcao, repeticoes):
+    """Menor tempo (s) entre as repetições e o resultado da última."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+def benchmark(linhas, seed, repeticoes):
+    dados = gerar_resposta(linhas, seed)
+    por_10k = 10_000 / linhas
+    medidas = []
+    for orientacao in ("linhas", "colunas"):
+        for nome, serializar in serializadores().items():
+            # A orientação por colunas faz parte do custo de serializar
+            if orientacao == "colunas":
+                segundos, corpo = cronometrar(lambda: serializar(orientar_colunas(dados)), repeticoes)
+            else:
+                segundos, corpo = cronometrar(lambda: serializar(dados), repeticoes)
+
+            for codificacao in ("identity", *COMPRESSORES):
+                if codificacao == "identity":
+                    segundos_compressao, enviado = 0.0, corpo
+                else:
+                    segundos_compressao, enviado = cronometrar(lambda: COMPRESSORES[codificacao](corpo), repeticoes)
+                medida = {
+                    "serializador": nome,
+                    "orientacao": orientacao,
+                    "codificacao": codificacao,
+                    "serializacao_ms_por_10k": round(segundos * 1000 * por_10k, 2),
+                    "compressao_ms_por_10k": round(segundos_compressao * 1000 * por_10k, 2),
+                    "bytes_json": len(corpo),
+                    "bytes_enviados": len(enviado),
+                    "bytes_por_linha": round(len(enviado) / linhas, 1),
+                }
+                print(json.dumps(medida), file=sys.stderr)
+                medidas.append(medida)
+    return {"linhas": linhas, "medidas": medidas}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialização JSON e compressão da API")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000], help="Registros por resposta")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições por medida (vale a menor)")
+    args = parser.parse_args()
+
+    resultados = [benchmark(linhas, args.seed, args.repeticoes) for linhas in args.linhas]
+    print(json.dumps(resultados, indent=2))
+
+if __name__ == "__main__":
+    main()
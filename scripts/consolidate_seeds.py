@@ -1,6 +1,12 @@
 import pandas as pd
+import duckdb
 import glob
 import os
+import sys
+import argparse
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 
@@ -8,15 +14,38 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Registro de esquemas compartilhado com a API e o gerador (api/esquemas.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+from esquemas import ESQUEMAS, colunas_read_csv, tipos_duckdb
+
+# Colunas e tipos de cada tabela (mesma ordem dos CSVs)
+TABLE_COLUMNS = {table_name: tipos_duckdb(table_name) for table_name in ESQUEMAS}
+
+# Chave primária e coluna de data usada para manter o registro mais recente
+TABLE_KEYS = {'cadastros': ['id', 'cpf'], 'pedidos': ['id_pedido']}
+TABLE_DATE_COLUMN = {'cadastros': 'data_cadastro', 'pedidos': 'data_pedido'}
+
+def api_file_pattern(api_seeds_path, table_name):
+    """
+    Arquivos da API de uma tabela: os da raiz (cadastros_api_<timestamp>.csv) e os
+    das partições diárias (data=YYYY-MM-DD/cadastros_api_YYYY-MM-DD.csv). Os
+    diretórios das partições ficam depois da remoção dos arquivos: é por eles
+    que a API sabe quais dias já foram gerados.
+    """
+    return os.path.join(api_seeds_path, "**", f"{table_name}_api_*.csv")
+
 class SeedsConsolidator:
     def __init__(self, 
                  api_seeds_path="../api/seeds/",  # Relativo a 1_local_setup/scripts
-                 dbt_seeds_path="../../2_data_warehouse/dw_dbt_airflow/seeds/"):  # Relativo a 1_local_setup/scripts
+                 dbt_seeds_path="../../2_data_warehouse/dw_dbt_airflow/seeds/",  # Relativo a 1_local_setup/scripts
+                 db_path=None):  # Banco DuckDB do modo incremental (padrão: consolidado.duckdb no dbt seeds)
         
         # Converte para caminhos absolutos
         script_dir = os.path.dirname(os.path.abspath(__file__))
         self.api_seeds_path = os.path.abspath(os.path.join(script_dir, api_seeds_path))
         self.dbt_seeds_path = os.path.abspath(os.path.join(script_dir, dbt_seeds_path))
+        self.db_path = os.path.abspath(db_path or os.path.join(self.dbt_seeds_path, "consolidado.duckdb"))
+        self._con = None
         
         logger.info(f"📂 Script localizado em: {script_dir}")
         logger.info(f"📂 API Seeds: {self.api_seeds_path}")
@@ -40,8 +69,8 @@ class SeedsConsolidator:
             main_file = os.path.join(self.dbt_seeds_path, f"{table_name}.csv")
             
             # Arquivos da API (no diretório da API)
-            api_pattern = os.path.join(self.api_seeds_path, f"{table_name}_api_*.csv")
-            api_files = glob.glob(api_pattern)
+            api_pattern = api_file_pattern(self.api_seeds_path, table_name)
+            api_files = glob.glob(api_pattern, recursive=True)
             
             if not api_files:
                 logger.info(f"Nenhum arquivo da API encontrado para {table_name}")
@@ -54,33 +83,26 @@ class SeedsConsolidator:
             for api_file in api_files:
                 logger.info(f"  - {os.path.basename(api_file)}")
             
-            # Lista para armazenar todos os DataFrames
-            dataframes = []
-            
-            # Carrega arquivo principal se existir
+            # Arquivo principal (se existir) + arquivos da API, lidos numa única passada
+            files = list(api_files)
             if os.path.exists(main_file):
-                df_main = pd.read_csv(main_file)
-                dataframes.append(df_main)
-                logger.info(f"✓ Carregado arquivo principal: {len(df_main)} registros")
+                files.insert(0, main_file)
             else:
                 logger.warning(f"⚠️ Arquivo principal não encontrado: {main_file}")
             
-            # Carrega arquivos da API
-            for api_file in api_files:
-                try:
-                    df_api = pd.read_csv(api_file)
-                    dataframes.append(df_api)
-                    logger.info(f"✓ Carregado {os.path.basename(api_file)}: {len(df_api)} registros")
-                except Exception as e:
-                    logger.error(f"❌ Erro ao carregar {api_file}: {str(e)}")
-                    continue
-            
-            if not dataframes:
-                logger.warning(f"Nenhum DataFrame carregado para {table_name}")
+            df_consolidated = self.read_files(table_name, files)
+            if df_consolidated.empty:
+                logger.warning(f"Nenhum registro carregado para {table_name}")
                 return
             
-            # Consolida todos os DataFrames
-            df_consolidated = pd.concat(dataframes, ignore_index=True)
+            counts = df_consolidated['filename'].value_counts()
+            if main_file in counts:
+                logger.info(f"✓ Carregado arquivo principal: {counts[main_file]} registros")
+            logger.info(f"✓ Carregados {len(counts) - (main_file in counts)} arquivos da API: "
+                        f"{int(counts.drop(main_file, errors='ignore').sum())} registros")
+            df_consolidated = df_consolidated.drop(columns=['filename'])
+            
+            # Consolida todos os registros
             logger.info(f"📊 Total de registros antes da deduplicação: {len(df_consolidated)}")
             
             # Remove duplicatas (ajuste as colunas conforme necessário)
@@ -92,11 +114,11 @@ class SeedsConsolidator:
                 logger.info(f"🔍 Deduplicação por: id, cpf")
                 
             elif table_name == 'pedidos':
-                # Para pedidos, remove duplicatas por ID do pedido, mantendo o mais recente
+                # Para pedidos, remove duplicatas por ID do pedido (id_pedido), mantendo o mais recente
                 if 'data_pedido' in df_consolidated.columns:
                     df_consolidated = df_consolidated.sort_values('data_pedido', ascending=False)
-                df_consolidated = df_consolidated.drop_duplicates(subset=['id'], keep='first')
-                logger.info(f"🔍 Deduplicação por: id")
+                df_consolidated = df_consolidated.drop_duplicates(subset=['id_pedido'], keep='first')
+                logger.info(f"🔍 Deduplicação por: id_pedido")
             
             logger.info(f"📊 Total de registros após deduplicação: {len(df_consolidated)}")
             
@@ -122,6 +144,302 @@ class SeedsConsolidator:
             logger.error(f"❌ Erro ao consolidar {table_name}: {str(e)}")
             raise
     
+    def _connect(self):
+        """
+        Abre (uma vez) o banco DuckDB do modo incremental
+        """
+        if self._con is None:
+            self._con = duckdb.connect(self.db_path)
+            logger.info(f"🦆 Banco incremental: {self.db_path}")
+        return self._con
+    
+    def close(self):
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+    
+    def _read_csv_sql(self, table_name, pandas_types=False):
+        """
+        Expressão read_csv com os tipos explícitos da tabela (sem inferência).
+        Aceita um arquivo ou uma lista de arquivos (lidos em paralelo pelo DuckDB);
+        a coluna filename indica de qual arquivo veio cada linha.
+        """
+        # Com pandas_types, os domínios fechados são lidos como ENUM (Categorical no pandas)
+        # e UUID/DECIMAL como texto/float, que são mais leves que objetos Python
+        columns = colunas_read_csv(table_name, leitura_pandas=pandas_types)
+        return f"read_csv(?, header=true, filename=true, columns={columns})"
+    
+    def read_files(self, table_name, files):
+        """
+        Lê vários CSVs de uma tabela numa única passada e retorna um DataFrame (com a coluna filename).
+        Se a leitura em lote falhar, lê arquivo a arquivo para isolar os arquivos com erro.
+        """
+        sql = f"SELECT * FROM {self._read_csv_sql(table_name, pandas_types=True)}"
+        with duckdb.connect() as con:
+            try:
+                return con.execute(sql, [files]).df()
+            except Exception as e:
+                logger.warning(f"⚠️ Leitura em lote falhou ({str(e)}), lendo arquivo a arquivo")
+            
+            dataframes = []
+            for path in files:
+                try:
+                    dataframes.append(con.execute(sql, [[path]]).df())
+                except Exception as e:
+                    logger.error(f"❌ Erro ao carregar {path}: {str(e)}")
+            return pd.concat(dataframes, ignore_index=True) if dataframes else pd.DataFrame()
+    
+    def _upsert_sql(self, table_name, source):
+        """
+        INSERT ... ON CONFLICT que mantém, para cada chave, o registro de data mais recente
+        """
+        keys = TABLE_KEYS[table_name]
+        date_column = TABLE_DATE_COLUMN[table_name]
+        columns = list(TABLE_COLUMNS[table_name])
+        updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in columns if col not in keys)
+        
+        return f"""
+            INSERT INTO {table_name}
+            SELECT {', '.join(columns)} FROM {source}
+            QUALIFY row_number() OVER (PARTITION BY {', '.join(keys)} ORDER BY {date_column} DESC) = 1
+            ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}
+            WHERE EXCLUDED.{date_column} > {table_name}.{date_column}
+        """
+    
+    def _ensure_manifest(self):
+        """
+        Cria a tabela de manifesto dos arquivos da API já aplicados
+        """
+        con = self._connect()
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS manifesto_arquivos (
+                file_name VARCHAR PRIMARY KEY,
+                table_name VARCHAR NOT NULL,
+                size_bytes BIGINT NOT NULL,
+                mtime_ns BIGINT,
+                checksum VARCHAR NOT NULL,
+                row_count BIGINT NOT NULL,
+                max_business_date DATE,
+                processed_at TIMESTAMP NOT NULL
+            )
+        """)
+        # Manifestos criados antes da coluna mtime_ns
+        con.execute("ALTER TABLE manifesto_arquivos ADD COLUMN IF NOT EXISTS mtime_ns BIGINT")
+    
+    @staticmethod
+    def _checksum(path):
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(block)
+        return sha.hexdigest()
+    
+    def _manifest_key(self, api_file):
+        """
+        Chave do arquivo no manifesto: o caminho relativo a api_seeds_path (com '/'),
+        já que partições diferentes podem ter arquivos com o mesmo nome
+        """
+        return os.path.relpath(api_file, self.api_seeds_path).replace(os.sep, '/')
+    
+    def _already_applied(self, api_file):
+        """
+        Consulta o manifesto pela chave (caminho relativo); já aplicado = mesmo
+        tamanho e mesmo mtime. O sha256 só é calculado quando o tamanho bate e o
+        mtime não (ex.: arquivo copiado de novo); se bater, o mtime é atualizado
+        """
+        con = self._connect()
+        key = self._manifest_key(api_file)
+        row = con.execute(
+            "SELECT size_bytes, mtime_ns, checksum FROM manifesto_arquivos WHERE file_name = ?", [key]
+        ).fetchone()
+        stat = os.stat(api_file)
+        if row is None or row[0] != stat.st_size:
+            return False
+        if row[1] == stat.st_mtime_ns:
+            return True
+        if row[2] != self._checksum(api_file):
+            return False
+        con.execute("UPDATE manifesto_arquivos SET mtime_ns = ? WHERE file_name = ?", [stat.st_mtime_ns, key])
+        return True
+    
+    def _apply_files(self, table_name, api_files):
+        """
+        Aplica arquivos da API numa única leitura e registra cada um no manifesto,
+        tudo na mesma transação. Retorna {arquivo: registros}.
+        """
+        con = self._connect()
+        date_column = TABLE_DATE_COLUMN[table_name]
+        
+        # sha256 em threads (hashlib libera o GIL) enquanto nada foi lido ainda
+        with ThreadPoolExecutor() as pool:
+            checksums = dict(zip(api_files, pool.map(self._checksum, api_files)))
+        
+        con.execute("BEGIN TRANSACTION")
+        try:
+            con.execute(f"CREATE OR REPLACE TEMP TABLE delta AS SELECT * FROM {self._read_csv_sql(table_name)}", [api_files])
+            stats = {
+                filename: (row_count, max_date)
+                for filename, row_count, max_date in con.execute(
+                    f"SELECT filename, COUNT(*), MAX({date_column}) FROM delta GROUP BY filename"
+                ).fetchall()
+            }
+            con.execute(self._upsert_sql(table_name, "delta"))
+            
+            # Uma única inserção para todo o lote (executemany faz uma por linha)
+            processed_at = datetime.now()
+            manifest = pd.DataFrame(
+                [
+                    [
+                        self._manifest_key(api_file), table_name, os.path.getsize(api_file),
+                        os.stat(api_file).st_mtime_ns, checksums[api_file],
+                        *stats.get(api_file, (0, None)), processed_at
+                    ]
+                    for api_file in api_files
+                ],
+                columns=['file_name', 'table_name', 'size_bytes', 'mtime_ns', 'checksum', 'row_count',
+                         'max_business_date', 'processed_at']
+            )
+            con.register('novos_manifestos', manifest)
+            con.execute("INSERT OR REPLACE INTO manifesto_arquivos BY NAME SELECT * FROM novos_manifestos")
+            con.unregister('novos_manifestos')
+            con.execute("DROP TABLE delta")
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        return {api_file: stats.get(api_file, (0, None))[0] for api_file in api_files}
+    
+    def high_water_mark(self, table_name=None):
+        """
+        Maior data de negócio já consolidada (por tabela, ou a maior entre as tabelas).
+        A API gera cadastros e pedidos da mesma janela, então a maior data indica
+        até onde a última janela consolidada foi.
+        """
+        self._ensure_manifest()
+        con = self._connect()
+        if table_name is not None:
+            return con.execute(
+                "SELECT MAX(max_business_date) FROM manifesto_arquivos WHERE table_name = ?",
+                [table_name]
+            ).fetchone()[0]
+        
+        marks = [mark for mark in (self.high_water_mark(table) for table in TABLE_COLUMNS) if mark]
+        return max(marks) if marks else None
+    
+    def write_watermark(self):
+        """
+        Grava watermark.json no dbt seeds, lido pela API em /dados/recentes?desde_watermark=true
+        """
+        marks = {table: self.high_water_mark(table) for table in TABLE_COLUMNS}
+        global_mark = self.high_water_mark()
+        content = {
+            "tabelas": {table: mark.isoformat() if mark else None for table, mark in marks.items()},
+            "high_water_mark": global_mark.isoformat() if global_mark else None,
+            "atualizado_em": datetime.now().isoformat()
+        }
+        
+        watermark_file = os.path.join(self.dbt_seeds_path, "watermark.json")
+        tmp_file = f"{watermark_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(content, f, indent=2)
+        os.replace(tmp_file, watermark_file)
+        logger.info(f"🔖 High-water mark: {content['high_water_mark']}")
+    
+    def _ensure_table(self, table_name):
+        """
+        Cria a tabela no DuckDB e, na primeira execução, carrega o CSV principal
+        """
+        con = self._connect()
+        self._ensure_manifest()
+        columns = ", ".join(f"{name} {type_}" for name, type_ in TABLE_COLUMNS[table_name].items())
+        con.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({columns}, PRIMARY KEY ({', '.join(TABLE_KEYS[table_name])}))")
+        
+        total = con.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+        main_file = os.path.join(self.dbt_seeds_path, f"{table_name}.csv")
+        if total == 0 and os.path.exists(main_file):
+            con.execute(self._upsert_sql(table_name, self._read_csv_sql(table_name)), [[main_file]])
+            total = con.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            logger.info(f"✓ Carga inicial a partir de {os.path.basename(main_file)}: {total} registros")
+    
+    def consolidate_table_incremental(self, table_name):
+        """
+        Consolida apenas os arquivos novos da API na tabela DuckDB (upsert por chave primária).
+        O custo acompanha o tamanho do delta, não o histórico; o CSV principal só é
+        reescrito em materialize_table.
+        """
+        try:
+            api_pattern = api_file_pattern(self.api_seeds_path, table_name)
+            api_files = sorted(glob.glob(api_pattern, recursive=True))
+            
+            if not api_files:
+                logger.info(f"Nenhum arquivo da API encontrado para {table_name}")
+                logger.info(f"Padrão buscado: {api_pattern}")
+                return
+            
+            logger.info(f"=== Consolidando {table_name} (incremental) ===")
+            logger.info(f"Arquivos da API encontrados: {len(api_files)}")
+            
+            self._ensure_table(table_name)
+            con = self._connect()
+            total_before = con.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            
+            applied_files = []
+            pending_files = []
+            for api_file in api_files:
+                # Arquivos já registrados no manifesto (ex.: queda antes da remoção) são pulados
+                if self._already_applied(api_file):
+                    applied_files.append(api_file)
+                    logger.info(f"⏭️ Já aplicado anteriormente: {os.path.basename(api_file)}")
+                else:
+                    pending_files.append(api_file)
+            
+            if pending_files:
+                try:
+                    row_counts = self._apply_files(table_name, pending_files)
+                except Exception as e:
+                    # Um arquivo com erro não deve impedir os demais: aplica um a um
+                    logger.warning(f"⚠️ Aplicação em lote falhou ({str(e)}), aplicando arquivo a arquivo")
+                    row_counts = {}
+                    for api_file in pending_files:
+                        try:
+                            row_counts.update(self._apply_files(table_name, [api_file]))
+                        except Exception as e:
+                            logger.error(f"❌ Erro ao aplicar {api_file}: {str(e)}")
+                
+                applied_files.extend(row_counts)
+                logger.info(f"✓ Aplicados {len(row_counts)} arquivos: {sum(row_counts.values())} registros")
+            
+            total_after = con.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            logger.info(f"📊 {total_after - total_before} registros novos, total de {total_after}")
+            
+            # Remove arquivos da API já aplicados
+            for api_file in applied_files:
+                try:
+                    os.remove(api_file)
+                    logger.info(f"🗑️ Arquivo temporário removido: {os.path.basename(api_file)}")
+                except Exception as e:
+                    logger.error(f"❌ Erro ao remover {api_file}: {str(e)}")
+        
+        except Exception as e:
+            logger.error(f"❌ Erro ao consolidar {table_name}: {str(e)}")
+            raise
+    
+    def materialize_table(self, table_name):
+        """
+        Gera o CSV principal (dbt seeds) a partir da tabela DuckDB
+        """
+        self._ensure_table(table_name)
+        main_file = os.path.join(self.dbt_seeds_path, f"{table_name}.csv")
+        tmp_file = f"{main_file}.tmp"
+        
+        # Escreve num arquivo temporário e troca, para nunca deixar o CSV pela metade
+        self._connect().execute(
+            f"COPY (SELECT * FROM {table_name} ORDER BY {TABLE_DATE_COLUMN[table_name]} DESC) "
+            f"TO '{tmp_file}' (FORMAT CSV, HEADER)"
+        )
+        os.replace(tmp_file, main_file)
+        logger.info(f"✅ Arquivo materializado: {os.path.basename(main_file)}")
+    
     def list_files(self):
         """
         Lista arquivos encontrados para debug
@@ -130,10 +448,10 @@ class SeedsConsolidator:
         
         logger.info(f"📁 Diretório API: {self.api_seeds_path}")
         if os.path.exists(self.api_seeds_path):
-            api_files = glob.glob(os.path.join(self.api_seeds_path, "*.csv"))
+            api_files = glob.glob(os.path.join(self.api_seeds_path, "**", "*.csv"), recursive=True)
             if api_files:
                 for file in api_files:
-                    logger.info(f"  - {os.path.basename(file)}")
+                    logger.info(f"  - {os.path.relpath(file, self.api_seeds_path)}")
             else:
                 logger.info("  (vazio)")
         else:
@@ -150,13 +468,13 @@ class SeedsConsolidator:
         else:
             logger.error("  (diretório não existe)")
     
-    def consolidate_all(self):
+    def consolidate_all(self, incremental=False, materialize=False):
         """
         Consolida todas as tabelas
         """
         tables = ['cadastros', 'pedidos']
         
-        logger.info("🚀 Iniciando consolidação de seeds...")
+        logger.info(f"🚀 Iniciando consolidação de seeds ({'incremental' if incremental else 'completa'})...")
         
         # Lista arquivos para debug
         self.list_files()
@@ -164,17 +482,42 @@ class SeedsConsolidator:
         success_count = 0
         for table in tables:
             try:
-                self.consolidate_table(table)
+                if incremental:
+                    self.consolidate_table_incremental(table)
+                    if materialize:
+                        self.materialize_table(table)
+                else:
+                    self.consolidate_table(table)
                 success_count += 1
             except Exception as e:
                 logger.error(f"❌ Falha ao consolidar {table}: {str(e)}")
         
+        if incremental:
+            self.write_watermark()
+        
         logger.info(f"🎉 Consolidação completa! {success_count}/{len(tables)} tabelas processadas com sucesso")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Consolida os seeds gerados pela API nos seeds do dbt.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Aplica só os arquivos novos da API numa tabela DuckDB, sem reescrever o CSV principal"
+    )
+    parser.add_argument(
+        "--materializar",
+        action="store_true",
+        help="No modo incremental, regrava o CSV principal a partir do DuckDB"
+    )
+    parser.add_argument("--db-path", default=None, help="Caminho do banco DuckDB do modo incremental")
+    return parser.parse_args()
+
 if __name__ == "__main__":
     try:
-        consolidator = SeedsConsolidator()
-        consolidator.consolidate_all()
+        args = parse_args()
+        consolidator = SeedsConsolidator(db_path=args.db_path)
+        consolidator.consolidate_all(incremental=args.incremental, materialize=args.materializar)
+        consolidator.close()
         
     except Exception as e:
         logger.error(f"💥 Erro crítico: {str(e)}")
@@ -1,15 +1,24 @@
 import numpy as np
-from faker import Faker
 import uuid
 import random
 import os
 import time
 import pandas as pd
 import duckdb
+import argparse
+import importlib.util
+from collections import deque
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from gerador_colunar import inicializar_worker, gerar_lote, JANELA_DIAS
+from esquemas import colunas_sql
+from identificadores import BLOCO_CPF, ESPACO_CPF, alocar_cpfs, selecionar_cpfs, tamanho_bloco_cpf
+from perfil_carga import carregar_perfil
+from ciclo_pedidos import NOMES_STATUS, ciclo_de_vida, status_em
+from mudancas import mudancas_no_intervalo
 
 # Configurações iniciais
 start_time = time.time()
-fake = Faker('pt_BR')
 random.seed(42)
 np.random.seed(42)
 
@@ -18,67 +27,96 @@ SEEDS_PATH = './seeds/'
 os.makedirs(SEEDS_PATH, exist_ok=True)
 DB_PATH = os.path.join(SEEDS_PATH, 'data.duckdb')
 
-# Conectar ao DuckDB (cria o banco se não existir)
-con = duckdb.connect(DB_PATH)
+# Lotes do modo colunar: RecordBatches do Arrow (lidos pelo DuckDB sem cópia)
+# quando o pyarrow está instalado, senão DataFrames do pandas
+LOTES_PADRAO = 'arrow' if importlib.util.find_spec('pyarrow') else 'pandas'
+
+# Linhas por DataFrame no modo linhas (cada pedaço é inserido e descartado)
+TAMANHO_PEDACO = 10_000
+
+# Orçamento de memória (--memoria-mb): fração dada ao DuckDB (memory_limit, com
+# spill em disco); o resto limita os lotes gerados e ainda não inseridos, a uma
+# estimativa conservadora de bytes por linha (arrays intermediários incluídos)
+FRACAO_MEMORIA_DUCKDB = 0.6
+BYTES_POR_LINHA_LOTE = 1024
+
+# Chaves únicas de cada tabela (as mesmas restrições de criar_tabelas)
+CHAVES_UNICAS = {'cadastros': ('id', 'cpf', 'email'), 'pedidos': ('id_pedido',)}
+
+# Vetores do DuckDB (2048 linhas cada) por lote no cálculo do ciclo de vida (--mudancas-dias)
+VETORES_LOTE_MUDANCAS = 500
+
+# Conexão com o DuckDB, aberta em main(). Fica fora do import para que os
+# processos geradores (--workers) não tentem abrir o mesmo arquivo.
+con = None
+
+# Faker do modo linhas, criado no primeiro uso: o modo colunar e os processos
+# geradores usam o vocabulário pré-gerado (api/vocabulario.py) e não o importam
+_fake = None
+
+def obter_faker():
+    global _fake
+    if _fake is None:
+        from faker import Faker
+        _fake = Faker('pt_BR')
+    return _fake
 
 def criar_tabelas():
-    """Cria as tabelas no banco DuckDB."""
-    con.execute("""
+    """Cria as tabelas no banco DuckDB (colunas e tipos vêm do registro de esquemas)."""
+    con.execute(f"""
     CREATE TABLE IF NOT EXISTS cadastros (
-        id UUID PRIMARY KEY,
-        nome VARCHAR,
-        data_nascimento DATE,
-        cpf VARCHAR(14) UNIQUE,
-        cep VARCHAR(9),
-        cidade VARCHAR(100),
-        estado VARCHAR(2),
-        pais VARCHAR(50),
-        genero CHAR(1),
-        telefone VARCHAR(20),
-        email VARCHAR(100) UNIQUE,
-        data_cadastro DATE
+        {colunas_sql('cadastros')},
+        PRIMARY KEY (id),
+        UNIQUE (cpf),
+        UNIQUE (email)
     )
     """)
     
-    con.execute("""
+    con.execute(f"""
     CREATE TABLE IF NOT EXISTS pedidos (
-        id_pedido UUID PRIMARY KEY,
-        cpf VARCHAR(14),
-        valor_pedido DECIMAL(10,2),
-        valor_frete DECIMAL(10,2),
-        valor_desconto DECIMAL(10,2),
-        cupom VARCHAR(50),
-        endereco_entrega_logradouro VARCHAR(100),
-        endereco_entrega_numero VARCHAR(10),
-        endereco_entrega_bairro VARCHAR(100),
-        endereco_entrega_cidade VARCHAR(100),
-        endereco_entrega_estado CHAR(2),
-        endereco_entrega_pais VARCHAR(50),
-        status_pedido VARCHAR(30),
-        data_pedido DATE,
+        {colunas_sql('pedidos')},
+        PRIMARY KEY (id_pedido),
         FOREIGN KEY (cpf) REFERENCES cadastros(cpf)
     )
     """)
 
+def carregar_bases_cpf():
+    """
+    Bases (9 primeiros dígitos) dos CPFs cadastrados, como array uint32 na
+    ordem dos CPFs: 4 bytes por cliente, lidos do DuckDB sem criar strings
+    em Python. Os pedidos formatam só os CPFs sorteados (selecionar_cpfs).
+    """
+    resultado = con.execute("""
+        SELECT CAST(replace(left(cpf, 11), '.', '') AS UINTEGER) AS base
+        FROM cadastros
+        ORDER BY base
+    """).fetchnumpy()
+    return np.asarray(resultado['base'], dtype=np.uint32)
+
 def get_cpfs_existentes():
     """Retorna um conjunto com todos os CPFs já cadastrados."""
     result = con.execute("SELECT cpf FROM cadastros").fetchall()
     return {row[0] for row in result} if result else set()
 
-def gerar_lote_cadastros(tamanho_lote):
-    """Gera um lote de dados de cadastro usando Faker e retorna um DataFrame."""
-    print(f"  Gerando {tamanho_lote} cadastros...")
+def iterar_lote_cadastros(tamanho_lote, bloco_cpf=None, tamanho_pedaco=TAMANHO_PEDACO, tamanho_bloco=BLOCO_CPF):
+    """
+    Gera um lote de dados de cadastro usando Faker, em DataFrames de até
+    `tamanho_pedaco` linhas (cada pedaço pode ser inserido e descartado).
     
-    # Gera os dados em lotes menores para evitar sobrecarga de memória
-    chunk_size = 10000
-    chunks = []
+    Os CPFs vêm do alocador (válidos e distintos, sem repetição entre lotes
+    de blocos diferentes do mesmo `tamanho_bloco`), então o lote tem
+    exatamente `tamanho_lote` linhas.
+    """
+    print(f"  Gerando {tamanho_lote} cadastros...")
+    fake = obter_faker()
+    _, cpfs = alocar_cpfs(np.random.default_rng(random.getrandbits(64)), tamanho_lote, bloco_cpf, tamanho_bloco)
     
-    for chunk_start in range(0, tamanho_lote, chunk_size):
-        chunk_end = min(chunk_start + chunk_size, tamanho_lote)
+    for chunk_start in range(0, tamanho_lote, tamanho_pedaco):
+        chunk_end = min(chunk_start + tamanho_pedaco, tamanho_lote)
         chunk_data = []
         
-        for _ in range(chunk_start, chunk_end):
-            cpf = fake.bothify(text='###.###.###-##')
+        for indice in range(chunk_start, chunk_end):
+            cpf = cpfs[indice]
             chunk_data.append({
                 'id': str(uuid.uuid4()),
                 'nome': fake.name(),
@@ -94,84 +132,85 @@ def gerar_lote_cadastros(tamanho_lote):
                 'data_cadastro': fake.date_between(start_date='-2y', end_date='today').isoformat()
             })
         
-        # Cria um DataFrame com o chunk atual
-        df_chunk = pd.DataFrame(chunk_data)
-        
-        # Remove duplicatas de CPF dentro deste chunk
-        df_chunk = df_chunk.drop_duplicates(subset=['cpf'])
-        
-        # Adiciona à lista de chunks
-        chunks.append(df_chunk)
-        
         print(f"  Gerados {chunk_end}/{tamanho_lote} registros...")
-    
-    # Concatena todos os chunks em um único DataFrame
+        yield pd.DataFrame(chunk_data)
+
+def gerar_lote_cadastros(tamanho_lote, bloco_cpf=None, tamanho_bloco=BLOCO_CPF):
+    """Gera um lote de dados de cadastro usando Faker e retorna um único DataFrame."""
+    chunks = list(iterar_lote_cadastros(tamanho_lote, bloco_cpf, tamanho_bloco=tamanho_bloco))
     if chunks:
-        df = pd.concat(chunks, ignore_index=True)
-        # Remove duplicatas entre chunks
-        df = df.drop_duplicates(subset=['cpf'])
-        return df.head(tamanho_lote)  # Garante o tamanho máximo solicitado
+        return pd.concat(chunks, ignore_index=True)
     return pd.DataFrame()
 
-def gerar_lote_pedidos(cpfs, tamanho_lote):
-    """Gera um lote de pedidos para os CPFs fornecidos usando Pandas para melhor desempenho."""
-    try:
-        print(f"  Gerando {tamanho_lote} pedidos...")
-        
-        # Gera os dados em lotes menores
-        chunk_size = 10000
-        chunks = []
+def iterar_lote_pedidos(cpfs, tamanho_lote, tamanho_pedaco=TAMANHO_PEDACO):
+    """
+    Gera um lote de pedidos para os CPFs fornecidos, em DataFrames de até
+    `tamanho_pedaco` linhas.
+    
+    `cpfs` pode ser o array de bases (uint32) de carregar_bases_cpf: só os
+    CPFs sorteados em cada pedaço são formatados.
+    """
+    print(f"  Gerando {tamanho_lote} pedidos...")
+    fake = obter_faker()
+    
+    for chunk_start in range(0, tamanho_lote, tamanho_pedaco):
+        chunk_end = min(chunk_start + tamanho_pedaco, tamanho_lote)
+        chunk_data = []
+        indices_cpf = []
         
-        for chunk_start in range(0, tamanho_lote, chunk_size):
-            chunk_end = min(chunk_start + chunk_size, tamanho_lote)
-            chunk_data = []
-            
-            for _ in range(chunk_start, chunk_end):
-                try:
-                    # Seleciona um CPF aleatório
-                    cpf = random.choice(cpfs)
-                    
-                    # Gera dados do pedido
-                    valor_total = round(random.uniform(50, 2000), 2)
-                    tem_desconto = random.random() < 0.2  # 20% de chance de ter desconto
-                    valor_desconto = round(valor_total * random.uniform(0.05, 0.2), 2) if tem_desconto else 0.0
-                    
-                    # Gera um código de cupom único baseado em UUID se houver desconto
-                    cupom = f"CUPOM{str(uuid.uuid4())[:8].upper()}" if tem_desconto else None
-                    
-                    chunk_data.append({
-                        'id_pedido': str(uuid.uuid4()),
-                        'cpf': cpf,
-                        'valor_pedido': valor_total,
-                        'valor_frete': round(random.uniform(5, 100), 2),
-                        'valor_desconto': valor_desconto,
-                        'cupom': cupom,
-                        'endereco_entrega_logradouro': fake.street_name(),
-                        'endereco_entrega_numero': fake.building_number(),
-                        'endereco_entrega_bairro': fake.neighborhood(),
-                        'endereco_entrega_cidade': fake.city(),
-                        'endereco_entrega_estado': fake.state_abbr(),
-                        'endereco_entrega_pais': 'Brasil',
-                        'status_pedido': random.choice(['pendente', 'pago', 'enviado', 'entregue', 'cancelado']),
-                        'data_pedido': fake.date_between(start_date='-2y', end_date='today').isoformat()
-                    })
-                except Exception as e:
-                    print(f"  Erro ao gerar pedido: {str(e)}")
-                    continue
-            
-            if not chunk_data:
-                continue
-                
+        for _ in range(chunk_start, chunk_end):
             try:
-                # Cria um DataFrame com o chunk atual
-                df_chunk = pd.DataFrame(chunk_data)
-                chunks.append(df_chunk)
+                # Seleciona um CPF aleatório (formatado ao final do pedaço)
+                indices_cpf.append(random.randrange(len(cpfs)))
+                
+                # Gera dados do pedido
+                valor_total = round(random.uniform(50, 2000), 2)
+                tem_desconto = random.random() < 0.2  # 20% de chance de ter desconto
+                valor_desconto = round(valor_total * random.uniform(0.05, 0.2), 2) if tem_desconto else 0.0
+                
+                # Gera um código de cupom único baseado em UUID se houver desconto
+                cupom = f"CUPOM{str(uuid.uuid4())[:8].upper()}" if tem_desconto else None
                 
-                print(f"  Gerados {chunk_end}/{tamanho_lote} pedidos...")
+                chunk_data.append({
+                    'id_pedido': str(uuid.uuid4()),
+                    'cpf': None,
+                    'valor_pedido': valor_total,
+                    'valor_frete': round(random.uniform(5, 100), 2),
+                    'valor_desconto': valor_desconto,
+                    'cupom': cupom,
+                    'endereco_entrega_logradouro': fake.street_name(),
+                    'endereco_entrega_numero': fake.building_number(),
+                    'endereco_entrega_bairro': fake.neighborhood(),
+                    'endereco_entrega_cidade': fake.city(),
+                    'endereco_entrega_estado': fake.state_abbr(),
+                    'endereco_entrega_pais': 'Brasil',
+                    'status_pedido': random.choice(['pendente', 'pago', 'enviado', 'entregue', 'cancelado']),
+                    'data_pedido': fake.date_between(start_date='-2y', end_date='today').isoformat()
+                })
             except Exception as e:
-                print(f"  Erro ao criar DataFrame do chunk: {str(e)}")
+                print(f"  Erro ao gerar pedido: {str(e)}")
+                del indices_cpf[len(chunk_data):]
                 continue
         
+        if not chunk_data:
+            continue
+        
+        try:
+            # Cria um DataFrame com o chunk atual
+            df_chunk = pd.DataFrame(chunk_data)
+            df_chunk['cpf'] = selecionar_cpfs(cpfs, indices_cpf)
+            
+            print(f"  Gerados {chunk_end}/{tamanho_lote} pedidos...")
+            yield df_chunk
+        except Exception as e:
+            print(f"  Erro ao criar DataFrame do chunk: {str(e)}")
+            continue
+
+def gerar_lote_pedidos(cpfs, tamanho_lote):
+    """Gera um lote de pedidos para os CPFs fornecidos e retorna um único DataFrame."""
+    try:
+        chunks = list(iterar_lote_pedidos(cpfs, tamanho_lote))
+        
         # Concatena todos os chunks em um único DataFrame
         if chunks:
             df = pd.concat(chunks, ignore_index=True)
@@ -183,38 +222,392 @@ def gerar_lote_pedidos(cpfs, tamanho_lote):
         print(f"Erro crítico em gerar_lote_pedidos: {str(e)}")
         return pd.DataFrame()
 
-def inserir_em_lote(tabela, df):
-    """Insere dados em lote usando Pandas DataFrame."""
-    if df.empty:
-        return
+def inserir_em_lote(tabela, lote):
+    """
+    Insere um lote (DataFrame pandas ou RecordBatch/Table do pyarrow) na tabela.
+    
+    O DuckDB lê o lote registrado direto da memória (no Arrow, sem conversão).
+    Linhas cuja chave única já existe na tabela, ou se repete dentro do lote,
+    são descartadas por anti-join antes do INSERT: o mesmo efeito do
+    INSERT OR IGNORE, que no DuckDB fica muito lento com vários índices únicos.
+    
+    Returns:
+        tuple: (inseridos, ignorados), contados pelo próprio INSERT
+    """
+    total = len(lote)
+    if total == 0:
+        return 0, 0
     
-    # Converte para o formato do DuckDB
-    con.register('temp_df', df)
+    # _posicao guarda a ordem do lote: a primeira ocorrência de cada chave é a
+    # que fica, e as linhas entram na tabela na ordem em que foram geradas
+    chaves = CHAVES_UNICAS[tabela]
+    novas = " AND ".join(f"NOT EXISTS (SELECT 1 FROM {tabela} t WHERE t.{chave} = l.{chave})" for chave in chaves)
+    primeiras = " AND ".join(
+        f"row_number() OVER (PARTITION BY l.{chave} ORDER BY l._posicao) = 1" for chave in chaves
+    )
     
+    con.register('temp_lote', lote)
     try:
-        # Insere os dados, ignorando duplicatas
-        con.execute(f"""
-            INSERT OR IGNORE INTO {tabela} 
-            SELECT * FROM temp_df
-        """)
-        
-        # Conta quantos registros foram inseridos
-        result = con.execute("SELECT COUNT(*) as inseridos FROM temp_df").fetchone()[0]
-        print(f"  {result} registros inseridos na tabela {tabela}")
-        
+        inseridos = con.execute(f"""
+            INSERT INTO {tabela}
+            SELECT * EXCLUDE (_posicao) FROM (
+                SELECT l.* FROM (SELECT *, row_number() OVER () AS _posicao FROM temp_lote) l
+                WHERE {novas}
+                QUALIFY {primeiras}
+            )
+            ORDER BY _posicao
+        """).fetchone()[0]
     except Exception as e:
         print(f"Erro ao inserir dados na tabela {tabela}: {str(e)}")
         raise
     finally:
-        # Remove o DataFrame temporário
-        con.unregister('temp_df')
+        con.unregister('temp_lote')
+    
+    ignorados = total - inseridos
+    print(f"  {inseridos} registros inseridos na tabela {tabela}"
+          + (f" ({ignorados} ignorados por chave duplicada)" if ignorados else ""))
+    return inseridos, ignorados
+
+# Formatos de saída suportados e a extensão de arquivo de cada um
+FORMATOS_SAIDA = {'csv': 'csv', 'parquet': 'parquet', 'arrow': 'arrow'}
+
+def exportar_tabela(tabela, formato='csv', row_group_size=None, particionar_mes=False):
+    """
+    Exporta uma tabela direto do DuckDB para CSV, Parquet (ZSTD) ou Arrow IPC.
+    
+    Args:
+        tabela (str): Nome da tabela ('cadastros' ou 'pedidos')
+        formato (str): 'csv', 'parquet' ou 'arrow'
+        row_group_size (int, optional): Linhas por row group (Parquet) ou por record batch (Arrow)
+        particionar_mes (bool): Para pedidos, grava um diretório por mês de data_pedido
+    
+    Returns:
+        str: Caminho do arquivo (ou diretório, se particionado) gerado
+    """
+    extensao = FORMATOS_SAIDA[formato]
+    consulta = f"SELECT * FROM {tabela}"
+    particionar = particionar_mes and tabela == 'pedidos'
+    
+    if formato == 'arrow':
+        if particionar:
+            raise ValueError("Particionamento por mês não é suportado no formato arrow")
+        destino = os.path.join(SEEDS_PATH, f"{tabela}.{extensao}")
+        _exportar_arrow(consulta, destino, row_group_size or 122_880)
+        return destino
+    
+    opcoes = ["FORMAT CSV, HEADER"] if formato == 'csv' else ["FORMAT PARQUET, COMPRESSION ZSTD"]
+    if formato == 'parquet' and row_group_size:
+        opcoes.append(f"ROW_GROUP_SIZE {int(row_group_size)}")
+    
+    if particionar:
+        # Diretório no estilo Hive: pedidos/mes_pedido=AAAA-MM/
+        consulta = f"SELECT *, strftime(data_pedido, '%Y-%m') AS mes_pedido FROM {tabela}"
+        opcoes.append("PARTITION_BY (mes_pedido), OVERWRITE_OR_IGNORE")
+        destino = os.path.join(SEEDS_PATH, tabela)
+    else:
+        destino = os.path.join(SEEDS_PATH, f"{tabela}.{extensao}")
+    
+    con.execute(f"COPY ({consulta}) TO '{destino}' ({', '.join(opcoes)})")
+    return destino
+
+def _exportar_arrow(consulta, destino, tamanho_batch):
+    """Grava o resultado da consulta como arquivo Arrow IPC, um record batch por vez."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise RuntimeError("O formato arrow requer o pacote pyarrow (pip install pyarrow)")
+    
+    resultado = con.execute(consulta)
+    # to_arrow_reader substitui fetch_record_batch nas versões mais novas do DuckDB
+    if hasattr(resultado, 'to_arrow_reader'):
+        leitor = resultado.to_arrow_reader(tamanho_batch)
+    else:
+        leitor = resultado.fetch_record_batch(tamanho_batch)
+    opcoes = pa.ipc.IpcWriteOptions(compression='zstd')
+    with pa.OSFile(destino, 'wb') as arquivo, pa.ipc.new_file(arquivo, leitor.schema, options=opcoes) as escritor:
+        for batch in leitor:
+            escritor.write_batch(batch)
+
+def exportar_tabelas(formato='csv', row_group_size=None, particionar_mes=False):
+    """Exporta cadastros e pedidos no formato escolhido."""
+    for tabela in ('cadastros', 'pedidos'):
+        destino = exportar_tabela(tabela, formato, row_group_size, particionar_mes)
+        print(f"  {tabela} exportado para {destino}")
 
 def exportar_para_csv():
     """Exporta as tabelas para arquivos CSV."""
-    con.execute(f"EXPORT DATABASE '{SEEDS_PATH}' (FORMAT CSV)")
+    exportar_tabelas('csv')
+
+def ler_em_lotes(tabela, vetores_por_lote=50):
+    """Lê a tabela do DuckDB em DataFrames de até vetores_por_lote * 2048 linhas."""
+    resultado = con.execute(f"SELECT * FROM {tabela}")
+    while True:
+        df = resultado.fetch_df_chunk(vetores_por_lote)
+        if df.empty:
+            break
+        yield df
+
+def carregar_postgres():
+    """
+    Carrega cadastros e pedidos nas tabelas raw do Postgres com COPY FROM STDIN,
+    lote a lote a partir do DuckDB, substituindo o conteúdo anterior.
+    """
+    from carga_postgres import CarregadorPostgres
+    
+    carregador = CarregadorPostgres()
+    try:
+        for tabela in ('cadastros', 'pedidos'):
+            linhas = carregador.copiar_lotes(tabela, ler_em_lotes(tabela), substituir=True)
+            print(f"  {linhas:,} registros copiados para {carregador.schema}.{tabela}")
+    finally:
+        carregador.encerrar()
+
+def lotes_em_voo(memoria_mb, workers, tamanho_lote):
+    """
+    Quantos lotes podem estar gerados e ainda não inseridos ao mesmo tempo.
+
+    Sem orçamento, 2 por worker. Com orçamento, o que cabe na parte dele que
+    não vai para o DuckDB (no mínimo 1, o que serializa a geração).
+    """
+    limite = 2 * max(1, workers)
+    if memoria_mb is None:
+        return limite
+    memoria_lotes = memoria_mb * (1 - FRACAO_MEMORIA_DUCKDB) * 1024 * 1024
+    return max(1, min(limite, int(memoria_lotes // (tamanho_lote * BYTES_POR_LINHA_LOTE))))
+
+def _mapear_limitado(pool, funcao, tarefas, em_voo):
+    """Como pool.map (resultados na ordem das tarefas), com no máximo `em_voo` tarefas submetidas e não consumidas."""
+    pendentes = deque()
+    for tarefa in tarefas:
+        pendentes.append(pool.submit(funcao, tarefa))
+        if len(pendentes) >= em_voo:
+            yield pendentes.popleft().result()
+    while pendentes:
+        yield pendentes.popleft().result()
+
+def gerar_lotes_colunar(tabela, total, tamanho_lote, seed, workers, hoje, cpfs=None, perfil=None, arrow=False,
+                        em_voo=None):
+    """
+    Gera os lotes de uma tabela no modo colunar, em ordem de índice.
+
+    Cada lote tem semente derivada de (seed, tabela, índice), então a saída é a
+    mesma com 1 ou N workers; o chamador é o único escritor no DuckDB. Os
+    cadastros usam um bloco de CPFs por lote, dimensionado pelo total. Com
+    workers, no máximo `em_voo` lotes (padrão: 2 por worker) ficam prontos
+    esperando o consumidor, então a memória não cresce com o total.
+    """
+    tarefas = (
+        (tabela, indice, min(tamanho_lote, total - inicio))
+        for indice, inicio in enumerate(range(0, total, tamanho_lote))
+    )
+    bloco_cpf = tamanho_bloco_cpf(total, tamanho_lote) if tabela == 'cadastros' else BLOCO_CPF
+    
+    if workers <= 1:
+        inicializar_worker(seed, hoje, cpfs, perfil, arrow, bloco_cpf)
+        for tarefa in tarefas:
+            yield gerar_lote(tarefa)
+        return
+    
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=inicializar_worker,
+        initargs=(seed, hoje, cpfs, perfil, arrow, bloco_cpf)
+    ) as pool:
+        yield from _mapear_limitado(pool, gerar_lote, tarefas, em_voo or 2 * workers)
+
+def gerar_mudancas(dias, hoje):
+    """
+    Modo CDC (--mudancas-dias): calcula o ciclo de vida de todos os pedidos
+    (api/ciclo_pedidos.py, vetorizado por lote de ~1 milhão) e divide o
+    histórico no instante de corte, o início dos últimos `dias` dias:
+    
+    - pedidos: só os criados até o corte, com o status daquele instante
+    - pedidos_mudancas: inserts e updates depois do corte (até o fim de hoje),
+      o pedido completo após cada mudança com operacao, updated_at e
+      status_anterior, em ordem de updated_at
+    
+    Aplicar pedidos_mudancas em pedidos com MERGE por id_pedido leva ao
+    estado de hoje. O ciclo de cada pedido depende só de id_pedido e
+    data_pedido, então o resultado não depende da divisão em lotes.
+    
+    Returns:
+        tuple: (pedidos no corte, eventos em pedidos_mudancas)
+    """
+    corte = np.datetime64(hoje - timedelta(days=dias - 1), 's')
+    fim = np.datetime64(hoje + timedelta(days=1), 's')
+    
+    con.execute("CREATE OR REPLACE TEMP TABLE status_corte (linha BIGINT, status_pedido VARCHAR(30))")
+    con.execute(
+        "CREATE OR REPLACE TEMP TABLE eventos_cdc "
+        "(linha BIGINT, etapa TINYINT, operacao VARCHAR(6), status_pedido VARCHAR(30), "
+        "status_anterior VARCHAR(30), updated_at TIMESTAMP)"
+    )
+    # Leitura por outra conexão (cursor), já que `con` grava nas tabelas temporárias durante o laço
+    leitor = con.cursor()
+    resultado = leitor.execute("SELECT rowid AS linha, id_pedido::VARCHAR AS id_pedido, data_pedido FROM pedidos")
+    
+    inicio = 0
+    while True:
+        lote = resultado.fetch_df_chunk(VETORES_LOTE_MUDANCAS)
+        if lote.empty:
+            break
+        linhas = lote['linha'].to_numpy()
+        criados_em, momentos, destinos = ciclo_de_vida(
+            lote['id_pedido'].to_numpy(dtype=object), lote['data_pedido'].to_numpy()
+        )
+        print(f"Ciclo de vida dos pedidos {inicio+1}-{inicio+len(linhas)}...")
+        inicio += len(linhas)
+        
+        no_corte = criados_em <= corte
+        df_status = pd.DataFrame({
+            'linha': linhas[no_corte],
+            'status_pedido': NOMES_STATUS[status_em(momentos[no_corte], destinos[no_corte], corte)]
+        })
+        con.execute("INSERT INTO status_corte SELECT * FROM df_status")
+        
+        eventos = mudancas_no_intervalo(criados_em, momentos, destinos, corte, fim)
+        df_eventos = pd.DataFrame({
+            'linha': linhas[eventos['indice']],
+            'etapa': eventos['etapa'],
+            'operacao': eventos['operacao'],
+            'status_pedido': NOMES_STATUS[eventos['status_pedido']],
+            'status_anterior': np.where(eventos['status_anterior'] >= 0, NOMES_STATUS[eventos['status_anterior']], None),
+            'updated_at': eventos['updated_at'],
+        })
+        con.execute("INSERT INTO eventos_cdc SELECT * FROM df_eventos")
+    leitor.close()
+    
+    # O feed leva as demais colunas do pedido; depois, pedidos fica com o estado no corte
+    con.execute("""
+        CREATE OR REPLACE TABLE pedidos_mudancas AS
+        SELECT p.* REPLACE (e.status_pedido AS status_pedido), e.operacao, e.updated_at, e.status_anterior
+        FROM eventos_cdc e JOIN pedidos p ON p.rowid = e.linha
+        ORDER BY e.updated_at, e.linha, e.etapa
+    """)
+    con.execute("UPDATE pedidos SET status_pedido = s.status_pedido FROM status_corte s WHERE pedidos.rowid = s.linha")
+    con.execute("DELETE FROM pedidos WHERE rowid NOT IN (SELECT linha FROM status_corte)")
+    
+    total_pedidos = con.execute("SELECT COUNT(*) FROM pedidos").fetchone()[0]
+    total_eventos = con.execute("SELECT COUNT(*) FROM pedidos_mudancas").fetchone()[0]
+    return total_pedidos, total_eventos
+
+def calcular_volumes(perfil, hoje, escala=1.0):
+    """Total de cadastros e de pedidos: do perfil (janela de JANELA_DIAS dias até hoje) ou fixos."""
+    if perfil is None:
+        return 10_000, 50_000
+    inicio_janela = hoje - timedelta(days=JANELA_DIAS)
+    return (
+        perfil.volume_esperado('cadastros', inicio_janela, hoje, escala),
+        perfil.volume_esperado('pedidos', inicio_janela, hoje, escala)
+    )
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gera dados de cadastros e pedidos com DuckDB.")
+    parser.add_argument(
+        "--modo",
+        choices=["colunar", "linhas"],
+        default="colunar",
+        help="colunar: gera cada coluna como array NumPy; linhas: gerador original, um dict por linha"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Seed do gerador colunar")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Número de processos geradores no modo colunar (a saída não depende deste valor)"
+    )
+    parser.add_argument(
+        "--lotes",
+        choices=["arrow", "pandas"],
+        default=LOTES_PADRAO,
+        help="Lotes do modo colunar: RecordBatches do Arrow (padrão, se o pyarrow estiver instalado) ou DataFrames"
+    )
+    parser.add_argument(
+        "--memoria-mb",
+        type=int,
+        default=None,
+        help="Orçamento de memória: limita o DuckDB (com spill em disco) e os lotes em espera"
+    )
+    parser.add_argument(
+        "--formato",
+        choices=sorted(FORMATOS_SAIDA),
+        default="csv",
+        help="Formato de saída: csv, parquet (ZSTD) ou arrow (IPC)"
+    )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=None,
+        help="Linhas por row group (parquet) ou record batch (arrow)"
+    )
+    parser.add_argument(
+        "--particionar-mes",
+        action="store_true",
+        help="Particiona pedidos por mês de data_pedido (csv e parquet)"
+    )
+    parser.add_argument(
+        "--postgres",
+        action="store_true",
+        help="Também carrega as tabelas no Postgres (schema raw) com COPY, sem passar pelo dbt seed"
+    )
+    parser.add_argument(
+        "--mudancas-dias",
+        type=int,
+        default=None,
+        help="Modo CDC: pedidos fica com o estado de N dias atrás e pedidos_mudancas com inserts/updates "
+             "de status desde então (só exportado, não vai para o Postgres)"
+    )
+    parser.add_argument(
+        "--perfil",
+        default=None,
+        help="Perfil de carga TOML (ex.: ../api/perfis/padrao.toml): volumes, sazonalidade, clientes e status"
+    )
+    parser.add_argument(
+        "--escala",
+        type=float,
+        default=1.0,
+        help="Multiplicador dos volumes diários do perfil"
+    )
+    args = parser.parse_args()
+    if args.perfil and args.modo != "colunar":
+        parser.error("--perfil só é suportado no modo colunar")
+    if args.particionar_mes and args.formato == "arrow":
+        parser.error("--particionar-mes não é suportado no formato arrow")
+    if args.workers > 1 and args.modo != "colunar":
+        parser.error("--workers só é suportado no modo colunar")
+    if args.mudancas_dias is not None and args.mudancas_dias < 1:
+        parser.error("--mudancas-dias deve ser pelo menos 1")
+    if args.lotes == "arrow" and importlib.util.find_spec("pyarrow") is None:
+        parser.error("--lotes arrow requer o pacote pyarrow (pip install pyarrow)")
+    if args.perfil:
+        # Cada cadastro precisa de um CPF distinto: o total não pode passar do espaço de CPFs
+        total_cadastros, _ = calcular_volumes(carregar_perfil(args.perfil), date.today(), args.escala)
+        if total_cadastros > ESPACO_CPF:
+            parser.error(f"--escala {args.escala} gera {total_cadastros:,} cadastros, "
+                         f"mais que os {ESPACO_CPF:,} CPFs distintos possíveis")
+    return args
 
 def main():
-    print("Iniciando geração de dados com DuckDB...")
+    global con
+    args = parse_args()
+    print(f"Iniciando geração de dados com DuckDB (modo {args.modo}, {args.workers} worker(s))...")
+    
+    # Conectar ao DuckDB (cria o banco se não existir)
+    con = duckdb.connect(DB_PATH)
+    if args.memoria_mb is not None:
+        # Acima do limite, o DuckDB grava dados temporários em disco em vez de crescer
+        con.execute(f"SET memory_limit = '{int(args.memoria_mb * FRACAO_MEMORIA_DUCKDB)}MB'")
+        print(f"Orçamento de memória: {args.memoria_mb} MB")
+    
+    # Data de referência fixa para todos os lotes do modo colunar
+    hoje = date.today()
+    
+    # Volumes: do perfil de carga (janela de JANELA_DIAS dias até hoje) ou fixos
+    perfil = carregar_perfil(args.perfil) if args.perfil else None
+    total_cadastros, total_pedidos = calcular_volumes(perfil, hoje, args.escala)
+    if perfil is not None:
+        print(f"Perfil de carga '{perfil.nome}' (escala {args.escala}): "
+              f"{total_cadastros:,} cadastros, {total_pedidos:,} pedidos")
     
     try:
         # Criar tabelas se não existirem
@@ -226,30 +619,57 @@ def main():
         
         # Gerar cadastros (1 milhão de registros)
         print("Gerando cadastros...")
-        total_cadastros = 10_000
         lote_cadastros = 5_000  # Tamanho maior para melhor desempenho
         
-        for i in range(0, total_cadastros, lote_cadastros):
-            tamanho_atual = min(lote_cadastros, total_cadastros - i)
-            print(f"Processando cadastros {i+1}-{i+tamanho_atual}...")
-            
-            # Gera e insere o lote de cadastros
-            df_cadastros = gerar_lote_cadastros(tamanho_atual)
-            if not df_cadastros.empty:
+        if args.modo == "colunar":
+            lotes = gerar_lotes_colunar(
+                'cadastros', total_cadastros, lote_cadastros, args.seed, args.workers, hoje,
+                perfil=perfil, arrow=args.lotes == "arrow",
+                em_voo=lotes_em_voo(args.memoria_mb, args.workers, lote_cadastros)
+            )
+            for indice, df_cadastros in enumerate(lotes):
+                i = indice * lote_cadastros
+                print(f"Processando cadastros {i+1}-{i+len(df_cadastros)}...")
                 inserir_em_lote('cadastros', df_cadastros)
+        else:
+            tamanho_bloco = tamanho_bloco_cpf(total_cadastros, lote_cadastros)
+            for i in range(0, total_cadastros, lote_cadastros):
+                tamanho_atual = min(lote_cadastros, total_cadastros - i)
+                print(f"Processando cadastros {i+1}-{i+tamanho_atual}...")
+                
+                # Gera e insere o lote de cadastros, um pedaço por vez
+                for df_cadastros in iterar_lote_cadastros(
+                    tamanho_atual, bloco_cpf=i // lote_cadastros, tamanho_bloco=tamanho_bloco
+                ):
+                    inserir_em_lote('cadastros', df_cadastros)
         
-        # Obtém os CPFs dos clientes cadastrados
-        cpfs = con.execute("SELECT cpf FROM cadastros").fetchdf()['cpf'].tolist()
+        # Bases dos CPFs dos clientes cadastrados (uint32, ordenadas para a amostragem ser reprodutível)
+        cpfs = carregar_bases_cpf()
         
         # Gerar pedidos (5 milhões de registros)
         print("\nGerando pedidos...")
-        total_pedidos = 50_000
         lote_pedidos = 5_000  # Tamanho do lote para processamento
         
-        for i in range(0, total_pedidos, lote_pedidos):
-            print(f"Processando pedidos {i+1}-{min(i+lote_pedidos, total_pedidos)}...")
-            dados = gerar_lote_pedidos(cpfs, min(lote_pedidos, total_pedidos - i))
-            inserir_em_lote('pedidos', dados)
+        if args.modo == "colunar":
+            lotes = gerar_lotes_colunar(
+                'pedidos', total_pedidos, lote_pedidos, args.seed, args.workers, hoje, cpfs, perfil,
+                arrow=args.lotes == "arrow",
+                em_voo=lotes_em_voo(args.memoria_mb, args.workers, lote_pedidos)
+            )
+            for indice, dados in enumerate(lotes):
+                i = indice * lote_pedidos
+                print(f"Processando pedidos {i+1}-{i+len(dados)}...")
+                inserir_em_lote('pedidos', dados)
+        else:
+            for i in range(0, total_pedidos, lote_pedidos):
+                print(f"Processando pedidos {i+1}-{min(i+lote_pedidos, total_pedidos)}...")
+                for dados in iterar_lote_pedidos(cpfs, min(lote_pedidos, total_pedidos - i)):
+                    inserir_em_lote('pedidos', dados)
+        
+        if args.mudancas_dias is not None:
+            print(f"\nGerando mudanças de status dos últimos {args.mudancas_dias} dia(s)...")
+            no_corte, eventos = gerar_mudancas(args.mudancas_dias, hoje)
+            print(f"  {no_corte:,} pedidos no corte, {eventos:,} eventos em pedidos_mudancas")
         
         # Estatísticas
         print("\nEstatísticas:")
@@ -261,9 +681,16 @@ def main():
         print(f"- Total de pedidos gerados: {total_ped:,}")
         print(f"- Média de pedidos por cliente: {media_pedidos:.2f}")
         
-        # Exportar para CSV
-        print("\nExportando para CSV...")
-        exportar_para_csv()
+        # Exportar no formato escolhido
+        print(f"\nExportando para {args.formato.upper()}...")
+        exportar_tabelas(args.formato, args.row_group_size, args.particionar_mes)
+        if args.mudancas_dias is not None:
+            destino = exportar_tabela('pedidos_mudancas', args.formato, args.row_group_size)
+            print(f"  pedidos_mudancas exportado para {destino}")
+        
+        if args.postgres:
+            print("\nCarregando no Postgres...")
+            carregar_postgres()
         
     finally:
         # Fechar conexão
@@ -272,12 +699,6 @@ def main():
         # Remover arquivo temporário do DuckDB
         if os.path.exists(DB_PATH):
             os.remove(DB_PATH)
-        
-        # Remover arquivos temporários (load.sql e schema.sql da pasta seeds)
-        if os.path.exists(SEEDS_PATH + 'load.sql'):
-            os.remove(SEEDS_PATH + 'load.sql')
-        if os.path.exists(SEEDS_PATH + 'schema.sql'):
-            os.remove(SEEDS_PATH + 'schema.sql')
     
     elapsed_time = time.time() - start_time
     print(f"\nTempo total de execução: {elapsed_time:.2f} segundos")
@@ -0,0 +1,203 @@
+import os
+import sys
+import numpy as np
+from datetime import date, timedelta
+import pandas as pd
+
+# Registro de esquemas compartilhado com a API (api/esquemas.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+from esquemas import dtypes_pandas, schema_arrow
+from identificadores import BLOCO_CPF, HEX_MAIUSCULO, alocar_cpfs, formatar_mascara, gerar_uuids, selecionar_cpfs
+from vocabulario import obter_vocabulario
+
+# Janela (em dias até a data de referência) das datas de cadastro e de pedido
+JANELA_DIAS = 730
+
+# Tipos das colunas categóricas e de data, conforme o registro de esquemas
+TIPOS_CADASTROS = dtypes_pandas('cadastros')
+TIPOS_PEDIDOS = dtypes_pandas('pedidos')
+
+def gerar_datas(rng, inicio, fim, quantidade):
+    """Sorteia datas uniformes entre `inicio` e `fim` (inclusive), como datetime64[s]."""
+    dias = (fim - inicio).days
+    deslocamentos = rng.integers(0, dias + 1, size=quantidade)
+    return (np.datetime64(inicio, 'D') + deslocamentos).astype('datetime64[s]')
+
+def gerar_categorias(rng, tipo, quantidade):
+    """Sorteia valores uniformes de uma coluna categórica, direto pelos códigos."""
+    codigos = rng.integers(0, len(tipo.categories), size=quantidade)
+    return pd.Categorical.from_codes(codigos, dtype=tipo)
+
+def repetir_categoria(tipo, valor, quantidade):
+    """Coluna categórica com o mesmo valor em todas as linhas."""
+    return pd.Categorical.from_codes(np.full(quantidade, tipo.categories.get_loc(valor)), dtype=tipo)
+
+def montar_lote(tabela, colunas, arrow=False):
+    """
+    Monta o lote a partir das colunas (arrays NumPy e Categoricals).
+
+    Sem arrow, retorna um DataFrame. Com arrow=True, retorna um
+    pyarrow.RecordBatch no schema do registro (categorias viram dicionários
+    sobre os mesmos códigos, datas viram date32), que o DuckDB lê sem cópia.
+    """
+    if not arrow:
+        return pd.DataFrame(colunas)
+
+    import pyarrow as pa
+
+    schema = schema_arrow(tabela)
+    arrays = []
+    for campo in schema:
+        valores = colunas[campo.name]
+        if isinstance(valores, pd.Categorical):
+            categorias = pa.array(valores.categories.to_numpy(dtype=object), type=campo.type.value_type)
+            arrays.append(pa.DictionaryArray.from_arrays(valores.codes.astype(np.int8), categorias))
+        else:
+            arrays.append(pa.array(valores).cast(campo.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def gerar_lote_cadastros_colunar(rng, tamanho_lote, vocabulario, hoje=None, bloco_cpf=None, perfil=None, arrow=False,
+                                 tamanho_bloco_cpf=BLOCO_CPF):
+    """
+    Gera um lote de cadastros coluna a coluna.
+
+    Retorna um DataFrame (ou RecordBatch, com arrow=True) com o mesmo esquema
+    de `gerar_lote_cadastros` e exatamente `tamanho_lote` linhas: os CPFs são
+    válidos e distintos, e lotes com `bloco_cpf` diferentes nunca repetem CPF
+    entre si. Com um PerfilCarga, as datas de cadastro seguem a sazonalidade do perfil.
+    """
+    hoje = hoje or date.today()
+    n = tamanho_lote
+
+    digitos_cpf, cpfs = alocar_cpfs(rng, n, bloco_cpf, tamanho_bloco_cpf)
+
+    return montar_lote('cadastros', {
+        'id': gerar_uuids(rng, n),
+        'nome': vocabulario['nomes'][rng.integers(0, len(vocabulario['nomes']), size=n)],
+        'data_nascimento': gerar_datas(
+            rng, hoje - timedelta(days=int(91 * 365.25) - 1), hoje - timedelta(days=int(18 * 365.25)), n
+        ),
+        'cpf': cpfs,
+        'cep': formatar_mascara(rng.integers(0, 10, size=(n, 8), dtype=np.uint8), '########'),
+        'cidade': vocabulario['cidades'][rng.integers(0, len(vocabulario['cidades']), size=n)],
+        'estado': gerar_categorias(rng, TIPOS_CADASTROS['estado'], n),
+        'pais': repetir_categoria(TIPOS_CADASTROS['pais'], 'Brasil', n),
+        'genero': gerar_categorias(rng, TIPOS_CADASTROS['genero'], n),
+        'telefone': formatar_mascara(rng.integers(0, 10, size=(n, 10), dtype=np.uint8), '+55 ## ####-####'),
+        'email': formatar_mascara(digitos_cpf, '###########@exemplo.com.br'),
+        'data_cadastro': (
+            gerar_datas(rng, hoje - timedelta(days=JANELA_DIAS), hoje, n) if perfil is None
+            else perfil.sortear_datas(rng, hoje - timedelta(days=JANELA_DIAS), hoje, n)
+        ),
+    }, arrow)
+
+def gerar_lote_pedidos_colunar(rng, cpfs, tamanho_lote, vocabulario, hoje=None, perfil=None, pesos_cpfs=None,
+                               arrow=False):
+    """
+    Gera um lote de pedidos coluna a coluna para os CPFs fornecidos (formatados
+    ou, para caber em memória com muitos clientes, só as bases em uint32).
+
+    Retorna um DataFrame (ou RecordBatch, com arrow=True) com o mesmo
+    esquema de `gerar_lote_pedidos`. Sem perfil, clientes, datas e status
+    são uniformes. Com um PerfilCarga, os clientes seguem `pesos_cpfs`
+    (calculados uma vez para todos os lotes, ou sorteados aqui se ausentes),
+    as datas seguem a sazonalidade e o status depende da idade do pedido.
+    Sem CPFs, retorna um lote vazio no mesmo esquema.
+    """
+    hoje = hoje or date.today()
+    n = tamanho_lote
+    cpfs = np.asarray(cpfs)
+
+    if len(cpfs) == 0:
+        # Sem clientes não há pedidos (como em iterar_pedidos_periodo) nem o que sortear pelo perfil
+        n, perfil = 0, None
+
+    if perfil is not None:
+        if pesos_cpfs is None:
+            pesos_cpfs = perfil.pesos_clientes(rng, len(cpfs))
+        indices_cpf = perfil.sortear_clientes(rng, pesos_cpfs, n)
+        datas_pedido = perfil.sortear_datas(rng, hoje - timedelta(days=JANELA_DIAS), hoje, n)
+        idades = (np.datetime64(hoje, 'D') - datas_pedido.astype('datetime64[D]')).astype(np.int64)
+        status = pd.Categorical.from_codes(perfil.sortear_status(rng, idades), dtype=TIPOS_PEDIDOS['status_pedido'])
+
+    valor_total = np.round(rng.uniform(50, 2000, size=n), 2)
+    tem_desconto = rng.random(size=n) < 0.2  # 20% de chance de ter desconto
+    valor_desconto = np.where(tem_desconto, np.round(valor_total * rng.uniform(0.05, 0.2, size=n), 2), 0.0)
+
+    # Código de cupom no mesmo formato do gerador original (CUPOM + 8 hexadecimais)
+    cupons = formatar_mascara(rng.integers(0, 16, size=(n, 8), dtype=np.uint8), 'CUPOM########', HEX_MAIUSCULO)
+
+    # Número do endereço com 1 a 4 dígitos
+    numeros = rng.integers(1, 10 ** rng.integers(1, 5, size=n))
+
+    return montar_lote('pedidos', {
+        'id_pedido': gerar_uuids(rng, n),
+        'cpf': selecionar_cpfs(cpfs, rng.integers(0, len(cpfs), size=n) if perfil is None else indices_cpf),
+        'valor_pedido': valor_total,
+        'valor_frete': np.round(rng.uniform(5, 100, size=n), 2),
+        'valor_desconto': valor_desconto,
+        'cupom': np.where(tem_desconto, cupons.astype(object), None),
+        'endereco_entrega_logradouro': vocabulario['logradouros'][rng.integers(0, len(vocabulario['logradouros']), size=n)],
+        'endereco_entrega_numero': numeros.astype(str).astype(object),
+        'endereco_entrega_bairro': vocabulario['bairros'][rng.integers(0, len(vocabulario['bairros']), size=n)],
+        'endereco_entrega_cidade': vocabulario['cidades'][rng.integers(0, len(vocabulario['cidades']), size=n)],
+        'endereco_entrega_estado': gerar_categorias(rng, TIPOS_PEDIDOS['endereco_entrega_estado'], n),
+        'endereco_entrega_pais': repetir_categoria(TIPOS_PEDIDOS['endereco_entrega_pais'], 'Brasil', n),
+        'status_pedido': gerar_categorias(rng, TIPOS_PEDIDOS['status_pedido'], n) if perfil is None else status,
+        'data_pedido': (
+            gerar_datas(rng, hoje - timedelta(days=JANELA_DIAS), hoje, n) if perfil is None else datas_pedido
+        ),
+    }, arrow)
+
+# Identificadores estáveis das tabelas usados na derivação das sementes
+TABELAS = ('cadastros', 'pedidos')
+
+# Estado de cada processo gerador (preenchido por inicializar_worker)
+_estado_worker = {}
+
+def semente_lote(seed, tabela, indice):
+    """
+    Deriva a semente de um lote a partir da semente mestre, da tabela e do índice do lote.
+
+    Como a semente não depende de qual processo gera o lote, o resultado é o
+    mesmo para qualquer número de workers.
+    """
+    return np.random.SeedSequence([seed, TABELAS.index(tabela), indice])
+
+def inicializar_worker(seed, hoje, cpfs=None, perfil=None, arrow=False, tamanho_bloco_cpf=BLOCO_CPF):
+    """
+    Prepara o processo gerador: vocabulário (cache em memory-map), data de referência,
+    CPFs, perfil de carga, formato dos lotes (DataFrame ou RecordBatch) e tamanho
+    do bloco de CPFs de cada lote de cadastros (ver tamanho_bloco_cpf). Os pesos
+    dos clientes vêm de uma semente própria, então os clientes mais ativos são os
+    mesmos em todos os processos.
+    """
+    _estado_worker['seed'] = seed
+    _estado_worker['arrow'] = arrow
+    _estado_worker['tamanho_bloco_cpf'] = tamanho_bloco_cpf
+    _estado_worker['hoje'] = hoje
+    _estado_worker['cpfs'] = None if cpfs is None else np.asarray(cpfs)
+    _estado_worker['perfil'] = perfil
+    _estado_worker['pesos_cpfs'] = None
+    if perfil is not None and cpfs is not None:
+        rng_clientes = np.random.default_rng(np.random.SeedSequence([seed, len(TABELAS)]))
+        _estado_worker['pesos_cpfs'] = perfil.pesos_clientes(rng_clientes, len(cpfs))
+    _estado_worker['vocabulario'] = obter_vocabulario()
+
+def gerar_lote(tarefa):
+    """Gera o lote `(tabela, indice, tamanho)` usando o estado do processo atual."""
+    tabela, indice, tamanho = tarefa
+    rng = np.random.default_rng(semente_lote(_estado_worker['seed'], tabela, indice))
+    vocabulario = _estado_worker['vocabulario']
+    hoje = _estado_worker['hoje']
+    perfil = _estado_worker['perfil']
+    arrow = _estado_worker['arrow']
+
+    if tabela == 'cadastros':
+        return gerar_lote_cadastros_colunar(
+            rng, tamanho, vocabulario, hoje, bloco_cpf=indice, perfil=perfil, arrow=arrow,
+            tamanho_bloco_cpf=_estado_worker['tamanho_bloco_cpf']
+        )
+    return gerar_lote_pedidos_colunar(
+        rng, _estado_worker['cpfs'], tamanho, vocabulario, hoje, perfil, _estado_worker['pesos_cpfs'], arrow
+    )
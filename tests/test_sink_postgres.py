@@ -0,0 +1,82 @@
+"""
+Teste de integração do SinkPostgres contra um Postgres local (o do docker-compose).
+
+Usa as mesmas variáveis da API (DB_HOST, DB_PORT, DB_NAME, DBT_USER,
+DBT_PASSWORD) e é pulado quando o banco não responde. Grava um lote com
+gravar() nas tabelas raw, confere as contagens e a integridade entre
+pedidos e cadastros e, no fim, apaga as linhas do lote.
+
+Uso (a partir da raiz do repositório, com o docker-compose no ar):
+    DBT_USER=... DBT_PASSWORD=... python -m pytest tests/test_sink_postgres.py
+"""
+import asyncio
+import os
+import socket
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+from carga_postgres import POSTGRES_HOST, POSTGRES_PORT, POSTGRES_SCHEMA, POSTGRES_USUARIO
+from data_generator_api import gerar_dados_periodo
+from sink_postgres import SinkPostgres
+
+def _postgres_acessivel() -> bool:
+    try:
+        with socket.create_connection((POSTGRES_HOST, POSTGRES_PORT), timeout=1):
+            return True
+    except OSError:
+        return False
+
+pytestmark = [
+    pytest.mark.skipif(not _postgres_acessivel(), reason=f"Postgres inacessível em {POSTGRES_HOST}:{POSTGRES_PORT}"),
+    pytest.mark.skipif(POSTGRES_USUARIO is None, reason="DBT_USER/DBT_PASSWORD não definidos"),
+]
+
+async def _gravar_e_conferir(dados):
+    sink = SinkPostgres(min_conexoes=1, max_conexoes=2)
+    await sink.iniciar()
+    ids_cadastros = [cadastro['id'] for cadastro in dados['dados']['cadastros']]
+    ids_pedidos = [pedido['id_pedido'] for pedido in dados['dados']['pedidos']]
+    schema = sink.schema
+    try:
+        linhas = await sink.gravar(dados)
+        async with sink._pool.acquire() as con:
+            cadastros = await con.fetchval(
+                f"SELECT COUNT(*) FROM {schema}.cadastros WHERE id = ANY($1::uuid[])", ids_cadastros
+            )
+            pedidos = await con.fetchval(
+                f"SELECT COUNT(*) FROM {schema}.pedidos WHERE id_pedido = ANY($1::uuid[])", ids_pedidos
+            )
+            # Todo pedido do lote aponta para um cadastro gravado (chave estrangeira lógica por CPF)
+            orfaos = await con.fetchval(
+                f"""
+                SELECT COUNT(*) FROM {schema}.pedidos p
+                WHERE p.id_pedido = ANY($1::uuid[])
+                  AND NOT EXISTS (SELECT 1 FROM {schema}.cadastros c WHERE c.cpf = p.cpf)
+                """,
+                ids_pedidos
+            )
+        return linhas, cadastros, pedidos, orfaos, sink.status()
+    finally:
+        async with sink._pool.acquire() as con, con.transaction():
+            await con.execute(f"DELETE FROM {schema}.pedidos WHERE id_pedido = ANY($1::uuid[])", ids_pedidos)
+            await con.execute(f"DELETE FROM {schema}.cadastros WHERE id = ANY($1::uuid[])", ids_cadastros)
+        await sink.encerrar()
+
+def test_gravar_lote_nas_tabelas_raw():
+    pytest.importorskip("asyncpg")
+    dados = gerar_dados_periodo("2025-01-01", "2025-01-07", seed=2024)
+    total_cadastros = len(dados['dados']['cadastros'])
+    total_pedidos = len(dados['dados']['pedidos'])
+    assert total_cadastros > 0 and total_pedidos > 0
+
+    linhas, cadastros, pedidos, orfaos, status = asyncio.run(_gravar_e_conferir(dados))
+
+    assert linhas == {"cadastros": total_cadastros, "pedidos": total_pedidos}
+    assert cadastros == total_cadastros
+    assert pedidos == total_pedidos
+    assert orfaos == 0
+    assert status["schema"] == POSTGRES_SCHEMA
+    assert status["gravacoes"] == 1
+    assert status["linhas_gravadas"] == linhas